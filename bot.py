@@ -5,13 +5,33 @@ import logging
 import os
 from dotenv import load_dotenv
 
+try:
+    # uvloop (libuv) - более быстрый event loop для множества мелких сетевых операций.
+    # Необязателен: на Windows или без установленного пакета используется стандартный asyncio.
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    # orjson - разбор ответов Bot API (каждая отправка, в том числе публикации из планировщика) на C
+    # вместо стандартного json. Необязателен: без пакета сессия aiogram использует json.
+    import orjson
+except ImportError:
+    orjson = None
+
 from aiogram import Bot, Dispatcher, F
-from aiogram.fsm.storage.memory import MemoryStorage # Or another storage like Redis
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.enums import ParseMode
 
 # Импорт собственных модулей и их компонентов
-from utils.logger import setup_logging
+from utils.logger import setup_logging, stop_logging
+from utils.fsm_storage import create_fsm_storage
 from services.db import init_db, async_engine, AsyncSessionLocal
 from services.scheduler import init_scheduler, restore_scheduled_jobs
+from services.rss_service import close_rss_http_session
+from utils.shared_cache import close_shared_cache
+from middlewares.db import DbSessionMiddleware, UserTimezoneMiddleware
 
 # Импорт всех роутеров из обработчиков
 # Убедитесь, что эти файлы и роутеры существуют
@@ -25,10 +45,51 @@ from handlers.inline_buttons import inline_buttons_router # Используем
 logger = logging.getLogger(__name__)
 
 
+async def run_webhook(dp: Dispatcher, bot: Bot, webhook_base_url: str) -> None:
+    """
+    Регистрирует webhook в Telegram и запускает aiohttp-сервер, принимающий обновления.
+    Обработчики запускаются в фоне (handle_in_background=True): Telegram сразу получает ответ 200,
+    а обновления обрабатываются параллельно. Работает до отмены (остановки приложения).
+    """
+    # Импорт здесь: aiohttp-сервер нужен только в режиме webhook
+    from aiohttp import web
+    from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+    webhook_path = os.getenv('WEBHOOK_PATH', '/webhook')
+    webhook_secret = os.getenv('WEBHOOK_SECRET') # Проверяется по заголовку X-Telegram-Bot-Api-Secret-Token
+    listen_host = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+    listen_port = int(os.getenv('PORT', os.getenv('WEBHOOK_PORT', '8080')))
+
+    await bot.set_webhook(
+        url=f"{webhook_base_url.rstrip('/')}{webhook_path}",
+        secret_token=webhook_secret,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=webhook_secret,
+        session_factory=AsyncSessionLocal, # То же, что передается в start_polling
+    ).register(app, path=webhook_path)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=listen_host, port=listen_port).start()
+    logger.info(f"Webhook-сервер запущен на {listen_host}:{listen_port}{webhook_path}.")
+    try:
+        await asyncio.Event().wait() # Ожидание до остановки приложения
+    finally:
+        await runner.cleanup()
+
+
 async def main():
     """
     Основная асинхронная функция для запуска Telegram бота.
-    Инициализирует все компоненты, регистрирует обработчики и запускает поллинг.
+    Инициализирует все компоненты, регистрирует обработчики и запускает поллинг (или webhook).
     """
     # 1. Загрузка переменных окружения из файла .env
     load_dotenv()
@@ -73,16 +134,25 @@ async def main():
 
 
     # 5. Создание экземпляра Bot и Dispatcher
-    # Используем MemoryStorage для FSM, для продакшена рекомендуется RedisStorage
-    dp = Dispatcher(storage=MemoryStorage())
-    bot = Bot(token=bot_token, parse_mode='HTML') # Используем HTML парсинг по умолчанию
+    # FSM: RedisStorage при заданном REDIS_URL (состояние переживает перезапуск), иначе MemoryStorage
+    dp = Dispatcher(storage=create_fsm_storage())
+    # Используем HTML парсинг по умолчанию (в aiogram 3.7+ - через DefaultBotProperties)
+    # При наличии orjson ответы Telegram разбираются и тела запросов (клавиатуры, медиа) сериализуются им
+    session = None
+    if orjson is not None:
+        session = AiohttpSession(json_loads=orjson.loads, json_dumps=lambda obj: orjson.dumps(obj).decode())
+    bot = Bot(token=bot_token, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 
     # 6. Инициализация планировщика задач
     # Передаем экземпляр бота и движок БД планировщику
+    # Бот рассчитан на ОДИН процесс: планировщик запускается в каждом процессе и выполняет задачи
+    # из общего хранилища (таблица apscheduler_jobs) без блокировки между процессами, поэтому при
+    # нескольких процессах (в т.ч. воркерах за webhook) посты и проверки RSS выполнялись бы по разу
+    # в каждом. Общие Redis FSM и кэш пользователей нужны, чтобы состояние переживало перезапуск.
     logger.info("Инициализация планировщика задач...")
     try:
         # init_scheduler запускает планировщик и возвращает его экземпляр
-        scheduler = init_scheduler(async_engine, bot)
+        scheduler = init_scheduler(async_engine, bot, AsyncSessionLocal)
         logger.info("Планировщик задач инициализирован и запущен.")
     except Exception as e:
         logger.critical(f"Ошибка инициализации планировщика задач: {e}", exc_info=True)
@@ -95,6 +165,10 @@ async def main():
     dp['scheduler'] = scheduler
     dp['session_factory'] = AsyncSessionLocal
     dp['bot_instance'] = bot # Передаем экземпляр бота
+    # Хэндлеры получают AsyncSession (параметр `session`) из пула соединений asyncpg через middleware
+    dp.update.outer_middleware(DbSessionMiddleware(AsyncSessionLocal))
+    # Часовой пояс пользователя подгружается в кэш при промахе (после DbSessionMiddleware - нужна ее сессия)
+    dp.update.outer_middleware(UserTimezoneMiddleware())
 
 
     # 8. Регистрация роутеров
@@ -119,22 +193,35 @@ async def main():
         # Приложение может продолжить работу, но некоторые задачи могут не быть восстановлены
 
 
-    # 10. Пропуск необработанных обновлений (необязательно, но полезно при перезапусках)
-    # await bot.delete_webhook(drop_pending_updates=True) # Если используется webhook
-    # Для поллинга:
-    logger.info("Запуск поллинга...")
+    # 10. Получение обновлений: webhook, если задан WEBHOOK_BASE_URL, иначе поллинг.
+    # В режиме webhook Telegram сам доставляет обновления, без постоянных запросов getUpdates.
+    webhook_base_url = os.getenv('WEBHOOK_BASE_URL')
     try:
-        # Запуск поллинга. session_factory будет использоваться для инъекции AsyncSession в хэндлеры
-        await dp.start_polling(bot, session_factory=AsyncSessionLocal)
+        if webhook_base_url:
+            await run_webhook(dp, bot, webhook_base_url)
+        else:
+            # Снимаем webhook, если он остался от запуска в режиме webhook (иначе getUpdates вернет Conflict)
+            await bot.delete_webhook()
+            logger.info("Запуск поллинга...")
+            # Запуск поллинга. session_factory будет использоваться для инъекции AsyncSession в хэндлеры
+            await dp.start_polling(bot, session_factory=AsyncSessionLocal)
     finally:
-        # 11. Остановка планировщика и закрытие сессии бота при завершении поллинга
+        # 11. Остановка планировщика и закрытие сессии бота при завершении работы
         logger.info("Остановка планировщика и бота...")
         scheduler.shutdown()
+        await close_rss_http_session() # Общий HTTP-пул для загрузки RSS-лент
         await bot.session.close()
+        await dp.storage.close() # Закрывает соединения с Redis (для MemoryStorage ничего не делает)
+        await close_shared_cache() # Клиент Redis общего кэша пользователей (если был создан)
         logger.info("Приложение завершило работу.")
+        stop_logging() # Дописываем оставшиеся в очереди записи
 
 
 if __name__ == '__main__':
+    if uvloop is not None:
+        # Политика event loop должна быть установлена до asyncio.run. uvloop.install() в новых версиях
+        # uvloop устарел (DeprecationWarning), а uvloop.run нет в 0.17 - ставим политику напрямую.
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         # Запуск основной асинхронной функции
         asyncio.run(main())
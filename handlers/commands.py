@@ -1,5 +1,6 @@
 # handlers/commands.py
 
+import asyncio
 import logging
 from aiogram import Router, F
 from aiogram.filters import Command, CommandStart
@@ -15,7 +16,10 @@ from handlers.rss_integration_fsm_states import RssIntegrationStates
 
 # Импорт зависимостей из абсолютных путей
 from services.db import get_or_create_user
-from keyboards.reply_keyboards import get_main_menu_keyboard, get_cancel_keyboard # Импорт get_cancel_keyboard
+from keyboards.reply_keyboards import ( # Импорт get_cancel_keyboard и текстов кнопок меню
+    get_main_menu_keyboard, get_cancel_keyboard,
+    HELP_BUTTON_TEXT, NEW_POST_BUTTON_TEXT, MY_POSTS_BUTTON_TEXT, ADD_RSS_BUTTON_TEXT, CANCEL_BUTTON_TEXT,
+)
 
 
 # --- Logging Setup ---
@@ -24,6 +28,41 @@ logger = logging.getLogger(__name__)
 # --- Router Initialization ---
 router = Router()
 
+# Тексты кнопок главного меню (и "Отменить"), на которые отвечают хэндлеры этого роутера.
+# frozenset собирается один раз при импорте: проверка вхождения - один поиск по хэшу.
+_MENU_BUTTON_TEXTS = frozenset({
+    HELP_BUTTON_TEXT, NEW_POST_BUTTON_TEXT, MY_POSTS_BUTTON_TEXT, ADD_RSS_BUTTON_TEXT, CANCEL_BUTTON_TEXT,
+})
+
+
+def _is_command_or_menu_button(message: Message) -> bool:
+    """Пропускает в роутер только команды и нажатия кнопок меню."""
+    text = message.text or message.caption # Фильтр Command проверяет и подписи к медиа
+    return bool(text) and (text[0] == '/' or text in _MENU_BUTTON_TEXTS)
+
+
+# Остальные сообщения (текст поста, медиа, ввод в сценариях) отсекаются одной проверкой
+# на уровне роутера, без разбора команды фильтром каждого хэндлера.
+router.message.filter(_is_command_or_menu_button)
+
+# Текст справки не зависит от пользователя: собирается (с форматированием команд) один раз при импорте,
+# а не при каждом /help.
+_HELP_TEXT = (
+    "*Справка по боту\\:*\n\\n"
+    "Этот бот поможет вам планировать публикации в ваших каналах и группах, "
+    "а также автоматически публиковать новости из RSS\\-лент\\.\n\\n"
+    "*Основные команды и их текстовые альтернативы\\:*\n"
+    f"\\- `{markdown_bold('/start')}`\\: Начать работу с ботом, показать главное меню\\.\n"
+    f"\\- `{markdown_bold('/help')}` или кнопка \"❓ Помощь\": Показать эту справку\\.\n"
+    f"\\- `{markdown_bold('/newpost')}` или кнопка \"➕ Новый пост\": Начать создание нового поста с текстом, медиа и планированием\\.\n"
+    f"\\- `{markdown_bold('/myposts')}` или кнопка \"🗂 Мои посты\": Посмотреть список ваших запланированных постов и управлять ими \$редактировать, удалить, отменить\$.\\n"
+    f"\\- `{markdown_bold('/addrss')}` или кнопка \"📰 Добавить RSS\": Начать процесс добавления новой RSS\\-ленты для автоматической публикации\\.\n\\n"
+    "*В процессе создания поста или добавления RSS\\:*\n"
+    "\\- Кнопка \"❌ Отменить\" или команда `/cancel`\\: Прерывает текущий процесс и возвращает в главное меню\\.\n\\n"
+    "Для использования бота убедитесь, что он добавлен как администратор в каналах/группах, куда вы хотите публиковать, с необходимыми правами \$отправка сообщений, медиа, удаление сообщений и т\\.п\\.\$\\.\n\\n"
+    "Выберите действие из главного меню ниже\\."
+)
+
 # --- Handlers ---
 
 @router.message(CommandStart())
@@ -40,18 +79,6 @@ async def handle_start(
     logger.info(f"User {user_id} started the bot.")
     await state.clear() # Clear any previous FSM state
 
-    # Get or create user in the database
-    # Pass potential defaults like username, first_name, last_name
-    # telegram_user_id must be an integer
-    user = await get_or_create_user(session, user_id, defaults={
-        'telegram_user_id': user_id, # Redundant as it's the primary key argument, but good to include
-        'username': message.from_user.username,
-        'first_name': message.from_user.first_name,
-        'last_name': message.from_user.last_name
-        # Default preferred_mode and timezone are set in the User model
-    })
-    logger.info(f"User DB entry for Telegram ID {user.telegram_user_id} (DB ID: {user.id}) processed.")
-
     # Use escape_md for user's first name in case it contains MarkdownV2 special characters
     safe_first_name = escape_md(message.from_user.first_name or 'пользователь')
 
@@ -62,13 +89,28 @@ async def handle_start(
         "Используй кнопки меню ниже для начала\\."
     )
 
-    await message.answer(
-        welcome_message,
-        reply_markup=get_main_menu_keyboard(),
-        parse_mode="MarkdownV2" # Use MarkdownV2 for welcome message
+    # Get or create user in the database
+    # Pass potential defaults like username, first_name, last_name
+    # telegram_user_id must be an integer
+    # Приветствие не зависит от записи в БД, поэтому запрос к БД и отправка сообщения
+    # выполняются одновременно: пользователь не ждет round-trip к базе перед ответом.
+    user, _ = await asyncio.gather(
+        get_or_create_user(session, user_id, defaults={
+            'telegram_user_id': user_id, # Redundant as it's the primary key argument, but good to include
+            'username': message.from_user.username,
+            'first_name': message.from_user.first_name,
+            'last_name': message.from_user.last_name
+            # Default preferred_mode and timezone are set in the User model
+        }),
+        message.answer(
+            welcome_message,
+            reply_markup=get_main_menu_keyboard(),
+            parse_mode="MarkdownV2" # Use MarkdownV2 for welcome message
+        ),
     )
+    logger.info(f"User DB entry for Telegram ID {user.telegram_user_id} (DB ID: {user.id}) processed.")
 
-@router.message(Command("help") | F.text == "❓ Помощь")
+@router.message(Command("help") | F.text == HELP_BUTTON_TEXT)
 async def handle_help(
     message: Message,
     state: FSMContext
@@ -80,24 +122,8 @@ async def handle_help(
     logger.info(f"User {message.from_user.id} requested help.")
     await state.clear() # Clear any previous FSM state
 
-    help_text = (
-        "*Справка по боту\\:*\n\\n"
-        "Этот бот поможет вам планировать публикации в ваших каналах и группах, "
-        "а также автоматически публиковать новости из RSS\\-лент\\.\n\\n"
-        "*Основные команды и их текстовые альтернативы\\:*\n"
-        f"\\- `{markdown_bold('/start')}`\\: Начать работу с ботом, показать главное меню\\.\n"
-        f"\\- `{markdown_bold('/help')}` или кнопка \"❓ Помощь\": Показать эту справку\\.\n"
-        f"\\- `{markdown_bold('/newpost')}` или кнопка \"➕ Новый пост\": Начать создание нового поста с текстом, медиа и планированием\\.\n"
-        f"\\- `{markdown_bold('/myposts')}` или кнопка \"🗂 Мои посты\": Посмотреть список ваших запланированных постов и управлять ими \$редактировать, удалить, отменить\$.\\n"
-        f"\\- `{markdown_bold('/addrss')}` или кнопка \"📰 Добавить RSS\": Начать процесс добавления новой RSS\\-ленты для автоматической публикации\\.\n\\n"
-        "*В процессе создания поста или добавления RSS\\:*\n"
-        "\\- Кнопка \"❌ Отменить\" или команда `/cancel`\\: Прерывает текущий процесс и возвращает в главное меню\\.\n\\n"
-        "Для использования бота убедитесь, что он добавлен как администратор в каналах/группах, куда вы хотите публиковать, с необходимыми правами \$отправка сообщений, медиа, удаление сообщений и т\\.п\\.\$\\.\n\\n"
-        "Выберите действие из главного меню ниже\\."
-    )
-
     await message.answer(
-        help_text,
+        _HELP_TEXT,
         reply_markup=get_main_menu_keyboard(),
         parse_mode="MarkdownV2" # Use MarkdownV2 for help text
     )
@@ -106,7 +132,7 @@ async def handle_help(
 # in the respective state handlers (e.g., handlers/post_creation.py).
 # The handlers below in commands.py are simplified entry points.
 
-@router.message(Command("newpost") | F.text == "➕ Новый пост")
+@router.message(Command("newpost") | F.text == NEW_POST_BUTTON_TEXT)
 async def handle_new_post(
     message: Message,
     state: FSMContext
@@ -127,7 +153,7 @@ async def handle_new_post(
         parse_mode="MarkdownV2"
     )
 
-@router.message(Command("myposts") | F.text == "🗂 Мои посты")
+@router.message(Command("myposts") | F.text == MY_POSTS_BUTTON_TEXT)
 async def handle_my_posts(
     message: Message,
     state: FSMContext
@@ -151,7 +177,7 @@ async def handle_my_posts(
     )
 
 
-@router.message(Command("addrss") | F.text == "📰 Добавить RSS")
+@router.message(Command("addrss") | F.text == ADD_RSS_BUTTON_TEXT)
 async def handle_add_rss(
     message: Message,
     state: FSMContext
@@ -174,7 +200,7 @@ async def handle_add_rss(
 
 # Generic cancel handler for any state.
 # Specific cancel handlers in other modules might override this for cleanup.
-@router.message(Command("cancel") | F.text == "❌ Отменить")
+@router.message(Command("cancel") | F.text == CANCEL_BUTTON_TEXT)
 async def handle_cancel_generic(
     message: Message,
     state: FSMContext
@@ -1,5 +1,6 @@
 # handlers/inline_buttons.py
 
+import asyncio
 import logging
 
 from aiogram import Router, F
@@ -16,20 +17,26 @@ from keyboards.inline_keyboards import (
     get_post_management_keyboard, # Может потребоваться для отмены удаления
 )
 # Импорт функций работы с БД и планировщиком
-from services.db import delete_post_by_id, get_post_by_id # get_post_by_id нужен для получения данных поста при отмене, если требуется
-from services.scheduler import remove_scheduled_job
+from services.db import delete_user_post, get_user_post_status # Статус поста нужен при отмене удаления
+from services.scheduler import remove_scheduled_job, remove_post_delete_jobs, get_publish_job_id
+from services.telegram_api import edit_message_text_if_changed # "message is not modified" при повторном нажатии - не ошибка
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
 # Инициализация роутера
 inline_buttons_router = Router()
+# Роутер обрабатывает только callback'и подтверждения удаления и навигации. Проверка префикса
+# на уровне роутера отсекает остальные callback'и одним str.startswith, без разбора
+# callback_data фильтром каждого обработчика.
+_CALLBACK_PREFIXES = tuple(f"{cb.__prefix__}{cb.__separator__}" for cb in (DeleteCallbackData, NavigationCallbackData))
+inline_buttons_router.callback_query.filter(F.data.startswith(_CALLBACK_PREFIXES))
 
 # --- Обработчики для PostCallbackData (через DeleteCallbackData для подтверждения) ---
 
 # Обработчик подтверждения удаления поста
 # Используем DeleteCallbackData, как определено в keyboards/inline_keyboards.py для подтверждения
-@inline_buttons_router.callback_query(DeleteCallbackData.filter(F.action == "confirm" and F.item_type == "post"))
+@inline_buttons_router.callback_query(DeleteCallbackData.filter((F.action == "confirm") & (F.item_type == "post")))
 async def process_confirm_post_delete(
     callback: CallbackQuery,
     callback_data: DeleteCallbackData,
@@ -51,40 +58,48 @@ async def process_confirm_post_delete(
 
     try:
         # 1. Удалить пост из базы данных
-        # delete_post_by_id возвращает True, если пост был найден и удален
-        deleted_from_db = await delete_post_by_id(session, post_id)
+        # delete_user_post удаляет пост только если он принадлежит пользователю (проверка владельца
+        # и удаление - один запрос) и возвращает True, если пост был найден и удален
+        deleted_from_db = await delete_user_post(session, post_id, callback.from_user.id)
+        await session.commit()
 
         if deleted_from_db:
             logger.info(f"Пост ID:{post_id} успешно удален из БД.")
 
             # 2. Удалить связанные задачи из планировщика
-            # Задачи публикации и удаления могут иметь ID в формате post_publish_<id> и post_delete_<id>
-            publish_job_id = f'post_publish_{post_id}'
-            delete_job_id = f'post_delete_{post_id}'
+            # Задача публикации - по ID из ID поста; задач удаления у повторяющегося поста
+            # несколько (по одной на срабатывание), они снимаются все
+            publish_job_id = get_publish_job_id(post_id)
 
             await remove_scheduled_job(scheduler, publish_job_id)
-            await remove_scheduled_job(scheduler, delete_job_id)
-            logger.info(f"Связанные задачи планировщика для поста ID:{post_id} (publish:{publish_job_id}, delete:{delete_job_id}) удалены (если существовали).")
+            removed_delete_job_ids = await remove_post_delete_jobs(scheduler, post_id)
+            logger.info(f"Связанные задачи планировщика для поста ID:{post_id} (publish:{publish_job_id}, delete:{removed_delete_job_ids}) удалены (если существовали).")
 
-            # 3. Отправить подтверждение пользователю
-            await callback.message.edit_text(f"✅ Пост ID:{post_id} и все связанные задачи успешно удалены.", reply_markup=None)
+            result_text = f"✅ Пост ID:{post_id} и все связанные задачи успешно удалены."
 
         else:
             logger.warning(f"Попытка удаления поста ID:{post_id} из БД, но он не был найден. Возможно, уже удален.")
-            await callback.message.edit_text(f"ℹ️ Пост ID:{post_id} не найден в базе данных или уже был удален.", reply_markup=None)
+            result_text = f"ℹ️ Пост ID:{post_id} не найден в базе данных или уже был удален."
 
     except Exception as e:
         logger.exception(f"Ошибка при обработке подтверждения удаления поста ID:{post_id}: {e}")
         # Информировать пользователя об ошибке
-        await callback.message.edit_text(f"❌ Произошла ошибка при попытке удаления поста ID:{post_id}.", reply_markup=None)
+        result_text = f"❌ Произошла ошибка при попытке удаления поста ID:{post_id}."
 
-    # Всегда отвечаем на callback query, чтобы убрать часы загрузки на кнопке
-    await callback.answer("Обработано")
+    # 3. Отправить результат пользователю и ответить на callback query (убрать часы загрузки на кнопке).
+    # Это два независимых запроса к Telegram - выполняем их параллельно, а не друг за другом.
+    edit_result, _ = await asyncio.gather(
+        edit_message_text_if_changed(callback.message, result_text, reply_markup=None),
+        callback.answer("Обработано"),
+        return_exceptions=True
+    )
+    if isinstance(edit_result, Exception):
+        logger.warning(f"Не удалось обновить сообщение подтверждения удаления поста ID:{post_id}: {edit_result}")
 
 
 # Обработчик отмены удаления поста
 # Используем DeleteCallbackData, как определено в keyboards/inline_keyboards.py для отмены
-@inline_buttons_router.callback_query(DeleteCallbackData.filter(F.action == "cancel" and F.item_type == "post"))
+@inline_buttons_router.callback_query(DeleteCallbackData.filter((F.action == "cancel") & (F.item_type == "post")))
 async def process_cancel_post_delete(
     callback: CallbackQuery,
     callback_data: DeleteCallbackData,
@@ -103,34 +118,37 @@ async def process_cancel_post_delete(
     logger.info(f"Получена отмена удаления поста ID:{post_id} от пользователя {callback.from_user.id}.")
 
     try:
-        # Получить актуальный пост, чтобы решить, какое сообщение или клавиатуру показать
-        post = await get_post_by_id(session, post_id)
+        # Получить актуальный статус поста, чтобы решить, какое сообщение показать
+        # (сам пост с его JSON-полями для этого загружать не нужно). Проверка владельца - в том же
+        # запросе: чужой пост выглядит как отсутствующий, как и при подтверждении удаления.
+        post_status = await get_user_post_status(session, post_id, callback.from_user.id)
 
-        if post:
+        if post_status is not None:
             # Если пост существует, показываем его снова, возможно с клавиатурой управления
             # В зависимости от статуса поста, может быть разная клавиатура
             # Например, если статус 'scheduled' или 'sent', можно показать get_post_management_keyboard
             # Если статус 'deleted', нужно просто сообщить, что пост уже удален
-            if post.status == 'deleted':
-                 await callback.message.edit_text(f"ℹ️ Пост ID:{post_id} уже помечен как удаленный.", reply_markup=None)
+            if post_status == 'deleted':
+                 await edit_message_text_if_changed(callback.message, f"ℹ️ Пост ID:{post_id} уже помечен как удаленный.", reply_markup=None)
             else:
                  # Показываем сообщение об отмене и, возможно, возвращаем клавиатуру управления
                  # Для простоты, вернемся к сообщению об отмене без перерисовки полного поста
                  # Если бы у нас был шаблон для отображения поста, мы бы вызвали его здесь
                  # For now, just edit the text and remove the confirmation keyboard
-                 await callback.message.edit_text(
+                 await edit_message_text_if_changed(
+                     callback.message,
                      f"✅ Отмена удаления поста ID:{post_id}.",
                      # reply_markup=get_post_management_keyboard(post_id) # Опционально, вернуть клавиатуру управления
                      reply_markup=None # Убираем клавиатуру подтверждения
                  )
         else:
             # Если пост не найден (возможно, он был удален кем-то другим пока шло подтверждение)
-            await callback.message.edit_text(f"ℹ️ Пост ID:{post_id} не найден в базе данных.", reply_markup=None)
+            await edit_message_text_if_changed(callback.message, f"ℹ️ Пост ID:{post_id} не найден в базе данных.", reply_markup=None)
 
     except Exception as e:
         logger.exception(f"Ошибка при обработке отмены удаления поста ID:{post_id}: {e}")
         # Информировать пользователя об ошибке
-        await callback.message.edit_text(f"❌ Произошла ошибка при отмене удаления поста ID:{post_id}.", reply_markup=None)
+        await edit_message_text_if_changed(callback.message, f"❌ Произошла ошибка при отмене удаления поста ID:{post_id}.", reply_markup=None)
 
 
     # Отвечаем на callback query
@@ -170,7 +188,8 @@ async def process_navigate_to_main_menu(
         # отредактировать сообщение с ней.
         # Исходя из reference, главное меню - это ReplyKeyboard.
 
-        await callback.message.edit_text(
+        await edit_message_text_if_changed(
+            callback.message,
             "➡️ **Главное меню**\nВыберите действие на клавиатуре ниже:",
             reply_markup=None # Убираем текущую inline клавиатуру
         )
@@ -180,7 +199,7 @@ async def process_navigate_to_main_menu(
 
     except Exception as e:
         logger.exception(f"Ошибка при навигации пользователя {user_id} в главное меню: {e}")
-        await callback.message.edit_text("❌ Произошла ошибка при переходе в главное меню.")
+        await edit_message_text_if_changed(callback.message, "❌ Произошла ошибка при переходе в главное меню.")
 
     # Отвечаем на callback query
     await callback.answer("Переход в главное меню")
@@ -1,5 +1,6 @@
 # handlers/post_creation.py
 
+import asyncio
 import logging
 import os
 import datetime
@@ -24,7 +25,13 @@ from keyboards.reply_keyboards import (
     get_confirm_content_keyboard,
     get_channel_selection_controls_keyboard,
     get_cancel_keyboard,
-    get_main_menu_keyboard # Import main menu keyboard for cancel
+    get_main_menu_keyboard, # Import main menu keyboard for cancel
+    ADD_MEDIA_BUTTON_TEXT,
+    SKIP_BUTTON_TEXT,
+    NEXT_BUTTON_TEXT,
+    EDIT_CONTENT_BUTTON_TEXT,
+    DONE_BUTTON_TEXT,
+    CANCEL_BUTTON_TEXT,
 )
 from keyboards.inline_keyboards import (
     PostCallbackData,
@@ -47,7 +54,7 @@ from services.scheduler import schedule_post_publication, reschedule_post_public
 from services.content_manager import validate_post_text, prepare_input_media_list, ensure_media_temp_dir_exists, MAX_POST_TEXT_LENGTH, MAX_MEDIA_GROUP_CAPTION_LENGTH # Import constants
 from services.telegram_api import send_post_content, get_bot_channels_for_user, delete_telegram_messages
 from utils.validators import validate_datetime, parse_time
-from utils.datetime_utils import get_user_timezone # Assuming this util exists for timezone handling
+from utils.datetime_utils import get_user_timezone, WEEKDAY_SHORT_NAMES # Assuming this util exists for timezone handling
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -55,6 +62,15 @@ logger = logging.getLogger(__name__)
 # Constants
 TEMP_MEDIA_DIR = 'temp_media' # Directory to save temporary media files during creation
 MAX_MEDIA_PER_POST = 10 # Telegram limit for media groups is 10
+# Типы InputMedia для повторной отправки медиа предпросмотра по сохранённому file_id
+_PREVIEW_INPUT_MEDIA_TYPES = {'photo': InputMediaPhoto, 'video': InputMediaVideo, 'document': InputMediaDocument}
+# Таблица видов медиа в сообщении: (вид, получение объекта файла, расширение по умолчанию).
+# Одна таблица вместо цепочек if/elif по message.photo/video/document; для фото берётся самый большой размер.
+_MESSAGE_MEDIA_GETTERS = (
+    ('photo', lambda m: m.photo[-1] if m.photo else None, 'jpg'),
+    ('video', lambda m: m.video, 'mp4'),
+    ('document', lambda m: m.document, None), # Расширение документа берется из имени файла / MIME
+)
 # POST_PREVIEW_CAPTION_LIMIT = 1024 # Caption limit, already imported
 
 # Ensure temp media directory exists on startup (or application init)
@@ -64,14 +80,20 @@ MAX_MEDIA_PER_POST = 10 # Telegram limit for media groups is 10
 
 # Router instance
 router = Router()
+# Роутер подключается первым, поэтому все callback'и проходят через его обработчики. Префиксы всех
+# CallbackData, на которые фильтруют обработчики модуля, проверяются одним startswith на уровне
+# роутера - чужие callback'и отсекаются до разбора callback_data в фильтре каждого обработчика.
+_CALLBACK_PREFIXES = tuple(
+    f"{cb.__prefix__}{cb.__separator__}"
+    for cb in (PostCallbackData, SelectionCallbackData, NavigationCallbackData, GeneralCallbackData)
+)
+router.callback_query.filter(F.data.startswith(_CALLBACK_PREFIXES))
 
 
 # --- Helper Functions ---
 
-async def _delete_temp_media_files(media_paths: Optional[List[str]]) -> None:
-    """Deletes temporary media files."""
-    if not media_paths:
-         return
+def _delete_temp_media_files_sync(media_paths: List[str]) -> None:
+    """Deletes temporary media files (blocking file system calls, run in a worker thread)."""
     for path in media_paths:
         # Basic check to prevent deleting non-temp files accidentally
         if path and isinstance(path, str) and path.startswith(TEMP_MEDIA_DIR + os.sep) and os.path.exists(path):
@@ -86,6 +108,15 @@ async def _delete_temp_media_files(media_paths: Optional[List[str]]) -> None:
              logger.warning(f"Skipping deletion of invalid path type: {type(path).__name__} - {path}")
 
 
+async def _delete_temp_media_files(media_paths: Optional[List[str]]) -> None:
+    """Deletes temporary media files without blocking the event loop."""
+    if not media_paths:
+         return
+    # os.path.exists/os.remove are blocking calls; on a slow disk a post with 10 files
+    # would stall every other update, so the deletion runs in the default thread pool.
+    await asyncio.to_thread(_delete_temp_media_files_sync, list(media_paths))
+
+
 async def _delete_messages_from_state(bot: Bot, chat_id: int, state: FSMContext, keys_to_delete: List[str]) -> None:
     """Helper to delete messages whose IDs are stored in state keys."""
     state_data = await state.get_data()
@@ -117,8 +148,51 @@ async def _delete_messages_from_state(bot: Bot, chat_id: int, state: FSMContext,
          logger.debug(f"No messages to delete for user {chat_id} from specified state keys: {keys_to_delete}")
 
 
-async def _send_post_preview(bot: Bot, chat_id: int, state_data: Dict[str, Any]) -> Message:
-    """Sends a preview of the post to the user."""
+def _build_cached_preview_media(media_paths: List[str], cached_file_ids: Dict[str, List[str]]) -> Optional[List[Any]]:
+    """
+    Builds InputMedia objects from Telegram file_ids saved after a previous preview.
+    Returns None if at least one file has no cached file_id (then the files are uploaded again).
+    """
+    if not media_paths or not cached_file_ids:
+        return None
+    input_media = []
+    for path in media_paths:
+        cached = cached_file_ids.get(path)
+        media_cls = _PREVIEW_INPUT_MEDIA_TYPES.get(cached[0]) if cached else None
+        if media_cls is None:
+            return None
+        input_media.append(media_cls(media=cached[1]))
+    return input_media
+
+
+def _get_message_media(message: Message) -> Optional[Tuple[str, Any, Optional[str]]]:
+    """Returns (media_kind, file object, default extension) for the first media found in the message, or None."""
+    for media_kind, get_media, default_extension in _MESSAGE_MEDIA_GETTERS:
+        media = get_media(message)
+        if media is not None:
+            return media_kind, media, default_extension
+    return None
+
+
+def _extract_media_file_ids(sent_messages: List[Message], media_paths: List[str]) -> Dict[str, List[str]]:
+    """Maps uploaded local media paths to [media_kind, file_id] from the messages Telegram returned."""
+    uploaded = []
+    for sent in sent_messages:
+        sent_media = _get_message_media(sent)
+        if sent_media is not None:
+            uploaded.append([sent_media[0], sent_media[1].file_id])
+    # Сопоставляем только если Telegram вернул ровно по одному сообщению с медиа на каждый файл
+    if len(uploaded) != len(media_paths):
+        return {}
+    return dict(zip(media_paths, uploaded))
+
+
+async def _send_post_preview(bot: Bot, chat_id: int, state_data: Dict[str, Any], state: Optional[FSMContext] = None) -> Message:
+    """
+    Sends a preview of the post to the user.
+    Media files are uploaded only for the first preview: their Telegram file_ids are saved
+    to FSM data (if state is given) and reused for later previews of the same files.
+    """
     text = state_data.get('text')
     media_paths = state_data.get('media_paths', [])
     selected_channel_ids = set(state_data.get('selected_channel_ids', [])) # Ensure it's a set for display
@@ -173,12 +247,8 @@ async def _send_post_preview(bot: Bot, chat_id: int, state_data: Dict[str, Any])
             schedule_summary += f"Ежедневно в {escape_md(time_str)}"
         elif cron_type == 'weekly':
             days = schedule_params.get('days_of_week', [])
-            day_names = {
-                'mon': 'Пн', 'tue': 'Вт', 'wed': 'Ср', 'thu': 'Чт',
-                'fri': 'Пт', 'sat': 'Сб', 'sun': 'Вс'
-            }
             # Escape day names in case they contain markdown characters (unlikely for these names)
-            formatted_days = ", ".join([escape_md(day_names.get(d, d)) for d in days])
+            formatted_days = ", ".join([escape_md(WEEKDAY_SHORT_NAMES.get(d, d)) for d in days])
             schedule_summary += f"Еженедельно по {formatted_days} в {escape_md(time_str)}"
         elif cron_type == 'monthly':
             day = schedule_params.get('day_of_month', markdown_italic('Не указан'))
@@ -221,7 +291,11 @@ async def _send_post_preview(bot: Bot, chat_id: int, state_data: Dict[str, Any])
     # Prepare media for sending. send_post_content handles logic for media groups vs single media.
     # Note: prepare_input_media_list returns InputMedia objects, potentially using FSInputFile.
     # File handles for FSInputFile are managed by aiogram after passing them.
-    input_media = prepare_input_media_list(media_paths)
+    cached_file_ids = state_data.get('preview_media_file_ids') or {}
+    input_media = _build_cached_preview_media(media_paths, cached_file_ids)
+    uploading_files = input_media is None
+    if uploading_files:
+        input_media = prepare_input_media_list(media_paths)
 
     # send_post_content expects the main text for caption/message.
     # We pass the final_preview_text as the main text/caption for the preview message.
@@ -251,6 +325,12 @@ async def _send_post_preview(bot: Bot, chat_id: int, state_data: Dict[str, Any])
         raise RuntimeError("Failed to send post preview.") # Raise custom error type
 
 
+    if uploading_files and media_paths and state is not None:
+        # Запоминаем file_id загруженных файлов, чтобы не загружать их повторно при следующем превью
+        new_file_ids = _extract_media_file_ids(sent_messages, media_paths)
+        if new_file_ids:
+            await state.update_data(preview_media_file_ids=new_file_ids)
+
     # Note on file handles: Using FSInputFile means aiogram should handle closing.
     # Explicit manual closing here after send_post_content might interfere or be redundant.
     # If issues arise with file handles staying open, investigate aiogram's lifecycle or use manual closing with care.
@@ -299,7 +379,7 @@ async def process_text_input_invalid(message: Message) -> None:
         parse_mode="MarkdownV2"
     )
 
-@router.message(PostCreationStates.waiting_for_media_option, F.text == "Добавить медиа")
+@router.message(PostCreationStates.waiting_for_media_option, F.text == ADD_MEDIA_BUTTON_TEXT)
 async def process_add_media_option(message: Message, state: FSMContext) -> None:
     """Handles 'Добавить медиа' option."""
     await state.set_state(PostCreationStates.waiting_for_media_files)
@@ -317,7 +397,7 @@ async def process_add_media_option(message: Message, state: FSMContext) -> None:
         parse_mode="MarkdownV2"
     )
 
-@router.message(PostCreationStates.waiting_for_media_option, F.text == "Пропустить")
+@router.message(PostCreationStates.waiting_for_media_option, F.text == SKIP_BUTTON_TEXT)
 async def process_skip_media_option(message: Message, state: FSMContext) -> None:
     """Handles 'Пропустить' option in waiting_for_media_option state."""
     state_data = await state.get_data()
@@ -362,7 +442,7 @@ async def process_skip_media_option(message: Message, state: FSMContext) -> None
 
         # Re-fetch state data as it might have been updated
         state_data = await state.get_data()
-        preview_message = await _send_post_preview(message.bot, message.chat.id, state_data)
+        preview_message = await _send_post_preview(message.bot, message.chat.id, state_data, state)
         await state.update_data(preview_message_id=preview_message.message_id) # Store new message ID
 
         await message.answer(
@@ -412,25 +492,8 @@ async def process_media_files(message: Message, state: FSMContext) -> None:
         return
 
     # Determine file_id and file_ref based on media type
-    file_id = None
-    file_ref = None
-    file_extension = None
-
-    if message.photo:
-        # Get the largest photo
-        file_id = message.photo[-1].file_id
-        file_ref = message.photo[-1].file_unique_id
-        file_extension = 'jpg' # Default extension, Telegram handles various photo formats
-    elif message.video:
-        file_id = message.video.file_id
-        file_ref = message.video.file_unique_id
-        file_extension = 'mp4' # Default extension, Telegram handles various video formats
-    elif message.document:
-        file_id = message.document.file_id
-        file_ref = message.document.file_unique_id
-        # Use original file extension if available, otherwise guess from mime_type or default
-        file_extension = message.document.file_name.split('.')[-1] if message.document.file_name else message.document.mime_type.split('/')[-1] if message.document.mime_type else 'bin'
-    else:
+    message_media = _get_message_media(message)
+    if message_media is None:
         # Should not happen due to filter, but good practice
         await message.answer(
             "Пожалуйста, отправьте фото, видео или документ\\.",
@@ -438,6 +501,13 @@ async def process_media_files(message: Message, state: FSMContext) -> None:
         )
         return
 
+    _, media, file_extension = message_media
+    file_id = media.file_id
+    file_ref = media.file_unique_id
+    if file_extension is None:
+        # Use original file extension if available, otherwise guess from mime_type or default
+        file_extension = media.file_name.split('.')[-1] if media.file_name else media.mime_type.split('/')[-1] if media.mime_type else 'bin'
+
     # Construct a temporary file path using user ID and unique file ID
     # ensure_media_temp_dir_exists should be called on app startup.
     # For robustness, could check here, but relies on startup setup.
@@ -468,7 +538,7 @@ async def process_media_files(message: Message, state: FSMContext) -> None:
              # Attempt to clean up the potentially empty file
              if os.path.exists(temp_file_path):
                  try: os.remove(temp_file_path)
-                 except: pass
+                 except OSError: pass
              return
 
         # You might want to apply a watermark here for images
@@ -519,10 +589,10 @@ async def process_media_files(message: Message, state: FSMContext) -> None:
         # Attempt to clean up the partially downloaded file
         if os.path.exists(temp_file_path):
             try: os.remove(temp_file_path)
-            except: pass
+            except OSError: pass
 
 
-@router.message(PostCreationStates.waiting_for_media_files, F.text == "Пропустить")
+@router.message(PostCreationStates.waiting_for_media_files, F.text == SKIP_BUTTON_TEXT)
 async def process_done_adding_media(message: Message, state: FSMContext) -> None:
     """Handles 'Пропустить' button in waiting_for_media_files state (meaning 'Done')."""
     state_data = await state.get_data()
@@ -570,7 +640,7 @@ async def process_done_adding_media(message: Message, state: FSMContext) -> None
 
         # Re-fetch state data as it might have been updated
         state_data = await state.get_data()
-        preview_message = await _send_post_preview(message.bot, message.chat.id, state_data)
+        preview_message = await _send_post_preview(message.bot, message.chat.id, state_data, state)
         await state.update_data(preview_message_id=preview_message.message_id) # Store new message ID
 
         await message.answer(
@@ -608,7 +678,7 @@ async def process_media_files_invalid(message: Message) -> None:
 # This state is reached after adding text and optionally media.
 # User interacts via ReplyKeyboard.
 
-@router.message(PostCreationStates.confirm_content_before_channels, F.text == "✅ Далее")
+@router.message(PostCreationStates.confirm_content_before_channels, F.text == NEXT_BUTTON_TEXT)
 async def process_confirm_content_next(message: Message, state: FSMContext, bot: Bot) -> None:
     """Handles '✅ Далее' button from content confirmation."""
     logger.info(f"User {message.from_user.id} confirmed content. Moving to channel selection.")
@@ -695,7 +765,7 @@ async def process_confirm_content_next(message: Message, state: FSMContext, bot:
         await _delete_messages_from_state(bot, message.chat.id, state_data, ['preview_message_id'])
 
 
-@router.message(PostCreationStates.confirm_content_before_channels, F.text == "✏️ Редактировать контент")
+@router.message(PostCreationStates.confirm_content_before_channels, F.text == EDIT_CONTENT_BUTTON_TEXT)
 async def process_edit_content_option(message: Message, state: FSMContext, bot: Bot) -> None:
     """Handles '✏️ Редактировать контент' button."""
     logger.info(f"User {message.from_user.id} chose to edit content. Returning to text input.")
@@ -738,7 +808,7 @@ async def process_confirm_content_invalid(message: Message) -> None:
 
 # This state handles callbacks from the inline keyboard and text from the reply keyboard.
 
-@router.callback_query(SelectionCallbackData.filter(F.action_prefix == "toggle_channel"), PostCreationStates.waiting_for_channel_selection_action)
+@router.callback_query(PostCreationStates.waiting_for_channel_selection_action, SelectionCallbackData.filter(F.action_prefix == "toggle_channel"))
 async def process_toggle_channel_callback(callback: CallbackQuery, callback_data: SelectionCallbackData, state: FSMContext) -> None:
     """Handles toggling channel selection via inline keyboard."""
     state_data = await state.get_data()
@@ -777,7 +847,7 @@ async def process_toggle_channel_callback(callback: CallbackQuery, callback_data
 
 
 # Handle 'Готово' from ReplyKB
-@router.message(PostCreationStates.waiting_for_channel_selection_action, F.text == "Готово")
+@router.message(PostCreationStates.waiting_for_channel_selection_action, F.text == DONE_BUTTON_TEXT)
 async def process_done_channel_selection_reply(message: Message, state: FSMContext, bot: Bot) -> None:
     """Handles 'Готово' from reply keyboard after channel selection."""
     await process_done_channel_selection(message, state, bot)
@@ -836,7 +906,7 @@ async def process_done_channel_selection(message: Message, state: FSMContext, bo
 
 
 # Handle 'Отменить' from ReplyKB
-@router.message(PostCreationStates.waiting_for_channel_selection_action, F.text == "❌ Отменить")
+@router.message(PostCreationStates.waiting_for_channel_selection_action, F.text == CANCEL_BUTTON_TEXT)
 async def process_cancel_channel_selection_reply(message: Message, state: FSMContext, bot: Bot) -> None:
     """Handles 'Отменить' from reply keyboard during channel selection."""
     await process_cancel_creation(message, state, bot) # Use specific cancel handler
@@ -1,11 +1,14 @@
 # handlers/post_management.py
 
+import asyncio
+import functools
 import logging
-from typing import List, Dict, Any, Union, Optional, Set
+from typing import List, Dict, Any, Union, Optional, Set, Tuple
 import datetime
 from aiogram import Router, F, Bot
 from aiogram.filters import Command, CommandObject, StateFilter
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from aiogram.utils.markdown import markdown_italic, markdown_bold # For formatting help text
@@ -22,9 +25,12 @@ from aiogram.utils.markdown import markdown_italic, markdown_bold # For formatti
 # from .post_management_fsm_states import PostManagementStates
 # from .post_creation_fsm_states import PostCreationStates
 
+# Общая константа - вне блока try ниже, у нее нет заглушки
+from utils.datetime_utils import WEEKDAY_SHORT_NAMES
+
 # Корректные импорты:
 try:
-    from services.db import get_user_posts, get_post_by_id
+    from services.db import get_user_posts_page, get_post_by_id, get_user_post
     from keyboards.inline_keyboards import (
         get_post_management_keyboard,
         get_edit_section_keyboard,
@@ -81,8 +87,9 @@ except ImportError as e:
         def __repr__(self):
              return f"<MockPost id={getattr(self, 'id', 'N/A')}>"
 
-    async def get_user_posts(session, user_id, statuses=None): return []
+    async def get_user_posts_page(session, telegram_user_id, limit, offset=0, statuses=None): return [], 0
     async def get_post_by_id(session, post_id): return None
+    async def get_user_post(session, post_id, telegram_user_id): return None
     def get_post_management_keyboard(post_id): return None
     def get_edit_section_keyboard(draft_id=None): return None
     def get_delete_confirmation_keyboard(item_type, item_id, context_id=None): return None
@@ -105,6 +112,10 @@ logger = logging.getLogger(__name__)
 
 # Router instance
 post_management_router = Router()
+# Callback'и этого роутера - только PostCallbackData и NavigationCallbackData: чужие отсекаются
+# проверкой префикса один раз на роутер (см. handlers/inline_buttons.py).
+_CALLBACK_PREFIXES = tuple(f"{cb.__prefix__}{cb.__separator__}" for cb in (PostCallbackData, NavigationCallbackData))
+post_management_router.callback_query.filter(F.data.startswith(_CALLBACK_PREFIXES))
 
 # Define allowed editing sections and their corresponding initial creation states
 EDIT_SECTIONS_MAP = {
@@ -113,6 +124,17 @@ EDIT_SECTIONS_MAP = {
     "schedule": PostCreationStates.waiting_for_schedule_type,
     "deletion": PostCreationStates.waiting_for_deletion_option,
 }
+# Количество постов на одной странице списка /myposts
+POSTS_PAGE_SIZE = 10
+# Сколько готовых клавиатур "Показать ещё" (по одной на смещение) держать в кэше
+POSTS_MORE_KEYBOARD_CACHE_SIZE = 256
+# Клавиатура управления постом зависит только от его ID: в списке /myposts (повторный показ, "Показать ещё")
+# разметка с упакованными callback_data строится один раз на пост. Объекты общие - не изменять.
+POST_MANAGEMENT_KEYBOARD_CACHE_SIZE = 1024
+_get_post_management_keyboard = functools.lru_cache(maxsize=POST_MANAGEMENT_KEYBOARD_CACHE_SIZE)(get_post_management_keyboard)
+# Статусы постов, которые показываются в списке для управления
+MANAGEABLE_POST_STATUSES = ["scheduled", "sent", "error", "deletion_failed"]
+
 # Mapping from section key to display name for user messages
 EDIT_SECTIONS_NAMES = {
     "content": "Контент",
@@ -121,6 +143,17 @@ EDIT_SECTIONS_NAMES = {
     "deletion": "Удаление",
 }
 
+# Отображаемые названия статусов постов (строятся один раз при импорте модуля)
+POST_STATUS_NAMES = {
+    "scheduled": "✅ Запланирован",
+    "sent": "🟢 Отправлен",
+    "deleted": "🗑️ Удален",
+    "error": "❌ Ошибка",
+    "canceleduuid": "🆑 Отменен", # Example custom status
+    "deletion_failed": "⚠️ Ошибка удаления"
+    # Add other statuses as needed
+}
+
 
 # --- Helper Functions ---
 
@@ -129,41 +162,38 @@ async def _format_post_for_display(post: Post, user_timezone: str) -> str:
     Formats a Post object into a human-readable string for display to the user.
     Uses MarkdownV2 formatting.
     """
-    status_map = {
-        "scheduled": "✅ Запланирован",
-        "sent": "🟢 Отправлен",
-        "deleted": "🗑️ Удален",
-        "error": "❌ Ошибка",
-        "canceleduuid": "🆑 Отменен", # Example custom status
-        "deletion_failed": "⚠️ Ошибка удаления"
-        # Add other statuses as needed
-    }
-    status = status_map.get(post.status, post.status)
-
-    text_summary = post.text[:150].replace('_', '\\_').replace('*', '\\*').replace('[', '\$$
-').replace(']', '\
-$$').replace('(', '\$').replace(')', '\$').replace('~', '\\~').replace('`', '\\`').replace('>', '\\>').replace('#', '\\#').replace('+', '\\+').replace('-', '\\-').replace('=', '\\=').replace('|', '\\|').replace('{', '\\{').replace('}', '\\}').replace('.', '\\.').replace('!', '\\!') + '...' if post.text and len(post.text) > 150 else (post.text.replace('_', '\\_').replace('*', '\\*') if post.text else "Нет текста") # Basic MarkdownV2 escape
-    media_summary = f"🖼️ Медиа: {len(post.media_paths or [])} файл(ов)" if post.media_paths else "🖼️ Медиа: Нет"
+    # Атрибуты ORM-объекта читаются через дескрипторы SQLAlchemy - берем каждый один раз в локальные переменные
+    status = POST_STATUS_NAMES.get(post.status, post.status)
+    post_text = post.text
+    media_paths = post.media_paths
+    schedule_params = post.schedule_params
+    delete_after_seconds = post.delete_after_seconds
+
+    if post_text:
+        # Экранируем текст за один проход (str.translate) и обрезаем длинный текст для списка
+        text_summary = escape_markdown_v2(post_text[:150]) + ('\\.\\.\\.' if len(post_text) > 150 else '')
+    else:
+        text_summary = "Нет текста"
+    media_summary = f"🖼️ Медиа: {len(media_paths)} файл(ов)" if media_paths else "🖼️ Медиа: Нет"
 
     schedule_summary = ""
     if post.schedule_type == 'one_time' and post.run_date:
         formatted_date = format_datetime(post.run_date, user_timezone) or 'Некорректное время'
         schedule_summary = f"⏰ Разово: {formatted_date}"
-    elif post.schedule_type == 'recurring' and post.schedule_params:
-        cron_type = post.schedule_params.get('type', 'Неизвестно')
-        time_str = post.schedule_params.get('time', 'Не указано')
+    elif post.schedule_type == 'recurring' and schedule_params:
+        cron_type = schedule_params.get('type', 'Неизвестно')
+        time_str = schedule_params.get('time', 'Не указано')
         if cron_type == 'daily':
             schedule_summary = f"⏰ Ежедневно в {time_str}"
         elif cron_type == 'weekly':
-            days = post.schedule_params.get('days_of_week', [])
-            day_names = {'mon': 'Пн', 'tue': 'Вт', 'wed': 'Ср', 'thu': 'Чт', 'fri': 'Пт', 'sat': 'Сб', 'sun': 'Вс'}
-            formatted_days = ", ".join([day_names.get(d, d) for d in days])
+            days = schedule_params.get('days_of_week', [])
+            formatted_days = ", ".join([WEEKDAY_SHORT_NAMES.get(d, d) for d in days])
             schedule_summary = f"⏰ Еженедельно по {formatted_days} в {time_str}"
         elif cron_type == 'monthly':
-            day = post.schedule_params.get('day_of_month', 'Не указан')
+            day = schedule_params.get('day_of_month', 'Не указан')
             schedule_summary = f"⏰ Ежемесячно {day}-го числа в {time_str}"
         elif cron_type == 'yearly':
-             month_day = post.schedule_params.get('month_day', 'Не указано')
+             month_day = schedule_params.get('month_day', 'Не указано')
              schedule_summary = f"⏰ Ежегодно {month_day} в {time_str}"
         else:
             schedule_summary = f"⏰ Циклически ({cron_type})"
@@ -171,26 +201,18 @@ $$').replace('(', '\$').replace(')', '\$').replace('~', '\\~').replace('`', '\\`
         schedule_summary = "⏰ Расписание: Не настроено" # Should not happen for scheduled/sent posts
 
     deletion_summary = "🗑️ Автоудаление: Не настроено"
-    if post.delete_after_seconds is not None and post.delete_after_seconds > 0:
+    if delete_after_seconds is not None and delete_after_seconds > 0:
         # Convert seconds back to readable format for display
-        if post.delete_after_seconds % (24 * 3600) == 0:
-             days = post.delete_after_seconds // (24 * 3600)
+        if delete_after_seconds % (24 * 3600) == 0:
+             days = delete_after_seconds // (24 * 3600)
              deletion_summary = f"🗑️ Удалить через {days} дн."
-        elif post.delete_after_seconds % 3600 == 0:
-             hours = post.delete_after_seconds // 3600
+        elif delete_after_seconds % 3600 == 0:
+             hours = delete_after_seconds // 3600
              deletion_summary = f"🗑️ Удалить через {hours} ч."
         else:
              # Fallback to seconds if not whole days/hours
-             deletion_summary = f"🗑️ Удалить через {post.delete_after_seconds} сек."
-
+             deletion_summary = f"🗑️ Удалить через {delete_after_seconds} сек."
 
-    # Escape MarkdownV2 special characters in all text fields
-    def escape_markdown_v2(text: str) -> str:
-        if not isinstance(text, str):
-            return ""
-        # List of characters to escape: _, *, [, ], (, ), ~, `, >, #, +, -, =, |, {, }, ., !
-        escape_chars = r'_*[]()~`>#+-=|{}.!'
-        return ''.join(['\\' + char if char in escape_chars else char for char in text])
 
     # Apply escaping *only* to user-provided text that isn't part of formatting
     # For this formatted string, we use MarkdownV2 directly, so we escape content *within* formatting.
@@ -288,11 +310,11 @@ async def handle_edit_post_command(
 
     logger.info(f"User {user_id} requested to edit post ID:{post_id}, section: {section} via command.")
 
-    # Fetch the post from the database
-    post = await get_post_by_id(session, post_id)
+    # Fetch the post from the database (only if owned by the user, single query)
+    post = await get_user_post(session, post_id, user_id)
 
     # Check if post exists and belongs to the user
-    if not post or post.user_id != user_id:
+    if not post:
         await message.answer(
             f"Пост с ID `{post_id}` не найден или вы не имеете к нему доступа\\.",
             parse_mode="MarkdownV2",
@@ -429,12 +451,12 @@ async def handle_delete_post_command(
     logger.info(f"User {user_id} requested to delete post ID:{post_id} via command.")
 
     # Fetch the post to check existence and ownership
-    post = await get_post_by_id(session, post_id)
+    post = await get_user_post(session, post_id, user_id)
 
     # Check if post exists and belongs to the user
     # Also check if it's already deleted or in an unmanageable state?
     # For simplicity, allow requesting deletion of any non-deleted post owned by the user.
-    if not post or post.user_id != user_id or post.status == 'deleted':
+    if not post or post.status == 'deleted':
         status_info = f" (статус: {post.status})" if post else ""
         await message.answer(
             f"Пост с ID `{post_id}` не найден, вы не имеете к нему доступа или он уже удален{status_info}\\.",
@@ -465,6 +487,67 @@ async def handle_delete_post_command(
     )
 
 
+async def _fetch_user_posts_page(session: AsyncSession, user_id: int, offset: int) -> Tuple[List[Any], int]:
+    """Fetches one page of the user's manageable posts and their total count."""
+    # Страница и общее количество постов приходят одним запросом (оконный COUNT)
+    return await get_user_posts_page(
+        session, user_id, limit=POSTS_PAGE_SIZE, offset=offset, statuses=MANAGEABLE_POST_STATUSES
+    )
+
+
+@functools.lru_cache(maxsize=POSTS_MORE_KEYBOARD_CACHE_SIZE)
+def _get_posts_list_more_keyboard(next_offset: int) -> InlineKeyboardMarkup:
+    """
+    Creates the "show more" keyboard for the /myposts list.
+    The markup depends only on the offset, so it is built once per offset and shared
+    (the returned object must not be modified).
+    """
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="➡️ Показать ещё",
+        callback_data=PostCallbackData(action="list_page", value=str(next_offset))
+    )
+    return builder.as_markup()
+
+
+async def _send_user_posts_page(
+    message: Message,
+    session: AsyncSession,
+    user_id: int,
+    user_timezone: str,
+    offset: int,
+    announce_total: bool = False,
+    page: Optional[Tuple[List[Any], int]] = None
+) -> int:
+    """
+    Sends one page of the user's manageable posts (each with its management keyboard)
+    followed by a "show more" button if there are more posts after this page.
+    If announce_total is set, the page is preceded by a "found N posts" message.
+    A page already fetched by the caller (_fetch_user_posts_page) can be passed as `page`.
+
+    Returns:
+        The total number of the user's manageable posts (0 if there are none).
+    """
+    posts, total_posts = page if page is not None else await _fetch_user_posts_page(session, user_id, offset)
+    if announce_total and total_posts:
+        await message.answer(f"Найдено {total_posts} постов:", reply_markup=None) # Initial message, remove ReplyKeyboard
+
+    for post in posts:
+        post_text = await _format_post_for_display(post, user_timezone)
+        # Send each post with its management keyboard
+        await message.answer(
+            post_text,
+            reply_markup=_get_post_management_keyboard(post.id),
+            parse_mode="MarkdownV2" # Use Markdown for formatted text
+        )
+
+    next_offset = offset + len(posts)
+    if posts and next_offset < total_posts:
+        await message.answer("Показаны не все посты.", reply_markup=_get_posts_list_more_keyboard(next_offset))
+
+    return total_posts
+
+
 # --- State Handlers ---
 
 # Handler for the initial message triggering the showing_list state
@@ -489,28 +572,14 @@ async def handle_show_user_posts(
     # Get user's timezone for formatting
     user_timezone = get_user_timezone(user_id)
 
-    # Fetch user's scheduled and sent posts
-    # Consider statuses that might need management: scheduled, sent, error, deletion_failed
-    manageable_statuses = ["scheduled", "sent", "error", "deletion_failed"]
-    posts = await get_user_posts(session, user_id, statuses=manageable_statuses)
+    # Fetch and send the first page of user's scheduled and sent posts (with inline keyboards)
+    total_posts = await _send_user_posts_page(message, session, user_id, user_timezone, offset=0, announce_total=True)
 
-    if not posts:
+    if not total_posts:
         await message.answer("У вас нет запланированных или отправленных постов для управления.", reply_markup=get_main_menu_keyboard())
         await state.clear() # Clear state if no posts to manage
         return
 
-    # Send posts with inline keyboards
-    await message.answer(f"Найдено {len(posts)} постов:", reply_markup=None) # Initial message, remove ReplyKeyboard
-
-    for post in posts:
-        post_text = await _format_post_for_display(post, user_timezone)
-        # Send each post with its management keyboard
-        await message.answer(
-            post_text,
-            reply_markup=get_post_management_keyboard(post.id),
-            parse_mode="MarkdownV2" # Use Markdown for formatted text
-        )
-
     # Stay in showing_list state, waiting for inline button callbacks
     # Subsequent non-command messages in this state might need a handler
     # to prompt the user to use buttons or the command again.
@@ -530,8 +599,42 @@ async def handle_showing_list_invalid_input(message: Message) -> None:
     )
 
 
+# Handler for inline 'Показать ещё' button when viewing list
+@post_management_router.callback_query(StateFilter(PostManagementStates.showing_list), PostCallbackData.filter(F.action == "list_page"))
+async def process_list_page_callback(
+    callback: CallbackQuery,
+    callback_data: PostCallbackData,
+    session: AsyncSession # Inject database session
+) -> None:
+    """
+    Handles inline button click to show the next page of the user's posts.
+    """
+    user_id = callback.from_user.id
+    try:
+        offset = max(int(callback_data.value or 0), 0)
+    except ValueError:
+        await callback.answer("Ошибка: Некорректная страница\\.", show_alert=True)
+        return
+
+    async def _delete_show_more_message() -> None:
+        # Убираем кнопку "Показать ещё" с предыдущей страницы
+        try:
+            await callback.message.delete()
+        except Exception as e:
+            logger.warning(f"Failed to delete 'show more' message for user {user_id}: {e}")
+
+    # Ответ на callback, удаление старой кнопки и выборка страницы независимы -
+    # выполняем их одним параллельным раундом вместо трех последовательных.
+    _, _, page = await asyncio.gather(
+        callback.answer(),
+        _delete_show_more_message(),
+        _fetch_user_posts_page(session, user_id, offset),
+    )
+    await _send_user_posts_page(callback.message, session, user_id, get_user_timezone(user_id), offset=offset, page=page)
+
+
 # Handler for inline 'Редактировать' button when viewing list
-@post_management_router.callback_query(PostCallbackData.filter(F.action == "edit_published_post"), StateFilter(PostManagementStates.showing_list))
+@post_management_router.callback_query(StateFilter(PostManagementStates.showing_list), PostCallbackData.filter(F.action == "edit_published_post"))
 async def process_edit_published_post_callback(
     callback: CallbackQuery,
     callback_data: PostCallbackData,
@@ -553,9 +656,9 @@ async def process_edit_published_post_callback(
     logger.info(f"User {user_id} requested to edit post ID:{post_id} via inline button.")
 
     # Fetch the post
-    post = await get_post_by_id(session, post_id)
+    post = await get_user_post(session, post_id, user_id)
 
-    if not post or post.user_id != user_id or post.status == 'deleted':
+    if not post or post.status == 'deleted':
         status_info = f" (статус: {post.status})" if post else ""
         logger.warning(f"Edit requested for non-existent, unauthorized, or deleted post ID:{post_id} by user {user_id}.")
         await callback.answer(f"Пост не найден, вы не имеете к нему доступа или он уже удален{status_info}\\.", show_alert=True)
@@ -593,7 +696,7 @@ async def process_edit_published_post_callback(
 
 
 # Handler for inline 'Удалить' button when viewing list
-@post_management_router.callback_query(PostCallbackData.filter(F.action == "request_delete_post"), StateFilter(PostManagementStates.showing_list))
+@post_management_router.callback_query(StateFilter(PostManagementStates.showing_list), PostCallbackData.filter(F.action == "request_delete_post"))
 async def process_request_delete_post_callback(
     callback: CallbackQuery,
     callback_data: PostCallbackData,
@@ -619,9 +722,9 @@ async def process_request_delete_post_callback(
          await callback.answer("Ошибка: Некорректный ID поста\\.", show_alert=True)
          return
 
-    post = await get_post_by_id(session, post_id)
+    post = await get_user_post(session, post_id, user_id)
 
-    if not post or post.user_id != user_id or post.status == 'deleted':
+    if not post or post.status == 'deleted':
         status_info = f" (статус: {post.status})" if post else ""
         logger.warning(f"Deletion requested for non-existent, unauthorized, or deleted post ID:{post_id} by user {user_id}.")
         await callback.answer(f"Пост не найден, вы не имеете к нему доступа или он уже удален{status_info}\\.", show_alert=True)
@@ -676,7 +779,7 @@ async def handle_editing_section_selection_invalid_input(message: Message) -> No
     )
 
 # Handler for inline 'edit_section' callback when in editing selection state
-@post_management_router.callback_query(PostCallbackData.filter(F.action == "edit_section"), StateFilter(PostManagementStates.editing_section_selection))
+@post_management_router.callback_query(StateFilter(PostManagementStates.editing_section_selection), PostCallbackData.filter(F.action == "edit_section"))
 async def process_edit_section_callback(
     callback: CallbackQuery,
     callback_data: PostCallbackData,
@@ -814,7 +917,6 @@ async def process_edit_section_callback(
 # Handler for 'Back' navigation from within PostCreationStates back to PostManagementStates.editing_section_selection
 # This handler covers most states navigated to from editing_section_selection.
 @post_management_router.callback_query(
-    NavigationCallbackData.filter(F.target == "editing_selection_state"),
     StateFilter(
         PostCreationStates.waiting_for_text,
         PostCreationStates.waiting_for_media_option, # Might be reachable if text editing leads here
@@ -835,7 +937,8 @@ async def process_edit_section_callback(
         PostCreationStates.waiting_for_delete_days,
         PostCreationStates.waiting_for_delete_datetime,
         PostCreationStates.preview_and_confirm # Back from preview after editing sections
-    )
+    ),
+    NavigationCallbackData.filter(F.target == "editing_selection_state"),
 )
 async def process_back_to_editing_selection(callback: CallbackQuery, state: FSMContext) -> None:
     """
@@ -902,10 +1005,12 @@ async def handle_unknown_post_management_input(message: Message, state: FSMConte
     )
 
 # Helper function for MarkdownV2 escaping
+# List of characters to escape: _, *, [, ], (, ), ~, `, >, #, +, -, =, |, {, }, ., !
+# Таблица строится один раз; str.translate экранирует все символы за один проход по строке.
+_MARKDOWN_V2_ESCAPE_TABLE = str.maketrans({char: '\\' + char for char in r'_*[]()~`>#+-=|{}.!'})
+
 def escape_markdown_v2(text: str) -> str:
     """Escapes special characters for MarkdownV2."""
     if not isinstance(text, str):
         return ""
-    # List of characters to escape: _, *, [, ], (, ), ~, `, >, #, +, -, =, |, {, }, ., !
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    return ''.join(['\\' + char if char in escape_chars else char for char in text])
+    return text.translate(_MARKDOWN_V2_ESCAPE_TABLE)
@@ -1,13 +1,16 @@
 # handlers/rss_integration.py
 
+import asyncio
+import functools
 import logging
 import os # Might be needed if using local files, but RSS usually uses URLs
-import feedparser # Used in rss_service, but might be useful for initial validation here
-from typing import List, Dict, Any, Set, Optional, Union
+from typing import List, Dict, Any, Set, Optional, Tuple, Union
 
 from aiogram import Router, F, Bot
+from cachetools import TTLCache
 from aiogram.filters import Command, CommandObject, StateFilter
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.fsm.context import FSMContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError # For unique constraint violation
@@ -27,6 +30,7 @@ from keyboards.reply_keyboards import (
     get_main_menu_keyboard,
     get_cancel_keyboard,
     get_channel_selection_controls_keyboard,
+    DONE_BUTTON_TEXT,
 )
 from keyboards.inline_keyboards import (
     GeneralCallbackData,
@@ -47,21 +51,20 @@ from keyboards.inline_keyboards import (
 # Import Services and Utils
 from services.db import (
     AsyncSessionLocal, # Factory for scheduler
-    add_rss_feed,
-    get_user_rss_feeds,
-    get_rss_feed_by_id,
-    delete_rss_feed_by_id,
+    add_user_rss_feed, # Feed INSERT with an in-statement user upsert (one round-trip)
+    get_user_rss_feeds_page_by_telegram_id, # Page of feeds + total, joined with users by telegram_user_id, one query
+    get_user_rss_feed, # Feed by ID with the ownership check in the same query
+    delete_user_rss_feed, # Deletion with the ownership check in the same statement
     update_rss_feed_details, # Needed for editing
-    get_user_by_telegram_id # To get user_id from telegram_user_id if not in state
 )
 from services.scheduler import (
     AsyncIOScheduler, # For type hinting DI
-    # schedule_rss_check, # Assuming this function exists in scheduler.py
+    schedule_rss_check, # Per-feed check job (rss_check_<feed_id>)
     remove_scheduled_job,
+    get_rss_check_job_id,
     # reschedule_rss_check # Assuming this function exists in scheduler.py
 )
 from services.telegram_api import get_bot_channels_for_user # Needed for channel selection
-from services.rss_service import process_all_active_rss_feeds # The task that will be scheduled
 from utils.validators import validate_url # Needed for URL validation
 from utils.datetime_utils import get_user_timezone # Might be needed for display or scheduling context
 
@@ -70,9 +73,24 @@ logger = logging.getLogger(__name__)
 
 # Constants
 DEFAULT_RSS_FREQUENCY_MINUTES = int(os.getenv("RSS_DEFAULT_FREQ", 30)) # Get default from env
+RSS_FEEDS_PAGE_SIZE = 10 # Feeds per /myrss page (one message per feed)
+RSS_LIST_CACHE_TTL_SECONDS = int(os.getenv("RSS_LIST_CACHE_TTL", 30)) # How long a rendered /myrss page is reused
+
+# Отрисованные страницы /myrss: telegram_user_id -> {offset: ([(feed_id, feed_text), ...], total_feeds)}.
+# Повторный /myrss и "Показать ещё" в пределах TTL не ходят в БД и не форматируют ленты заново.
+# Кэш пользователя сбрасывается при сохранении и удалении его лент (_invalidate_rss_list_cache).
+_rss_list_page_cache: TTLCache = TTLCache(maxsize=1024, ttl=RSS_LIST_CACHE_TTL_SECONDS)
 
 # Router instance
 rss_integration_router = Router()
+# Роутер RSS стоит после post_creation и post_management, и callback'и последующих роутеров
+# проходят через все его обработчики. Префиксы его CallbackData проверяются одним startswith,
+# прежде чем фильтр каждого обработчика станет разбирать callback_data (см. handlers/inline_buttons.py).
+_CALLBACK_PREFIXES = tuple(
+    f"{cb.__prefix__}{cb.__separator__}"
+    for cb in (GeneralCallbackData, SelectionCallbackData, NavigationCallbackData, DeleteCallbackData)
+)
+rss_integration_router.callback_query.filter(F.data.startswith(_CALLBACK_PREFIXES))
 
 # --- Helper Functions ---
 
@@ -122,6 +140,14 @@ async def _format_rss_feed_for_display(feed: RssFeed, user_id: int) -> str:
     return display_text.replace('.', '\\.').replace('-', '\\-') # Basic MarkdownV2 escape
 
 # New keyboard functions needed based on Plan
+# Клавиатуры ниже зависят только от аргументов (context_id - это ID пользователя), поэтому
+# готовые разметки кэшируются: повторный показ шага (назад/повторный ввод) не собирает кнопки заново.
+# Возвращаемые объекты общие - их нельзя изменять после получения.
+RSS_KEYBOARD_CACHE_SIZE = 1024
+# Клавиатура ленты в списке /myrss зависит только от ID ленты - кэшируется так же
+_get_rss_feed_item_keyboard = functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)(get_rss_feed_item_keyboard)
+
+@functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)
 def get_filter_keywords_option_keyboard(context_id: Optional[str] = None) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="Ввести фильтры", callback_data=GeneralCallbackData(action="set_filter_option", value="enter", context_id=context_id).pack())
@@ -130,6 +156,7 @@ def get_filter_keywords_option_keyboard(context_id: Optional[str] = None) -> Inl
     builder.adjust(2, 1)
     return builder.as_markup()
 
+@functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)
 def get_frequency_option_keyboard(context_id: Optional[str] = None, default_freq: int = DEFAULT_RSS_FREQUENCY_MINUTES) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text=f"По умолчанию ({default_freq} мин)", callback_data=GeneralCallbackData(action="set_frequency_option", value="default", context_id=context_id).pack())
@@ -138,6 +165,7 @@ def get_frequency_option_keyboard(context_id: Optional[str] = None, default_freq
     builder.adjust(2, 1)
     return builder.as_markup()
 
+@functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)
 def get_confirm_rss_feed_keyboard(context_id: Optional[str] = None, is_editing: bool = False) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(
@@ -169,6 +197,7 @@ def get_confirm_rss_feed_keyboard(context_id: Optional[str] = None, is_editing:
 
     return builder.as_markup()
 
+@functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)
 def get_rss_editing_sections_keyboard(context_id: Optional[str] = None) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="Каналы", callback_data=GeneralCallbackData(action="edit_rss_section", value="channels", context_id=context_id).pack())
@@ -271,8 +300,8 @@ async def process_rss_url_input_invalid(message: Message) -> None:
 # Handled by ReplyKeyboard "Готово" and inline toggles/buttons
 
 @rss_integration_router.callback_query(
+    StateFilter(RssIntegrationStates.waiting_for_channels, RssIntegrationStates.editing_rss_feed_settings), # Allow toggling channels in editing mode too
     SelectionCallbackData.filter(F.action_prefix == "toggle_channel"),
-    StateFilter(RssIntegrationStates.waiting_for_channels, RssIntegrationStates.editing_rss_feed_settings) # Allow toggling channels in editing mode too
 )
 async def process_toggle_rss_channel_callback(callback: CallbackQuery, callback_data: SelectionCallbackData, state: FSMContext) -> None:
     """Handles toggling channel selection for RSS feed via inline keyboard."""
@@ -312,7 +341,7 @@ async def process_toggle_rss_channel_callback(callback: CallbackQuery, callback_
         await callback.answer("Произошла ошибка при обновлении списка.", show_alert=True)
 
 
-@rss_integration_router.message(StateFilter(RssIntegrationStates.waiting_for_channels), F.text == "Готово")
+@rss_integration_router.message(StateFilter(RssIntegrationStates.waiting_for_channels), F.text == DONE_BUTTON_TEXT)
 async def process_done_rss_channel_selection_reply(message: Message, state: FSMContext, bot: Bot) -> None:
     """Handles 'Готово' from reply keyboard after channel selection for RSS."""
     await process_done_rss_channel_selection(message, state, bot)
@@ -364,7 +393,7 @@ async def process_rss_channel_selection_invalid(message: Message) -> None:
 
 # --- Filter Keywords Options State (waiting_for_filter_keywords) ---
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "set_filter_option"), StateFilter(RssIntegrationStates.waiting_for_filter_keywords))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.waiting_for_filter_keywords), GeneralCallbackData.filter(F.action == "set_filter_option"))
 async def process_set_filter_option(callback: CallbackQuery, callback_data: GeneralCallbackData, state: FSMContext, bot: Bot) -> None:
     """Handles selecting filter keywords option (enter or skip)."""
     option = callback_data.value # 'enter' or 'skip'
@@ -451,7 +480,7 @@ async def process_filter_keywords_input_invalid_nontext(message: Message) -> Non
 
 # --- Frequency Options State (waiting_for_frequency) ---
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "set_frequency_option"), StateFilter(RssIntegrationStates.waiting_for_frequency))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.waiting_for_frequency), GeneralCallbackData.filter(F.action == "set_frequency_option"))
 async def process_set_frequency_option(callback: CallbackQuery, callback_data: GeneralCallbackData, state: FSMContext, bot: Bot) -> None:
     """Handles selecting frequency option (default or enter)."""
     option = callback_data.value # 'default' or 'enter'
@@ -555,7 +584,7 @@ async def display_rss_feed_confirmation(message: Message, state: FSMContext, bot
     await state.update_data(temp_confirmation_message_id=confirmation_msg.message_id)
 
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "save_rss_feed"), StateFilter(RssIntegrationStates.confirming_rss_feed_details))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.confirming_rss_feed_details), GeneralCallbackData.filter(F.action == "save_rss_feed"))
 async def process_save_rss_feed(callback: CallbackQuery, state: FSMContext, session: AsyncSession, scheduler: AsyncIOScheduler, bot: Bot) -> None:
     """Handles saving the RSS feed details to the database and scheduling the job."""
     state_data = await state.get_data()
@@ -563,17 +592,6 @@ async def process_save_rss_feed(callback: CallbackQuery, state: FSMContext, sess
     editing_feed_id = state_data.get('editing_feed_id')
     is_editing = editing_feed_id is not None
 
-    # Fetch user object to get DB user_id
-    # Assume get_user_by_telegram_id is available and gets the User model instance
-    user = await get_user_by_telegram_id(session, user_id_telegram)
-    if not user:
-        logger.error(f"User not found in DB for telegram_user_id {user_id_telegram} during RSS save.")
-        await callback.answer("Произошла внутренняя ошибка. Пользователь не найден в БД.", show_alert=True)
-        # Should not happen if user is created on /start
-        await state.clear()
-        await callback.message.answer("Пожалуйста, попробуйте начать заново.", reply_markup=get_main_menu_keyboard())
-        return
-
     # Get data from state
     feed_url: str = state_data.get('feed_url')
     channels: List[str] = state_data.get('selected_channel_ids')
@@ -605,34 +623,10 @@ async def process_save_rss_feed(callback: CallbackQuery, state: FSMContext, sess
             if updated_feed:
                  logger.info(f"RSS Feed ID:{editing_feed_id} successfully updated.")
                  success_message = f"✅ RSS Лента ID:{editing_feed_id} успешно обновлена!"
-                 # Reschedule the job if frequency or channels changed (or just always reschedule on edit)
-                 # Remove old job first just to be safe, although replace_existing should handle it
-                 old_job_id = f'rss_check_{editing_feed_id}'
-                 try:
-                     await remove_scheduled_job(scheduler, old_job_id)
-                 except Exception as e:
-                      logger.warning(f"Failed to remove old RSS check job {old_job_id} during edit save: {e}")
-
-                 # Add new job
-                 # Need a function like schedule_rss_check in services/scheduler.py
-                 # This function would likely take scheduler, bot, session_factory, feed_id, frequency_minutes
-                 # The task function would then use session_factory to get a session and call check_and_publish_rss_feed.
+                 # Reschedule this feed's own check job (replace_existing=True replaces the old trigger).
                  # Job ID format: rss_check_<feed_id>
-
-                 # !!! ASSUMING schedule_rss_check function exists and works like schedule_post_publication !!!
-                 # from services.scheduler import schedule_rss_check # Need this import
                  try:
-                      # schedule_rss_check takes scheduler, bot, session_factory, feed_id, frequency_minutes
-                      # Job ID will be 'rss_check_<feed_id>'
-                      await scheduler.add_job(
-                            process_all_active_rss_feeds, # The task to run (checks all feeds, but scheduler handles frequency per job)
-                            'interval',
-                            minutes=frequency_minutes,
-                            args=[bot, AsyncSessionLocal], # Pass bot instance and session factory to the task
-                            id=f'rss_check_{editing_feed_id}', # Unique job ID per feed
-                            replace_existing=True,
-                            # next_run_time=datetime.datetime.now(scheduler.timezone) # Start immediately or soon
-                      )
+                      await schedule_rss_check(scheduler, bot, AsyncSessionLocal, editing_feed_id, frequency_minutes)
                       logger.info(f"RSS check job for feed ID:{editing_feed_id} rescheduled with frequency {frequency_minutes} min.")
                  except Exception as e:
                       logger.exception(f"Failed to reschedule RSS check job for feed ID:{editing_feed_id}: {e}")
@@ -649,42 +643,35 @@ async def process_save_rss_feed(callback: CallbackQuery, state: FSMContext, sess
         else:
             # Add new feed
             logger.info(f"User {user_id_telegram} confirmed new RSS feed. Adding to DB.")
-            new_feed = await add_rss_feed(
+            # Пользователь (если его ещё нет, например не нажимал /start) создаётся тем же запросом,
+            # что и лента: один round-trip и одна транзакция вместо поиска/создания пользователя и INSERT ленты.
+            new_feed = await add_user_rss_feed(
                 session=session,
-                user_id=user.id, # Use DB user ID
+                telegram_user_id=user_id_telegram,
                 feed_url=feed_url,
                 channels=channels,
                 frequency_minutes=frequency_minutes,
-                filter_keywords=filter_keywords
+                filter_keywords=filter_keywords,
+                user_defaults={
+                    'username': callback.from_user.username,
+                    'first_name': callback.from_user.first_name,
+                    'last_name': callback.from_user.last_name
+                }
             )
             await session.commit() # Commit the new feed
             logger.info(f"New RSS Feed added to DB with ID: {new_feed.id}.")
             success_message = f"✅ RSS Лента успешно добавлена (ID: {new_feed.id})!"
 
-            # Schedule the check job for the new feed
+            # Schedule the check job for the new feed.
+            # Каждая лента получает собственную задачу с интервалом frequency_minutes:
+            # планировщик будит бота ровно тогда, когда пора проверить ленту,
+            # вместо периодического опроса всех лент одной задачей.
             # Job ID format: rss_check_<feed_id>
-            # Task: process_all_active_rss_feeds is intended to check *all* feeds periodically.
-            # A better approach is to schedule a task specific to *this* feed ID,
-            # or use a single task that checks all feeds due for checking,
-            # scheduled at a high frequency (e.g., every minute), and the task logic
-            # decides which feeds are due based on `last_checked_at` and `frequency_minutes`.
-
-            # Let's use the recommended pattern: a single scheduled task (`process_all_active_rss_feeds`)
-            # running periodically (e.g., every 15 mins) and it checks all feeds needing a check.
-            # Adding a new feed doesn't need a new job *per feed*, it just makes that feed
-            # eligible for checking by the existing main RSS check job.
-            # We just need to ensure the main job exists (done during app startup).
-            # For an initial check, we could trigger `check_and_publish_rss_feed` immediately,
-            # but this might need careful session management outside the scheduled job context.
-            # Simplest: Adding the feed makes it eligible for the *next* scheduled run of the main job.
-            # Let's add a note about this.
-
-            # Note: With the current scheduler setup calling process_all_active_rss_feeds,
-            # adding a feed means it will be picked up by the *next* run of that task.
-            # There is no separate job per feed ID.
-            # If a job per feed is desired, schedule_rss_check would be needed here.
-            # Let's assume the main job handles all feeds.
-            pass # No separate job scheduling needed per feed with this model
+            try:
+                await schedule_rss_check(scheduler, bot, AsyncSessionLocal, new_feed.id, frequency_minutes)
+            except Exception as e:
+                logger.exception(f"Failed to schedule RSS check job for new feed ID:{new_feed.id}: {e}")
+                success_message += "\n⚠️ Не удалось запланировать автоматическую проверку."
 
     except IntegrityError as e:
         await session.rollback()
@@ -703,23 +690,26 @@ async def process_save_rss_feed(callback: CallbackQuery, state: FSMContext, sess
         logger.exception(f"Unexpected error saving/updating RSS feed for user {user_id_telegram}: {e}")
         success_message = "❌ Произошла непредвиденная ошибка при сохранении/обновлении RSS-ленты."
 
-    # Delete the confirmation message
-    await _delete_messages_from_state(bot, user_id_telegram, state, ['temp_confirmation_message_id'])
-    await state.update_data(temp_confirmation_message_id=None)
+    # Список /myrss пользователя изменился (или мог измениться) - сбрасываем его кэш
+    _invalidate_rss_list_cache(user_id_telegram)
+
+    # Delete the confirmation message, answer the callback and send the final message (back to main menu).
+    # Это независимые запросы к Telegram - отправляем их одновременно, а не друг за другом.
+    await asyncio.gather(
+        _delete_messages_from_state(bot, user_id_telegram, state, ['temp_confirmation_message_id']),
+        callback.answer("Сохранено!" if not is_editing else "Обновлено!", show_alert=True),
+        callback.message.answer(
+            success_message,
+            reply_markup=get_main_menu_keyboard()
+        ),
+    )
 
-    # Clear FSM state
+    # Clear FSM state (after the helper above has read the confirmation message ID from it)
     await state.clear()
     logger.info(f"RSS feed save/update process completed for user {user_id_telegram}. State cleared.")
 
-    # Send final message and return to main menu
-    await callback.answer("Сохранено!" if not is_editing else "Обновлено!", show_alert=True)
-    await callback.message.answer(
-        success_message,
-        reply_markup=get_main_menu_keyboard()
-    )
 
-
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "edit_rss_sections"), StateFilter(RssIntegrationStates.confirming_rss_feed_details))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.confirming_rss_feed_details), GeneralCallbackData.filter(F.action == "edit_rss_sections"))
 async def process_edit_rss_feed(callback: CallbackQuery, state: FSMContext, bot: Bot) -> None:
     """Handles 'Редактировать' button from confirmation state."""
     user_id = callback.from_user.id
@@ -739,7 +729,7 @@ async def process_edit_rss_feed(callback: CallbackQuery, state: FSMContext, bot:
     await callback.answer() # Answer the callback query
 
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "cancel_rss_creation"), StateFilter(RssIntegrationStates.confirming_rss_feed_details))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.confirming_rss_feed_details), GeneralCallbackData.filter(F.action == "cancel_rss_creation"))
 async def process_cancel_rss_creation(callback: CallbackQuery, state: FSMContext, bot: Bot) -> None:
     """Handles 'Отменить' from confirmation state."""
     await process_cancel_rss_fsm(callback, state, bot) # Use helper cancel
@@ -747,7 +737,7 @@ async def process_cancel_rss_creation(callback: CallbackQuery, state: FSMContext
 
 # --- Editing Selection State (editing_rss_feed_settings) ---
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "edit_rss_section"), StateFilter(RssIntegrationStates.editing_rss_feed_settings))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.editing_rss_feed_settings), GeneralCallbackData.filter(F.action == "edit_rss_section"))
 async def process_edit_rss_section(callback: CallbackQuery, callback_data: GeneralCallbackData, state: FSMContext, bot: Bot) -> None:
     """Handles selecting a section to edit for an RSS feed."""
     section_to_edit = callback_data.value # 'channels', 'filters', 'frequency'
@@ -902,7 +892,7 @@ async def finish_editing_section(message: Message, state: FSMContext, bot: Bot)
 # when `edit_back_target` is set in state.
 
 # Back button handler from editing sections goes to confirming_rss_feed_details
-@rss_integration_router.callback_query(NavigationCallbackData.filter(F.target == RssIntegrationStates.confirming_rss_feed_details.state), StateFilter(RssIntegrationStates.editing_rss_feed_settings))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.editing_rss_feed_settings), NavigationCallbackData.filter(F.target == RssIntegrationStates.confirming_rss_feed_details.state))
 async def process_back_from_editing_selection_to_confirmation(callback: CallbackQuery, state: FSMContext, bot: Bot) -> None:
     """Handles 'Back' navigation from editing selection to confirmation state."""
     user_id = callback.from_user.id
@@ -918,7 +908,7 @@ async def process_back_from_editing_selection_to_confirmation(callback: Callback
     await callback.answer() # Answer callback
 
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "cancel_rss_editing"), StateFilter(RssIntegrationStates.editing_rss_feed_settings))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.editing_rss_feed_settings), GeneralCallbackData.filter(F.action == "cancel_rss_editing"))
 async def process_cancel_rss_editing(callback: CallbackQuery, state: FSMContext, bot: Bot) -> None:
     """Handles 'Отменить' button from editing sections state."""
     # When canceling editing, we discard changes and go back to main menu.
@@ -927,6 +917,96 @@ async def process_cancel_rss_editing(callback: CallbackQuery, state: FSMContext,
 
 # --- My RSS Feeds List (/myrss) ---
 
+def _invalidate_rss_list_cache(user_id_telegram: int) -> None:
+    """Drops the cached /myrss pages of a user (after one of their feeds was added, updated or deleted)."""
+    _rss_list_page_cache.pop(user_id_telegram, None)
+
+
+async def _render_user_rss_feeds_page(
+    session: AsyncSession,
+    user_id_telegram: int,
+    offset: int
+) -> Tuple[List[Tuple[int, str]], int]:
+    """
+    Returns one rendered page of the user's RSS feeds: (feed_id, display text) pairs
+    and the total number of feeds. Pages are cached for RSS_LIST_CACHE_TTL_SECONDS.
+    """
+    user_pages = _rss_list_page_cache.get(user_id_telegram)
+    if user_pages is not None and offset in user_pages:
+        return user_pages[offset]
+
+    # Страница и общее количество лент приходят одним запросом (LIMIT/OFFSET + оконный COUNT)
+    rss_feeds, total_feeds = await get_user_rss_feeds_page_by_telegram_id(
+        session, user_id_telegram, limit=RSS_FEEDS_PAGE_SIZE, offset=offset
+    )
+    page = ([(feed.id, await _format_rss_feed_for_display(feed, feed.user_id)) for feed in rss_feeds], total_feeds)
+
+    if user_pages is None:
+        user_pages = _rss_list_page_cache[user_id_telegram] = {}
+    user_pages[offset] = page
+    return page
+
+
+async def _get_user_rss_feed_text(session: AsyncSession, user_id_telegram: int, feed_id: int) -> Optional[str]:
+    """
+    Returns the display text of a feed if it exists and belongs to the user, otherwise None.
+
+    The feed is always loaded from the DB (existence and ownership in one query):
+    the cached /myrss pages are only used to render the list and may be stale.
+    """
+    feed = await get_user_rss_feed(session, feed_id, user_id_telegram)
+    if not feed:
+        return None
+    return await _format_rss_feed_for_display(feed, feed.user_id)
+
+
+@functools.lru_cache(maxsize=RSS_KEYBOARD_CACHE_SIZE)
+def _get_rss_list_more_keyboard(next_offset: int) -> InlineKeyboardMarkup:
+    """Creates the "show more" keyboard for the /myrss list."""
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="➡️ Показать ещё",
+        callback_data=GeneralCallbackData(action="rss_list_page", value=str(next_offset))
+    )
+    return builder.as_markup()
+
+
+async def _send_user_rss_feeds_page(
+    message: Message,
+    session: AsyncSession,
+    user_id_telegram: int,
+    offset: int,
+    announce_total: bool = False,
+    page: Optional[Tuple[List[Tuple[int, str]], int]] = None
+) -> int:
+    """
+    Sends one page of the user's RSS feeds (each with its management keyboard)
+    followed by a "show more" button if there are more feeds after this page.
+    If announce_total is set, the page is preceded by a "found N feeds" message.
+    A page already rendered by the caller (_render_user_rss_feeds_page) can be passed as `page`.
+
+    Returns:
+        The total number of the user's RSS feeds (0 if there are none).
+    """
+    feed_items, total_feeds = page if page is not None else await _render_user_rss_feeds_page(session, user_id_telegram, offset)
+    if announce_total and total_feeds:
+        await message.answer(f"Найдено {total_feeds} RSS-лент:", reply_markup=None) # Remove ReplyKeyboard
+
+    for feed_id, feed_text in feed_items:
+        # Send each feed with its management keyboard
+        await message.answer(
+            feed_text,
+            reply_markup=_get_rss_feed_item_keyboard(feed_id),
+            parse_mode="MarkdownV2"
+        )
+
+    next_offset = offset + len(feed_items)
+    if feed_items and next_offset < total_feeds:
+        await message.answer("Показаны не все RSS-ленты.", reply_markup=_get_rss_list_more_keyboard(next_offset))
+
+    return total_feeds
+
+
 @rss_integration_router.message(Command("myrss"))
 async def handle_my_rss_command(message: Message, state: FSMContext, session: AsyncSession, bot: Bot) -> None:
     """Handles the /myrss command."""
@@ -937,34 +1017,41 @@ async def handle_my_rss_command(message: Message, state: FSMContext, session: As
     await state.clear()
     await state.set_state(RssIntegrationStates.managing_rss_list)
 
-    # Fetch user's RSS feeds
-    # Need user.id from telegram_user_id first
-    user = await get_user_by_telegram_id(session, user_id_telegram)
-    if not user:
-         logger.error(f"User not found in DB for telegram_user_id {user_id_telegram} during /myrss.")
-         await message.answer("Произошла внутренняя ошибка. Пользователь не найден в БД.", reply_markup=get_main_menu_keyboard())
-         await state.clear()
-         return
-
-    rss_feeds = await get_user_rss_feeds(session, user.id)
+    # Fetch and send the first page of user's RSS feeds (joined on users.telegram_user_id, no separate user lookup)
+    total_feeds = await _send_user_rss_feeds_page(message, session, user_id_telegram, offset=0, announce_total=True)
 
-    if not rss_feeds:
+    if not total_feeds:
         await message.answer("У вас нет добавленных RSS-лент.", reply_markup=get_main_menu_keyboard())
         await state.clear() # Clear state if no feeds to manage
         return
 
-    await message.answer(f"Найдено {len(rss_feeds)} RSS-лент:", reply_markup=None) # Remove ReplyKeyboard
+    # Stay in managing_rss_list state, waiting for inline button callbacks
 
-    for feed in rss_feeds:
-        feed_text = await _format_rss_feed_for_display(feed, user.id)
-        # Send each feed with its management keyboard
-        await message.answer(
-            feed_text,
-            reply_markup=get_rss_feed_item_keyboard(feed.id),
-            parse_mode="MarkdownV2"
-        )
 
-    # Stay in managing_rss_list state, waiting for inline button callbacks
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.managing_rss_list), GeneralCallbackData.filter(F.action == "rss_list_page"))
+async def process_rss_list_page_callback(callback: CallbackQuery, callback_data: GeneralCallbackData, session: AsyncSession) -> None:
+    """Handles inline button click to show the next page of the user's RSS feeds."""
+    user_id_telegram = callback.from_user.id
+    try:
+        offset = max(int(callback_data.value or 0), 0)
+    except ValueError:
+        await callback.answer("Ошибка: Некорректная страница.", show_alert=True)
+        return
+
+    async def _delete_show_more_message() -> None:
+        # Убираем кнопку "Показать ещё" с предыдущей страницы
+        try:
+            await callback.message.delete()
+        except Exception as e:
+            logger.warning(f"Failed to delete 'show more' message for user {user_id_telegram}: {e}")
+
+    # Ответ на callback, удаление старой кнопки и получение страницы независимы - один параллельный раунд
+    _, _, page = await asyncio.gather(
+        callback.answer(),
+        _delete_show_more_message(),
+        _render_user_rss_feeds_page(session, user_id_telegram, offset),
+    )
+    await _send_user_rss_feeds_page(callback.message, session, user_id_telegram, offset=offset, page=page)
 
 
 @rss_integration_router.message(StateFilter(RssIntegrationStates.managing_rss_list), ~Command("myrss", "cancel"))
@@ -984,7 +1071,7 @@ async def handle_managing_rss_list_invalid_input(message: Message) -> None:
 
 # Handlers for actions from /myrss list (Inline Callbacks)
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "edit_rss_feed"), StateFilter(RssIntegrationStates.managing_rss_list))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.managing_rss_list), GeneralCallbackData.filter(F.action == "edit_rss_feed"))
 async def process_edit_rss_feed_from_list(callback: CallbackQuery, callback_data: GeneralCallbackData, state: FSMContext, session: AsyncSession, bot: Bot) -> None:
     """Handles inline button click to edit an RSS feed from the list view."""
     feed_id_str = callback_data.value
@@ -1004,12 +1091,9 @@ async def process_edit_rss_feed_from_list(callback: CallbackQuery, callback_data
 
     logger.info(f"User {user_id_telegram} requested to edit RSS feed ID:{feed_id} from list.")
 
-    # Fetch the feed
-    feed = await get_rss_feed_by_id(session, feed_id)
-
-    # Check if feed exists and belongs to the user
-    user = await get_user_by_telegram_id(session, user_id_telegram)
-    if not feed or (user and feed.user_id != user.id):
+    # Fetch the feed; None if it does not exist or does not belong to the user
+    feed = await get_user_rss_feed(session, feed_id, user_id_telegram)
+    if not feed:
         logger.warning(f"Edit requested for non-existent or unauthorized RSS feed ID:{feed_id} by user {user_id_telegram}.")
         await callback.answer(f"RSS Лента с ID {feed_id} не найдена или вы не имеете к ней доступа.", show_alert=True)
         # Attempt to remove the keyboard from the list item message
@@ -1053,7 +1137,7 @@ async def process_edit_rss_feed_from_list(callback: CallbackQuery, callback_data
         await state.clear() # Clear state on error
 
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "request_delete_rss_feed"), StateFilter(RssIntegrationStates.managing_rss_list))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.managing_rss_list), GeneralCallbackData.filter(F.action == "request_delete_rss_feed"))
 async def process_request_delete_rss_feed(callback: CallbackQuery, callback_data: GeneralCallbackData, state: FSMContext, session: AsyncSession) -> None:
     """Handles inline button click to request deletion of an RSS feed from the list view."""
     feed_id_str = callback_data.value
@@ -1073,11 +1157,10 @@ async def process_request_delete_rss_feed(callback: CallbackQuery, callback_data
 
     logger.info(f"User {user_id_telegram} requested to delete RSS feed ID:{feed_id} from list.")
 
-    # Fetch the feed to check existence and ownership
-    user = await get_user_by_telegram_id(session, user_id_telegram)
-    feed = await get_rss_feed_by_id(session, feed_id)
+    # Check existence and ownership (cached /myrss page first, otherwise one query)
+    feed_text = await _get_user_rss_feed_text(session, user_id_telegram, feed_id)
 
-    if not feed or (user and feed.user_id != user.id):
+    if feed_text is None:
         logger.warning(f"Deletion requested for non-existent or unauthorized RSS feed ID:{feed_id} by user {user_id_telegram}.")
         await callback.answer(f"RSS Лента с ID {feed_id} не найдена или вы не имеете к ней доступа.", show_alert=True)
         # Attempt to remove the keyboard from the list item message
@@ -1097,7 +1180,7 @@ async def process_request_delete_rss_feed(callback: CallbackQuery, callback_data
     # Send confirmation message with inline keyboard as a NEW message
     confirmation_text = f"Вы уверены, что хотите удалить RSS Ленту ID:{feed_id}?\\n"
     # Add a summary of the feed being deleted
-    confirmation_text += await _format_rss_feed_for_display(feed, user.id)
+    confirmation_text += feed_text
     confirmation_text += "\n**Внимание**: Это действие необратимо\\." # Add emphasis
 
     try:
@@ -1150,11 +1233,10 @@ async def handle_remove_rss_command(message: Message, command: CommandObject, st
 
     logger.info(f"User {user_id_telegram} requested to delete RSS feed ID:{feed_id} via command.")
 
-    # Fetch the feed to check existence and ownership
-    user = await get_user_by_telegram_id(session, user_id_telegram)
-    feed = await get_rss_feed_by_id(session, feed_id)
+    # Check existence and ownership (cached /myrss page first, otherwise one query)
+    feed_text = await _get_user_rss_feed_text(session, user_id_telegram, feed_id)
 
-    if not feed or (user and feed.user_id != user.id):
+    if feed_text is None:
         logger.warning(f"Deletion requested for non-existent or unauthorized RSS feed ID:{feed_id} by user {user_id_telegram} via command.")
         await message.answer(
             f"RSS Лента с ID `{feed_id}` не найдена или вы не имеете к ней доступа\\.",
@@ -1173,7 +1255,7 @@ async def handle_remove_rss_command(message: Message, command: CommandObject, st
 
     # Send confirmation message with inline keyboard
     confirmation_text = f"Вы уверены, что хотите удалить RSS Ленту ID:{feed_id}?\\n"
-    confirmation_text += await _format_rss_feed_for_display(feed, user.id)
+    confirmation_text += feed_text
     confirmation_text += "\n**Внимание**: Это действие необратимо\\." # Add emphasis
 
     confirmation_msg = await message.answer(
@@ -1189,7 +1271,7 @@ async def handle_remove_rss_command(message: Message, command: CommandObject, st
 # or define them here if they need RSS-specific logic (like removing scheduler job).
 # Let's define them here to ensure RSS-specific scheduler job removal.
 
-@rss_integration_router.callback_query(DeleteCallbackData.filter(F.action == "confirm" and F.item_type == "rss_feed"), StateFilter(RssIntegrationStates.confirming_rss_feed_deletion))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.confirming_rss_feed_deletion), DeleteCallbackData.filter((F.action == "confirm") & (F.item_type == "rss_feed")))
 async def process_confirm_rss_feed_delete(
     callback: CallbackQuery,
     callback_data: DeleteCallbackData,
@@ -1226,13 +1308,14 @@ async def process_confirm_rss_feed_delete(
 
     try:
         # Delete the RSS feed from the database
-        deleted_from_db = await delete_rss_feed_by_id(session, feed_id)
+        deleted_from_db = await delete_user_rss_feed(session, feed_id, user_id_telegram)
 
         if deleted_from_db:
             logger.info(f"RSS Feed ID:{feed_id} successfully deleted from DB.")
+            _invalidate_rss_list_cache(user_id_telegram)
 
             # Remove the scheduled job for this feed
-            rss_check_job_id = f'rss_check_{feed_id}'
+            rss_check_job_id = get_rss_check_job_id(feed_id)
             try:
                 await remove_scheduled_job(scheduler, rss_check_job_id)
                 logger.info(f"Scheduled RSS check job {rss_check_job_id} removed.")
@@ -1288,7 +1371,7 @@ async def process_confirm_rss_feed_delete(
         await callback.message.answer(f"❌ Произошла непредвиденная ошибка при удалении RSS Ленты ID:{feed_id}.", reply_markup=get_main_menu_keyboard())
 
 
-@rss_integration_router.callback_query(DeleteCallbackData.filter(F.action == "cancel" and F.item_type == "rss_feed"), StateFilter(RssIntegrationStates.confirming_rss_feed_deletion))
+@rss_integration_router.callback_query(StateFilter(RssIntegrationStates.confirming_rss_feed_deletion), DeleteCallbackData.filter((F.action == "cancel") & (F.item_type == "rss_feed")))
 async def process_cancel_rss_feed_delete(
     callback: CallbackQuery,
     callback_data: DeleteCallbackData,
@@ -1354,25 +1437,28 @@ async def process_cancel_rss_fsm(callback: CallbackQuery, state: FSMContext, bot
     await state.clear()
     logger.info(f"RSS FSM canceled and state cleared for user {user_id}.")
 
-    await callback.bot.send_message( # Use bot instance from callback for sending
-        chat_id=user_id,
-        text="Действие отменено. Возвращаемся в главное меню.",
+    # Чат уже известен из callback.message: ответ уходит туда же без отдельного chat_id
+    # (объект сообщения остается пригодным для answer и после его удаления выше)
+    await callback.message.answer(
+        "Действие отменено. Возвращаемся в главное меню.",
         reply_markup=get_main_menu_keyboard()
     )
 
 # Route generic cancel callbacks from various RSS states to the helper
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "cancel_rss_creation"), StateFilter(
+# Фильтр состояния идет первым (как и в остальных обработчиках модуля): это сравнение строки
+# с уже загруженным состоянием, а распаковка callback_data выполняется только в нужных состояниях.
+@rss_integration_router.callback_query(StateFilter(
     RssIntegrationStates.waiting_for_channels, # If added a cancel button there
     RssIntegrationStates.waiting_for_filter_keywords,
     RssIntegrationStates.waiting_for_frequency,
     # RssIntegrationStates.confirming_rss_feed_details handled above
-))
+), GeneralCallbackData.filter(F.action == "cancel_rss_creation"))
 async def callback_cancel_rss_fsm_generic(callback: CallbackQuery, state: FSMContext, bot: Bot):
      await process_cancel_rss_fsm(callback, state, bot)
 
-@rss_integration_router.callback_query(GeneralCallbackData.filter(F.action == "cancel_rss_editing"), StateFilter(
+@rss_integration_router.callback_query(StateFilter(
     RssIntegrationStates.editing_rss_feed_settings
-))
+), GeneralCallbackData.filter(F.action == "cancel_rss_editing"))
 async def callback_cancel_rss_editing_generic(callback: CallbackQuery, state: FSMContext, bot: Bot):
     await process_cancel_rss_fsm(callback, state, bot)
 
@@ -1,86 +1,128 @@
-```python
 # keyboards/reply_keyboards.py
 
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 
+# Тексты кнопок. Хэндлеры сравнивают с ними F.text, поэтому подписи задаются только здесь
+NEW_POST_BUTTON_TEXT = "➕ Новый пост"
+MY_POSTS_BUTTON_TEXT = "🗂 Мои посты"
+ADD_RSS_BUTTON_TEXT = "📰 Добавить RSS"
+HELP_BUTTON_TEXT = "❓ Помощь"
+ADD_MEDIA_BUTTON_TEXT = "Добавить медиа"
+SKIP_BUTTON_TEXT = "Пропустить"
+NEXT_BUTTON_TEXT = "✅ Далее"
+EDIT_CONTENT_BUTTON_TEXT = "✏️ Редактировать контент"
+ADD_MORE_BUTTON_TEXT = "Добавить ещё"
+DONE_BUTTON_TEXT = "Готово"
+CANCEL_BUTTON_TEXT = "❌ Отменить"
+
+def _build_main_menu_keyboard() -> ReplyKeyboardMarkup:
+    builder = ReplyKeyboardBuilder()
+    builder.add(
+        KeyboardButton(text=NEW_POST_BUTTON_TEXT),
+        KeyboardButton(text=MY_POSTS_BUTTON_TEXT),
+        KeyboardButton(text=ADD_RSS_BUTTON_TEXT),
+        KeyboardButton(text=HELP_BUTTON_TEXT)
+    )
+    # Adjust layout to 2 columns
+    builder.adjust(2)
+    return builder.as_markup(resize_keyboard=True)
+
+# Главное меню прикладывается почти к каждому финальному ответу бота; оно статично,
+# поэтому собираем его один раз при импорте модуля
+_MAIN_MENU_KEYBOARD = _build_main_menu_keyboard()
+
 def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a reply keyboard for the main menu.
+    Returns the reply keyboard for the main menu.
     Buttons: "➕ Новый пост", "🗂 Мои посты", "📰 Добавить RSS", "❓ Помощь".
     Layout: 2x2.
     """
+    return _MAIN_MENU_KEYBOARD
+
+def _build_add_media_skip_cancel_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.add(
-        KeyboardButton(text="➕ Новый пост"),
-        KeyboardButton(text="🗂 Мои посты"),
-        KeyboardButton(text="📰 Добавить RSS"),
-        KeyboardButton(text="❓ Помощь")
+        KeyboardButton(text=ADD_MEDIA_BUTTON_TEXT),
+        KeyboardButton(text=SKIP_BUTTON_TEXT),
+        KeyboardButton(text=CANCEL_BUTTON_TEXT)
     )
-    # Adjust layout to 2 columns
-    builder.adjust(2)
+    # Adjust layout to 2 columns for first two buttons, then 1 for the last
+    builder.adjust(2, 1)
     return builder.as_markup(resize_keyboard=True)
 
+# Клавиатура статична, поэтому собираем её один раз при импорте модуля
+_ADD_MEDIA_SKIP_CANCEL_KEYBOARD = _build_add_media_skip_cancel_keyboard()
+
 def get_add_media_skip_cancel_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a reply keyboard for adding media step.
+    Returns the reply keyboard for adding media step.
     Buttons: "Добавить медиа", "Пропустить", "❌ Отменить".
     Layout: ["Добавить медиа", "Пропустить"], ["❌ Отменить"].
     """
+    return _ADD_MEDIA_SKIP_CANCEL_KEYBOARD
+
+def _build_confirm_content_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.add(
-        KeyboardButton(text="Добавить медиа"),
-        KeyboardButton(text="Пропустить"),
-        KeyboardButton(text="❌ Отменить")
+        KeyboardButton(text=NEXT_BUTTON_TEXT),
+        KeyboardButton(text=EDIT_CONTENT_BUTTON_TEXT),
+        KeyboardButton(text=CANCEL_BUTTON_TEXT)
     )
     # Adjust layout to 2 columns for first two buttons, then 1 for the last
     builder.adjust(2, 1)
     return builder.as_markup(resize_keyboard=True)
 
+# Клавиатура статична, поэтому собираем её один раз при импорте модуля
+_CONFIRM_CONTENT_KEYBOARD = _build_confirm_content_keyboard()
+
 def get_confirm_content_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a reply keyboard for confirming or editing content.
+    Returns the reply keyboard for confirming or editing content.
     Buttons: "✅ Далее", "✏️ Редактировать контент", "❌ Отменить".
     Layout: ["✅ Далее", "✏️ Редактировать контент"], ["❌ Отменить"].
     """
+    return _CONFIRM_CONTENT_KEYBOARD
+
+def _build_channel_selection_controls_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.add(
-        KeyboardButton(text="✅ Далее"),
-        KeyboardButton(text="✏️ Редактировать контент"),
-        KeyboardButton(text="❌ Отменить")
+        KeyboardButton(text=ADD_MORE_BUTTON_TEXT),
+        KeyboardButton(text=DONE_BUTTON_TEXT),
+        KeyboardButton(text=CANCEL_BUTTON_TEXT)
     )
     # Adjust layout to 2 columns for first two buttons, then 1 for the last
     builder.adjust(2, 1)
     return builder.as_markup(resize_keyboard=True)
 
+# Клавиатура статична, поэтому собираем её один раз при импорте модуля
+_CHANNEL_SELECTION_CONTROLS_KEYBOARD = _build_channel_selection_controls_keyboard()
+
 def get_channel_selection_controls_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a reply keyboard for channel selection step.
+    Returns the reply keyboard for channel selection step.
     Buttons: "Добавить ещё", "Готово", "❌ Отменить".
     Layout: ["Добавить ещё", "Готово"], ["❌ Отменить"].
     """
+    return _CHANNEL_SELECTION_CONTROLS_KEYBOARD
+
+def _build_cancel_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.add(
-        KeyboardButton(text="Добавить ещё"),
-        KeyboardButton(text="Готово"),
-        KeyboardButton(text="❌ Отменить")
+        KeyboardButton(text=CANCEL_BUTTON_TEXT)
     )
-    # Adjust layout to 2 columns for first two buttons, then 1 for the last
-    builder.adjust(2, 1)
+    # No adjust needed for a single button
     return builder.as_markup(resize_keyboard=True)
 
+_CANCEL_KEYBOARD = _build_cancel_keyboard()
+
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a reply keyboard with only a cancel button.
+    Returns the reply keyboard with only a cancel button.
     Button: "❌ Отменить".
     Layout: Single button.
     """
-    builder = ReplyKeyboardBuilder()
-    builder.add(
-        KeyboardButton(text="❌ Отменить")
-    )
-    # No adjust needed for a single button
-    return builder.as_markup(resize_keyboard=True)
+    return _CANCEL_KEYBOARD
 
 # Example Usage (optional, for testing purposes):
 # if __name__ == '__main__':
@@ -94,4 +136,3 @@ def get_cancel_keyboard() -> ReplyKeyboardMarkup:
 #     print(get_channel_selection_controls_keyboard().keyboard)
 #     print("\nCancel Keyboard:")
 #     print(get_cancel_keyboard().keyboard)
-```
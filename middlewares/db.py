@@ -0,0 +1,65 @@
+# middlewares/db.py
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from services.db import load_user_timezone
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class DbSessionMiddleware(BaseMiddleware):
+    """
+    Открывает AsyncSession на время обработки апдейта и передает ее в хэндлеры как `session`.
+
+    Сессия берется из общей фабрики (services.db.AsyncSessionLocal), поверх пула соединений asyncpg.
+    AsyncSession получает соединение из пула только при первом запросе, поэтому для апдейтов,
+    хэндлеры которых не обращаются к БД, соединение не занимается.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        super().__init__()
+        self.session_factory = session_factory
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self.session_factory() as session:
+            data['session'] = session
+            return await handler(event, data)
+
+
+class UserTimezoneMiddleware(BaseMiddleware):
+    """
+    Подгружает часовой пояс пользователя в кэш процесса (utils.datetime_utils), если его там нет.
+
+    Хэндлеры читают пояс синхронно через get_user_timezone. После перезапуска кэш пуст, и без
+    этой подгрузки пользователь видел бы время в поясе по умолчанию, пока снова не выполнит /start.
+    Запрос к БД выполняется только при промахе, один раз на пользователя. Регистрируется после
+    DbSessionMiddleware и использует ее сессию.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get('event_from_user')
+        session = data.get('session')
+        if user is not None and session is not None:
+            try:
+                await load_user_timezone(session, user.id)
+            except Exception as e:
+                # Пояс не критичен для обработки апдейта: в худшем случае будет пояс по умолчанию
+                logger.warning(f"Не удалось загрузить часовой пояс пользователя {user.id}: {e}")
+                await session.rollback()
+        return await handler(event, data)
@@ -2,12 +2,13 @@
 
 import datetime
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, JSON, Text
+from sqlalchemy import ForeignKey, Index, Text
 from sqlalchemy.sql import func
 
 # Удаляем локальное определение Base и импорт DeclarativeBase
 # Вместо этого, импортируем центральный Base из сервисного модуля
-from services.db import Base
+# и общий тип JSON-колонок (jsonb на PostgreSQL)
+from services.db import Base, JSONType
 
 class Post(Base):
     """
@@ -15,20 +16,26 @@ class Post(Base):
     """
     __tablename__ = "posts"
 
+    # Список постов пользователя (/myposts) фильтруется по user_id и сортируется по created_at, id -
+    # составной индекс отдает страницу без seq scan и сортировки всей таблицы.
+    __table_args__ = (
+        Index('ix_posts_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id")) # Внешний ключ на таблицу users
 
     # Предполагаем, что храним строковые идентификаторы чатов (например, username или chat_id как str)
-    chat_ids: Mapped[list[str]] = mapped_column(JSON)
+    chat_ids: Mapped[list[str]] = mapped_column(JSONType)
 
     text: Mapped[str] = mapped_column(Text, nullable=True) # Текст поста, может отсутствовать
-    media_paths: Mapped[list[str]] = mapped_column(JSON, nullable=True) # Пути или ID медиафайлов, могут отсутствовать
+    media_paths: Mapped[list[str]] = mapped_column(JSONType, nullable=True) # Пути или ID медиафайлов, могут отсутствовать
 
     # Тип расписания: 'one_time', 'recurring'
     schedule_type: Mapped[str]
 
     # Параметры расписания (cron, дни недели и т.п.)
-    schedule_params: Mapped[dict] = mapped_column(JSON, nullable=True)
+    schedule_params: Mapped[dict] = mapped_column(JSONType, nullable=True)
 
     # Дата запуска для 'one_time' расписания
     run_date: Mapped[datetime.datetime] = mapped_column(nullable=True)
@@ -37,10 +44,11 @@ class Post(Base):
     delete_after_seconds: Mapped[int] = mapped_column(nullable=True)
 
     # Словарь, хранящий chat_id: message_id для отправленных сообщений, для последующего удаления.
-    sent_message_data: Mapped[dict] = mapped_column(JSON, nullable=True)
+    sent_message_data: Mapped[dict] = mapped_column(JSONType, nullable=True)
 
     # Статус поста: 'scheduled', 'sent', 'deleted', 'error', 'sending_failed', 'deletion_failed'
-    status: Mapped[str] = mapped_column(default="scheduled")
+    # Индекс: восстановление задач при старте выбирает посты по статусу
+    status: Mapped[str] = mapped_column(default="scheduled", index=True)
 
     created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
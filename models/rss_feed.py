@@ -10,13 +10,13 @@ from sqlalchemy import (
     Boolean, # Import Boolean
     DateTime,
     UniqueConstraint,
-    JSON # Import JSON for channels and filter_keywords
 )
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
 # Импортируем централизованный базовый класс моделей
-from services.db import Base
+# и общий тип JSON-колонок (jsonb на PostgreSQL)
+from services.db import Base, JSONType
 
 class RssFeed(Base):
     """
@@ -33,12 +33,12 @@ class RssFeed(Base):
     feed_url: Mapped[str] = mapped_column(String(2048), unique=False) # unique=False т.к. уникальность гарантируется по user_id+feed_url
 
     # Список chat_id (string) каналов/групп для публикации
-    channels: Mapped[List[str]] = mapped_column(JSON)
+    channels: Mapped[List[str]] = mapped_column(JSONType)
 
     frequency_minutes: Mapped[int] = mapped_column(Integer) # Частота проверки ленты в минутах
 
     # Список ключевых слов для фильтрации записей (опционально)
-    filter_keywords: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)
+    filter_keywords: Mapped[Optional[List[str]]] = mapped_column(JSONType, nullable=True)
 
     last_checked_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True) # Время последней успешной проверки
 
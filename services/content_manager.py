@@ -23,6 +23,15 @@ MAX_POST_TEXT_LENGTH = 4096
 # Limit for media group caption
 MAX_MEDIA_GROUP_CAPTION_LENGTH = 1024
 
+# Тип InputMedia по основной части MIME ('image/png' -> 'image')
+_INPUT_MEDIA_BY_MIME_MAJOR = {
+    'image': InputMediaPhoto,
+    'video': InputMediaVideo,
+}
+# MIME-типы, отправляемые как документ
+# Add other document/audio types as needed that are allowed by validate_media_file
+_DOCUMENT_MIME_TYPES = frozenset({'application/pdf', 'audio/mpeg', 'audio/wav'})
+
 
 def validate_post_text(text: Optional[str]) -> bool:
     """
@@ -139,19 +148,16 @@ def prepare_input_media_list(media_files: List[str]) -> List[InputMedia]:
             # Use FSInputFile for local files. Aiogram handles reading and closing.
             media_file = FSInputFile(path=file_path)
 
-            # Determine type of InputMedia based on MIME
-            media_item: Optional[InputMedia] = None
-            if mime_type and mime_type.startswith('image/'):
-                 media_item = InputMediaPhoto(media=media_file)
-            elif mime_type and mime_type.startswith('video/'):
-                 media_item = InputMediaVideo(media=media_file)
-            elif mime_type and mime_type in ['application/pdf', 'audio/mpeg', 'audio/wav']:
-                 # Add other document/audio types as needed that are allowed by validate_media_file
-                 media_item = InputMediaDocument(media=media_file)
-            else:
+            # Determine type of InputMedia based on MIME: one dict lookup by the major type,
+            # then by the full MIME for document/audio types.
+            media_cls = _INPUT_MEDIA_BY_MIME_MAJOR.get(mime_type.split('/', 1)[0]) if mime_type else None
+            if media_cls is None and mime_type in _DOCUMENT_MIME_TYPES:
+                 media_cls = InputMediaDocument
+            if media_cls is None:
                  # This case should be rare if validate_media_file and ALLOWED_MIME_TYPES are consistent.
                  logger.warning(f"Неподдерживаемый MIME тип для InputMedia после валидации: {mime_type}. Файл: {file_path}. Пропускаем.")
                  continue # Don't add to list
+            media_item: InputMedia = media_cls(media=media_file)
 
             # !!! Важно: Не устанавливаем caption или reply_markup здесь.
             # Подписи и клавиатуры обрабатываются в services.telegram_api.py
@@ -1,27 +1,27 @@
 # services/rss_service.py
 
+from __future__ import annotations
+
 import logging
-import feedparser
 import datetime
 import re
 import asyncio
 import json # Import json for parsing complex data if needed
-from typing import List, Optional, Dict, Any, Callable, Set, Union
+import os
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Callable, Set, Tuple, Union
 
+import aiohttp
 from aiogram import Bot
 from aiogram.types import InputMediaPhoto
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError # Import IntegrityError for handling unique constraints
+from sqlalchemy.exc import SQLAlchemyError
 
 # Assuming these imports are correctly structured based on REFERENCE
 from services.db import (
     get_rss_feed_by_id,
     get_all_active_rss_feeds, # Used if implementing a master task, currently not scheduled
-    get_posted_item_guids_for_feed,
-    add_rss_item,
-    update_rss_feed_last_checked,
-    mark_rss_item_as_posted,
-    get_rss_item_by_guid # Added for safety check
+    get_existing_item_guids_for_feed,
+    record_rss_feed_check, # New items + last_checked_at in one statement
 )
 # Import Telegram API services
 from services.telegram_api import send_post_content
@@ -32,6 +32,11 @@ from models.rss_item import RssItem
 from utils.datetime_utils import format_datetime # Import for formatting dates
 from utils.validators import validate_url # Might be useful for feed_url validation during initial add (handled in handler)
 
+# feedparser is only needed once a feed check actually runs: it is imported lazily in
+# _fetch_and_parse_feed so bot startup does not pay for it. Here only for annotations.
+if TYPE_CHECKING:
+    import feedparser
+
 # --- Configuration ---
 
 # Set up logging for this module
@@ -47,39 +52,112 @@ logger = logging.getLogger(__name__)
 RSS_ITEM_DESCRIPTION_EXCERPT_LENGTH = 400
 # Add a placeholder for RSS feed parsing timeout
 RSS_PARSE_TIMEOUT_SECONDS = 30 # Configure as needed, e.g., from env var
+# Connection pool limits of the shared HTTP session used to download feeds
+RSS_HTTP_MAX_CONNECTIONS = int(os.getenv('RSS_HTTP_MAX_CONNECTIONS', '50'))
+RSS_HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('RSS_HTTP_MAX_CONNECTIONS_PER_HOST', '10'))
+# Maximum number of concurrent Telegram sends while posting one item to the feed's channels
+RSS_SEND_CONCURRENCY = int(os.getenv('RSS_SEND_CONCURRENCY', '4'))
+
+# Shared aiohttp session for feed downloads: one connection pool (keep-alive, DNS cache)
+# for all feed checks instead of feedparser opening a fresh urllib connection per fetch.
+# Created lazily inside the running event loop, closed via close_rss_http_session() on shutdown.
+_http_session: Optional[aiohttp.ClientSession] = None
+# Shared limit for channel sends across all feed checks (created lazily inside the running loop).
+_send_semaphore: Optional[asyncio.Semaphore] = None
 
 
 # --- Helper Functions ---
 
-def _does_item_match_filter(entry_title: Optional[str], entry_summary: Optional[str], filter_keywords: Optional[List[str]]) -> bool:
+def _get_http_session() -> aiohttp.ClientSession:
+    """Returns the shared aiohttp session for feed downloads, creating it on first use."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=RSS_HTTP_MAX_CONNECTIONS,
+                limit_per_host=RSS_HTTP_MAX_CONNECTIONS_PER_HOST,
+            ),
+            timeout=aiohttp.ClientTimeout(total=RSS_PARSE_TIMEOUT_SECONDS),
+        )
+    return _http_session
+
+
+def _get_send_semaphore() -> asyncio.Semaphore:
+    """Returns the semaphore bounding concurrent channel sends, creating it on first use."""
+    global _send_semaphore
+    if _send_semaphore is None:
+        _send_semaphore = asyncio.Semaphore(RSS_SEND_CONCURRENCY)
+    return _send_semaphore
+
+
+async def close_rss_http_session() -> None:
+    """Closes the shared feed download session. Called once on application shutdown."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+async def _fetch_and_parse_feed(feed_url: str) -> feedparser.FeedParserDict:
+    """
+    Downloads a feed over the shared HTTP session and parses it with feedparser.
+    Parsing is CPU-bound and runs in the default thread pool.
+
+    Raises:
+        aiohttp.ClientError: On network errors or non-2xx responses.
+        asyncio.TimeoutError: If the download exceeds RSS_PARSE_TIMEOUT_SECONDS.
+    """
+    async with _get_http_session().get(feed_url) as response:
+        response.raise_for_status()
+        content = await response.read()
+        # Content-Type carries the charset feedparser needs to decode the document correctly
+        response_headers = {'content-type': response.headers.get('Content-Type', '')}
+
+    import feedparser
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, lambda: feedparser.parse(content, response_headers=response_headers)
+    )
+
+
+def _normalize_filter_keywords(filter_keywords: Optional[List[str]]) -> Tuple[str, ...]:
+    """
+    Normalizes a feed's filter keywords for matching: strips them, lowercases them
+    and drops empty or non-string items.
+
+    Called once per feed check, not per entry: every entry of the feed is matched
+    against the same prepared tuple.
+
+    Args:
+        filter_keywords: The feed's list of keywords (may be None).
+
+    Returns:
+        A tuple of lowercase keywords (empty if there is nothing to filter by).
+    """
+    if not filter_keywords:
+        return ()
+    return tuple(kw.strip().lower() for kw in filter_keywords if isinstance(kw, str) and kw.strip())
+
+def _does_item_match_filter(entry_title: Optional[str], entry_summary: Optional[str], keywords: Tuple[str, ...]) -> bool:
     """
     Checks if an RSS entry's title or summary contains any of the filter keywords (case-insensitive).
 
     Args:
         entry_title: The title of the RSS entry.
         entry_summary: The summary/description of the RSS entry.
-        filter_keywords: A list of keywords to filter by.
+        keywords: Keywords prepared by _normalize_filter_keywords.
 
     Returns:
-        True if filter_keywords is None or empty, or if any keyword is found
+        True if there are no keywords, or if any keyword is found
         in the title or summary (case-insensitive). False otherwise.
     """
-    if not filter_keywords:
+    if not keywords:
         # No keywords to filter by, all items match
         return True
 
-    # Ensure filter_keywords is a list of non-empty strings
-    valid_keywords = [kw.strip().lower() for kw in filter_keywords if isinstance(kw, str) and kw.strip()]
-    if not valid_keywords:
-         return True # If keyword list was provided but empty or contained only empty/non-string items
-
     search_string = f"{entry_title or ''} {entry_summary or ''}".lower()
-    for keyword in valid_keywords:
-        if keyword in search_string: # Check case-insensitively using lower()
-            return True
-
-    # No keywords matched
-    return False
+    return any(keyword in search_string for keyword in keywords)
 
 def _find_image_url(entry: feedparser.FeedParserDict) -> Optional[str]:
     """
@@ -187,24 +265,36 @@ def _clean_html(raw_html: str) -> str:
     return clean_text
 
 
+def _entry_date_tuple(entry: feedparser.FeedParserDict) -> Optional[Tuple[int, ...]]:
+    """
+    Returns the entry date as a (year, month, day, hour, minute, second) UTC tuple,
+    taken from the struct_time feedparser already parsed, or None if the entry has no date.
+    """
+    parsed_date = entry.get('published_parsed') or entry.get('updated_parsed') or entry.get('created_parsed')
+    if not parsed_date:
+        return None
+    return tuple(parsed_date[:6])
+
+
 # --- Core Processing Function for a Single Feed Item ---
 
-async def _process_single_feed_entry_logic(bot: Bot, db_session: AsyncSession, rss_feed: RssFeed, entry: feedparser.FeedParserDict, posted_guids: Set[str]) -> Optional[RssItem]:
+async def _process_single_feed_entry_logic(bot: Bot, rss_feed: RssFeed, entry: feedparser.FeedParserDict, posted_guids: Set[str], filter_keywords: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
     """
     Processes a single RSS feed entry, checks filters, formats content,
     and publishes to associated Telegram channels if it's new and matches filters.
-    Adds the item to the database (does NOT commit).
+    Does NOT write to the database: the returned row is stored by the caller together
+    with the other new items of the feed (see record_rss_feed_check).
 
     Args:
         bot: The Aiogram bot instance.
-        db_session: The SQLAlchemy async session for this feed's processing.
         rss_feed: The RssFeed SQLAlchemy object.
         entry: The feedparser entry dictionary.
-        posted_guids: A set of GUIDs for items already posted from this feed (pre-fetched).
+        posted_guids: A set of GUIDs for items of this feed already stored in the DB (pre-fetched in one query).
+        filter_keywords: The feed's keywords, normalized once per check by _normalize_filter_keywords.
 
     Returns:
-        The RssItem object if successfully processed and added/marked in DB,
-        otherwise None. Returns existing item if found in DB as a safeguard.
+        The values of the RssItem row to store (with is_posted set from the send result)
+        if the entry was processed, otherwise None (already stored, filtered out, no channels).
     """
     # Determine unique identifier
     # Use 'id' first, then 'link'. Ensure it's a string.
@@ -214,20 +304,12 @@ async def _process_single_feed_entry_logic(bot: Bot, db_session: AsyncSession, r
         logger.warning(f"[{rss_feed.feed_url}] Entry missing id and link, skipping: {entry.get('title', 'No Title')}")
         return None
 
-    # Check against pre-fetched set for performance
+    # Check against pre-fetched set. The caller fetches all GUIDs of the current feed entries
+    # that already exist in the DB (posted or not) in one batched query, so no per-item lookup is needed here.
+    # A concurrent insert of the same GUID is handled by the ON CONFLICT clause of record_rss_feed_check.
     if guid in posted_guids:
         logger.debug(f"[{rss_feed.feed_url}] Item with GUID {guid} already in pre-fetched set, skipping.")
         return None
-    else:
-         # As a fallback/safeguard, double check database for this specific GUID
-         # This helps prevent reprocessing if the pre-fetched set was incomplete
-         # due to a prior crash or concurrent process (though scheduler should prevent concurrent).
-         # This check is less efficient than the set lookup, but safer.
-         # Use db_session.get if GUID was the primary key, but it's a field with UniqueConstraint.
-         existing_item = await get_rss_item_by_guid(db_session, rss_feed.id, guid)
-         if existing_item:
-              logger.warning(f"[{rss_feed.feed_url}] Item with GUID {guid} already found in DB despite not being in posted_guids set. Skipping.")
-              return existing_item # Return existing item if found, don't re-process
 
 
     # Extract relevant fields
@@ -236,23 +318,19 @@ async def _process_single_feed_entry_logic(bot: Bot, db_session: AsyncSession, r
     link = entry.get('link')
     # Try summary, then content value
     summary_raw = entry.get('summary')
-    if not summary_raw and 'content' in entry and isinstance(entry['content'], list) and entry['content']):
+    if not summary_raw and 'content' in entry and isinstance(entry['content'], list) and entry['content']:
         first_content = entry['content'][0]
         if isinstance(first_content, dict):
             summary_raw = first_content.get('value')
 
 
     # Extract published date. feedparser gives a struct_time in UTC.
-    # Use get() with a default of None to avoid KeyError if fields are missing
-    published_parsed = entry.get('published_parsed') or entry.get('updated_parsed') or entry.get('created_parsed')
+    published_parsed = _entry_date_tuple(entry)
     published_at_feed = None
     if published_parsed:
         try:
-            # Convert struct_time to timezone-aware datetime object (UTC)
-            # struct_time is a tuple (year, month, day, hour, minute, second, weekday, yearday, isdst)
-            # Use slice [0:6] to get (year, month, day, hour, minute, second)
-            published_dt = datetime.datetime(*published_parsed[:6], tzinfo=datetime.timezone.utc)
-            published_at_feed = published_dt
+            # Convert (year, month, day, hour, minute, second) to timezone-aware datetime object (UTC)
+            published_at_feed = datetime.datetime(*published_parsed, tzinfo=datetime.timezone.utc)
         except (ValueError, TypeError, IndexError) as e:
             logger.warning(f"[{rss_feed.feed_url}] Could not parse published date for {guid} ({entry.get('title', 'No Title')}): {published_parsed}. Error: {e}")
             published_at_feed = None # Keep as None if parsing fails
@@ -265,8 +343,8 @@ async def _process_single_feed_entry_logic(bot: Bot, db_session: AsyncSession, r
     logger.info(f"[{rss_feed.feed_url}] Processing new item: {title or link or guid}")
 
     # Apply keyword filters
-    if not _does_item_match_filter(title, summary_raw, rss_feed.filter_keywords):
-        logger.debug(f"[{rss_feed.feed_url}] Item does not match filter keywords ({rss_feed.filter_keywords}), skipping: {title or guid}")
+    if not _does_item_match_filter(title, summary_raw, filter_keywords):
+        logger.debug(f"[{rss_feed.feed_url}] Item does not match filter keywords ({filter_keywords}), skipping: {title or guid}")
         # Optionally, save item as 'filtered_out' with is_posted=False to avoid re-checking but not posting.
         # For now, just skip this item entirely if filtered out.
         return None
@@ -347,113 +425,54 @@ async def _process_single_feed_entry_logic(bot: Bot, db_session: AsyncSession, r
         return None # Skip item if no channels
 
 
-    # Iterate through configured channels (which are stored as strings like '-1001234567890' or '@channelname')
-    # send_post_content sends to a single chat_id. Loop through channels.
-    successfully_sent_to_any_channel = False
-    for channel_id_str in rss_feed.channels:
-        logger.info(f"[{rss_feed.feed_url}] Attempting to post item '{title or guid}' to channel {channel_id_str}")
-        try:
-            # Call send_post_content for each channel. It returns a list of sent messages.
-            # If the list is not empty, it means at least one message part was sent successfully to this channel.
-            sent_messages = await send_post_content(
-                bot=bot, # Pass the bot instance
-                chat_id=channel_id_str, # Use string directly for chat_id
-                text=message_text, # Pass the formatted MarkdownV2 text
-                media_items=media_items, # Pass the prepared media items (list)
-                parse_mode="MarkdownV2" # Use MarkdownV2 parse mode
-                # reply_markup=... # Add markup if RSS items should have inline buttons
-            )
-            if sent_messages: # send_post_content returns [] on failure
-                logger.info(f"[{rss_feed.feed_url}] Successfully sent item '{title or guid}' to channel {channel_id_str}. Message IDs: {[m.message_id for m in sent_messages]}")
-                successfully_sent_to_any_channel = True # Mark success if sent to ANY channel
-            else:
-                 logger.error(f"[{rss_feed.feed_url}] Failed to send item '{title or guid}' to channel {channel_id_str}. send_post_content returned empty list.")
-                 # Continue to next channel
-
+    # Channels are independent chats (stored as strings like '-1001234567890' or '@channelname'),
+    # so the item is sent to all of them concurrently, bounded by RSS_SEND_CONCURRENCY:
+    # wall-clock time is ~ceil(N / K) round-trips instead of N.
+    item_label = title or guid
 
+    async def _send_to_channel(channel_id_str: str) -> bool:
+        logger.info(f"[{rss_feed.feed_url}] Attempting to post item '{item_label}' to channel {channel_id_str}")
+        try:
+            async with _get_send_semaphore():
+                # send_post_content returns a list of sent messages; a non-empty list means
+                # at least one message part was sent successfully to this channel.
+                sent_messages = await send_post_content(
+                    bot=bot, # Pass the bot instance
+                    chat_id=channel_id_str, # Use string directly for chat_id
+                    text=message_text, # Pass the formatted MarkdownV2 text
+                    media_items=media_items, # Pass the prepared media items (list)
+                    parse_mode="MarkdownV2" # Use MarkdownV2 parse mode
+                    # reply_markup=... # Add markup if RSS items should have inline buttons
+                )
         except Exception as send_error: # Catch any exception during sending to a specific channel
-            logger.exception(f"[{rss_feed.feed_url}] Exception occurred while sending item '{title or guid}' to channel {channel_id_str}: {send_error}")
-            # Continue to next channel even if one fails
-
-    # Add item to the database and mark publication status
-    # Add the item to the database if we processed it (passed filters, attempted sending).
-    # Use is_posted=True ONLY IF successfully sent to AT LEAST ONE channel.
-    # If it passed filters and had channels, but failed to send to all, still add item with is_posted=False
-    # to avoid reprocessing it in the future.
-
-    # Add the item to DB regardless of send success, but after filtering.
-    # This ensures we don't process it again.
-    try:
-        # Re-check existence just before adding, in case of race conditions (unlikely with scheduler)
-        existing_item_check = await get_rss_item_by_guid(db_session, rss_feed.id, guid)
-        if existing_item_check:
-            logger.warning(f"[{rss_feed.feed_url}] Item with GUID {guid} already exists in DB before add, skipping add. Could indicate concurrency issue.")
-             # If it exists, and we successfully sent it now but it wasn't marked posted, update it.
-            if successfully_sent_to_any_channel and not existing_item_check.is_posted:
-                 await mark_rss_item_as_posted(db_session, existing_item_check.id, is_posted_flag=True)
-                 logger.info(f"[{rss_feed.feed_url}] Marked existing item {guid} (ID: {existing_item_check.id}) as posted=True.")
-            return existing_item_check # Return the existing item
-
-        # Add new item to DB. add_rss_item defaults is_posted=False.
-        new_rss_item = await add_rss_item(
-            session=db_session,
-            feed_id=rss_feed.id,
-            item_guid=guid,
-            title=title,
-            link=link,
-            description=description_clean, # Save full cleaned description
-            published_at_feed=published_at_feed # Save parsed datetime (timezone-aware UTC)
-        )
-
-        if new_rss_item:
-             # Mark as posted=True ONLY IF successfully sent to at least one channel
-             if successfully_sent_to_any_channel:
-                 updated_item = await mark_rss_item_as_posted(db_session, new_rss_item.id, is_posted_flag=True)
-                 if updated_item:
-                      logger.info(f"[{rss_feed.feed_url}] Added and marked RSS item {guid} as posted=True (ID: {updated_item.id}).")
-                      return updated_item
-                 else:
-                      logger.error(f"[{rss_feed.feed_url}] Added RSS item {guid} (ID: {new_rss_item.id}) but failed to mark as posted=True!")
-                      return new_rss_item # Return item even if update failed
-             else:
-                 # Item added, but not successfully posted to any channel. It remains is_posted=False.
-                 logger.warning(f"[{rss_feed.feed_url}] Added RSS item {guid} (ID: {new_rss_item.id}) with is_posted=False (failed to send).")
-                 return new_rss_item # Return the new item (with is_posted=False)
-
-        else:
-             # Should not happen if add_rss_item doesn't raise exception but returns None
-             logger.error(f"[{rss_feed.feed_url}] add_rss_item returned None unexpectedly for GUID {guid}.")
-             return None
+            logger.exception(f"[{rss_feed.feed_url}] Exception occurred while sending item '{item_label}' to channel {channel_id_str}: {send_error}")
+            return False # Other channels are unaffected
 
+        if sent_messages: # send_post_content returns [] on failure
+            logger.info(f"[{rss_feed.feed_url}] Successfully sent item '{item_label}' to channel {channel_id_str}. Message IDs: {[m.message_id for m in sent_messages]}")
+            return True
+        logger.error(f"[{rss_feed.feed_url}] Failed to send item '{item_label}' to channel {channel_id_str}. send_post_content returned empty list.")
+        return False
 
-    except IntegrityError as e:
-        # This should be caught by the existing_item_check above, but handle defensively
-        logger.warning(f"[{rss_feed.feed_url}] Integrity error (likely duplicate GUID) when adding item {guid}: {e}. Item likely already exists.")
-        # Fetch and return the existing item if possible? Or just return None?
-        # Let's fetch and return the existing item for consistency.
-        try:
-             existing_item_on_error = await get_rss_item_by_guid(db_session, rss_feed.id, guid)
-             if existing_item_on_error:
-                  # If we successfully sent it now but it wasn't marked posted, update it.
-                 if successfully_sent_to_any_channel and not existing_item_on_error.is_posted:
-                      await mark_rss_item_as_posted(db_session, existing_item_on_error.id, is_posted_flag=True)
-                      logger.info(f"[{rss_feed.feed_url}] Marked item {guid} (ID: {existing_item_on_error.id}) as posted=True after IntegrityError.")
-                 return existing_item_on_error
-             else:
-                  # Item not found even after IntegrityError? Weird state.
-                  logger.error(f"[{rss_feed.feed_url}] Item with GUID {guid} not found after IntegrityError.")
-                  return None
-        except Exception as fetch_e:
-             logger.error(f"[{rss_feed.feed_url}] Error fetching item after IntegrityError for GUID {guid}: {fetch_e}.")
-             return None
+    send_results = await asyncio.gather(*(_send_to_channel(channel_id_str) for channel_id_str in rss_feed.channels))
+    successfully_sent_to_any_channel = any(send_results) # Mark success if sent to ANY channel
 
-    except SQLAlchemyError as e:
-         logger.exception(f"[{rss_feed.feed_url}] Database error while adding/marking item {guid}: {e}")
-         # Let the outer session handling deal with rollback/commit for this feed
-         return None # Indicate DB failure for this item
-    except Exception as e:
-         logger.exception(f"[{rss_feed.feed_url}] Unexpected error while adding/marking item {guid}: {e}")
-         return None # Indicate unexpected failure
+    # Row for the database. It is stored even if sending failed everywhere (is_posted=False),
+    # so that the item is not reprocessed in the future; is_posted=True ONLY IF successfully
+    # sent to AT LEAST ONE channel.
+    if successfully_sent_to_any_channel:
+        logger.info(f"[{rss_feed.feed_url}] Item {guid} will be stored as posted=True.")
+    else:
+        logger.warning(f"[{rss_feed.feed_url}] Item {guid} will be stored with is_posted=False (failed to send).")
+    return {
+        'feed_id': rss_feed.id,
+        'item_guid': guid,
+        'title': title,
+        'link': link,
+        'description': description_clean, # Save full cleaned description
+        'published_at_feed': published_at_feed, # Parsed datetime (timezone-aware UTC)
+        'is_posted': successfully_sent_to_any_channel,
+    }
 
 
 # --- Main Function for Checking a Single Feed ---
@@ -497,15 +516,12 @@ async def check_and_publish_single_rss_feed(bot: Bot, session_factory: Callable[
         # 2. Парсинг RSS-ленты
         parsed_feed = None
         try:
-            # Parse the feed in a thread pool to avoid blocking the event loop
-            # feedparser.parse is synchronous I/O and should not run directly
-            # in the async event loop. Use run_in_executor.
-            loop = asyncio.get_running_loop()
-            # Using a timeout for parsing to prevent hanging on unresponsive feeds
-            # RSS_PARSE_TIMEOUT_SECONDS = 30 # Defined as constant
+            # Download over the shared HTTP session, then parse in a thread pool
+            # (feedparser.parse is synchronous and should not run directly in the event loop).
+            # Using a timeout for fetching + parsing to prevent hanging on unresponsive feeds
             logger.debug(f"Attempting to parse feed URL: {feed_url} with timeout {RSS_PARSE_TIMEOUT_SECONDS}s.")
             parsed_feed = await asyncio.wait_for(
-                loop.run_in_executor(None, feedparser.parse, feed_url),
+                _fetch_and_parse_feed(feed_url),
                 timeout=RSS_PARSE_TIMEOUT_SECONDS
             )
 
@@ -540,40 +556,44 @@ async def check_and_publish_single_rss_feed(bot: Bot, session_factory: Callable[
         # This session will be committed or rolled back together for THIS feed's processing run.
         async with session_factory() as session:
              try:
-                # 3. Получение опубликованных записей (within the processing session)
-                # Fetch all GUIDs that are marked as posted for THIS feed ID.
-                posted_guids_list = await get_posted_item_guids_for_feed(session, feed.id)
+                # 3. Получение уже сохранённых записей (within the processing session)
+                # One IN query for all GUIDs of the current entries (posted or not),
+                # instead of a separate lookup for every entry missing from the "posted" set.
+                guided_entries = [
+                    (entry, guid) for entry, guid in
+                    ((entry, str(entry.get('id') or entry.get('link') or '').strip()) for entry in parsed_feed.entries)
+                    if guid
+                ]
+                entry_guids = [guid for _, guid in guided_entries]
+                posted_guids_list = await get_existing_item_guids_for_feed(session, feed.id, entry_guids) if entry_guids else []
                 posted_guids_set = set(posted_guids_list)
-                logger.debug(f"[{feed_url}] Found {len(posted_guids_set)} already posted GUIDs.")
+                logger.debug(f"[{feed_url}] Found {len(posted_guids_set)} already stored GUIDs among {len(entry_guids)} entries.")
 
                 # 4. Итерация по записям ленты
                 # Iterate in reverse to post older items first (if feed is newest first).
                 # feedparser entries are usually in the order provided by the feed, often newest first.
                 # Let's reverse the entries for chronological posting IF dates are available,
                 # otherwise keep the original order.
-                entries_to_process = list(parsed_feed.entries) # Convert to list
-
-                # Check if entries have parseable dates and sort them
-                def get_entry_date(entry):
-                     parsed_date = entry.get('published_parsed') or entry.get('updated_parsed') or entry.get('created_parsed')
-                     if parsed_date:
-                          try:
-                               # Return a sortable value (e.g., timestamp)
-                               return datetime.datetime(*parsed_date[:6], tzinfo=datetime.timezone.utc).timestamp()
-                          except (ValueError, TypeError, IndexError):
-                               return None # Cannot parse date
-                     return None # No date field found
-
+                # Only entries not yet stored are sorted and processed. On an idle check (nothing new in the feed)
+                # the list is empty and the check goes straight to updating last_checked_at.
+                entries_to_process = [entry for entry, guid in guided_entries if guid not in posted_guids_set]
+                if not entries_to_process:
+                    logger.info(f"[{feed_url}] No new entries.")
+
+                # Check if entries have dates and sort them.
+                # feedparser already normalized dates to UTC struct_time: its first six fields
+                # (year, month, day, hour, minute, second) compare chronologically as a plain tuple,
+                # so no datetime has to be built (and no exception handled) just to order entries.
                 dated_entries = []
                 undated_entries = []
                 for entry in entries_to_process:
-                    date_val = get_entry_date(entry)
+                    date_val = _entry_date_tuple(entry)
                     if date_val is not None:
                          dated_entries.append((date_val, entry))
                     else:
                          undated_entries.append(entry)
 
-                # Sort dated entries by timestamp (ascending for chronological order)
+                # Sort dated entries by date (ascending for chronological order)
                 dated_entries.sort(key=lambda x: x[0])
 
                 # Combine - process dated entries chronologically, then undated in original feed order
@@ -582,45 +602,51 @@ async def check_and_publish_single_rss_feed(bot: Bot, session_factory: Callable[
 
                 logger.info(f"[{feed_url}] Processing {len(sorted_entries)} entries ({len(dated_entries)} with dates, {len(undated_entries)} without).")
 
-                new_items_count = 0
+                # Rows of the processed entries, written with one INSERT after the loop
+                new_item_rows: List[Dict[str, Any]] = []
+                # Keywords are the same for every entry of the feed: normalize them once, not per entry
+                filter_keywords = _normalize_filter_keywords(feed.filter_keywords)
                 for entry in sorted_entries:
                     # Process single entry - uses the session from the outer context
-                    # _process_single_feed_entry_logic handles filtering, formatting, sending, and adding to DB (without commit)
+                    # _process_single_feed_entry_logic handles filtering, formatting and sending, and returns the row to store
                     try:
                          # _process_single_feed_entry_logic needs bot instance
-                         processed_item = await _process_single_feed_entry_logic(
+                         item_row = await _process_single_feed_entry_logic(
                              bot=bot, # Pass bot instance
-                             db_session=session,
                              rss_feed=feed,
                              entry=entry,
-                             posted_guids=posted_guids_set # Pass the set of already posted GUIDs
+                             posted_guids=posted_guids_set, # Pass the set of already posted GUIDs
+                             filter_keywords=filter_keywords
                          )
-                         if processed_item:
-                            new_items_count += 1
-                         # Note: _process_single_feed_entry_logic adds/marks items in DB but does NOT commit.
-                         # Commit happens below after processing all entries for this feed.
+                         if item_row:
+                            new_item_rows.append(item_row)
+                            # A repeated GUID later in the same feed is skipped (one row per GUID in the batch)
+                            posted_guids_set.add(item_row['item_guid'])
+                         # Note: _process_single_feed_entry_logic does not touch the DB.
+                         # The rows are written below, after processing all entries for this feed.
                     except Exception as entry_e:
                          # Catch errors processing a single entry, log, and continue to the next entry
                          entry_guid = entry.get('id') or entry.get('link', 'N/A')
                          entry_title = entry.get('title', 'No Title')
                          logger.exception(f"[{feed_url}] Error processing entry '{entry_title}' ({entry_guid}): {entry_e}")
-                         # Do not increment new_items_count if processing failed for this entry
+                         # No row is stored if processing failed for this entry
 
 
-                logger.info(f"[{feed_url}] Finished processing entries. Attempted to post {new_items_count} new item(s) from {len(parsed_feed.entries)} total entries.")
+                logger.info(f"[{feed_url}] Finished processing entries. Attempted to post {len(new_item_rows)} new item(s) from {len(parsed_feed.entries)} total entries.")
 
-                # 11. Обновление времени последней проверки
+                # All new items of this check go to the DB as one multi-row INSERT ... ON CONFLICT
+                # (one round-trip instead of one per item; a GUID stored concurrently does not fail the batch).
+                # 11. Обновление времени последней проверки - в том же запросе, что и вставка записей
                 # Update this only if the feed was successfully parsed and processed (entry loop completed).
                 # Use timezone-aware datetime (UTC recommended for DB storage).
-                await update_rss_feed_last_checked(session, feed.id, datetime.datetime.now(datetime.timezone.utc))
+                await record_rss_feed_check(session, feed.id, new_item_rows, datetime.datetime.now(datetime.timezone.utc))
                 logger.info(f"[{feed_url}] Updated last checked time.")
 
                 # 10. Отметка об публикации (Commit)
-                # The session context manager (`async with session_factory():`)
-                # handles committing the session upon successful exit of the block.
-                # All changes within this block (added items, marked items, updated last_checked_at)
-                # will be committed together.
+                # All changes within this block (added items, updated last_checked_at) are written
+                # in one commit.
                 logger.debug(f"[{feed_url}] Committing changes for feed ID {feed.id}")
+                await session.commit()
 
              except SQLAlchemyError as e:
                  logger.exception(f"[{feed_url}] Database error during feed processing or committing: {e}")
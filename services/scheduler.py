@@ -4,19 +4,23 @@
 # Основные компоненты планировщика задач с использованием APScheduler и SQLAlchemyJobStore.
 # Управляет расписанием публикаций постов и проверок RSS-лент, а также удалением постов.
 
+from __future__ import annotations
+
+import asyncio
 import datetime
 import logging
 import os
+import re
 import json
-from typing import TYPE_CHECKING, Any, Dict, Optional, List, Callable
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, Callable, Tuple
 
-import pytz
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger # Импорт для планирования RSS-проверок
 from apscheduler.jobstores.base import JobLookupError
+from cachetools import LRUCache
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 # Импорты зависимостей из проекта:
@@ -27,11 +31,14 @@ from services.db import (
     get_post_by_id,
     update_post_status,
     get_all_posts_for_scheduling,
+    get_sent_posts_pending_deletion, # Используется в restore_scheduled_jobs
     get_all_active_rss_feeds, # Используется в restore_scheduled_jobs
     get_rss_feed_by_id # Используется в _task_check_rss_feed
 )
 # Импорт Telegram API сервисов
 from services.telegram_api import send_post_content, delete_telegram_messages
+# Кэшированное получение объектов часовых поясов
+from utils.datetime_utils import get_timezone
 # Импорт RSS сервиса
 import services.rss_service # Импорт сервиса для проверки RSS (вызывается из задачи)
 
@@ -40,7 +47,6 @@ if TYPE_CHECKING:
     from aiogram import Bot
     # Импорт моделей для аннотаций (если нужны в сигнатурах задач, restore и т.п.)
     from models.post import Post
-    from models.rss_feed import RssFeed
 
 
 # Настройка логирования
@@ -51,6 +57,85 @@ logger = logging.getLogger(__name__)
 TIME_ZONE_STR = os.getenv('TIME_ZONE', 'Europe/Berlin')
 # Название таблицы в БД для хранения задач APScheduler.
 APS_JOBS_TABLE_NAME = 'apscheduler_jobs'
+# Предкомпилированные шаблоны для параметров расписания: одна проверка и разбор вместо split + int + проверок диапазона.
+_CRON_TIME_RE = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$') # 'HH:MM'
+_CRON_MONTH_DAY_RE = re.compile(r'^(0?[1-9]|[12]\d|3[01])\.(0?[1-9]|1[0-2])$') # 'DD.MM'
+# Максимум одновременных запросов отправки в Telegram из задач публикации
+# (глобальный лимит Telegram - ~30 сообщений в секунду).
+PUBLISH_CONCURRENCY = int(os.getenv('PUBLISH_CONCURRENCY', '25'))
+# parse_mode для публикуемых постов (одна константа вместо выбора при каждой отправке)
+POST_PARSE_MODE = 'HTML'
+_publish_semaphore: Optional[asyncio.Semaphore] = None
+# Блокировки по чатам: отправки в один чат идут строго по очереди (asyncio.Lock выдается в порядке FIFO),
+# отправки в разные чаты - параллельно. Долгая загрузка медиа в канал A не задерживает канал B.
+# Слабые ссылки: блокировка живет, пока ее держит или ждет хотя бы одна отправка,
+# после чего удаляется сама - словарь не растет со временем на каждый когда-либо использованный чат.
+_chat_send_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+# Подготовленные InputMedia для повторяющихся постов: post_id -> (media_paths, список InputMedia).
+# Повторяющийся пост срабатывает много раз с теми же файлами - валидация (stat + MIME) и сборка
+# объектов выполняются один раз, а после первой отправки файлы заменяются на file_id Telegram
+# (_remember_uploaded_media). Запись сбрасывается при перепланировании поста и при смене media_paths.
+# LRU с ограничением размера: записи удаленных/отмененных постов вытесняются, а не копятся до рестарта.
+PREPARED_MEDIA_CACHE_SIZE = 1024
+_prepared_media_cache: 'LRUCache[int, Tuple[Tuple[str, ...], List[Any]]]' = LRUCache(maxsize=PREPARED_MEDIA_CACHE_SIZE)
+# Объекты времени выполнения для задач из хранилища: bot, session_factory, scheduler (заполняется init_scheduler).
+# SQLAlchemyJobStore сохраняет задачи в БД через pickle, поэтому в аргументах задачи остаются только ID
+# поста/ленты, а несериализуемые бот, фабрика сессий и планировщик берутся отсюда при запуске задачи.
+_job_runtime: Dict[str, Any] = {}
+
+
+# ID задач детерминированы и вычисляются из ID поста/ленты: ни в БД, ни где-либо еще они не хранятся,
+# а повторное планирование заменяет задачу с тем же ID (replace_existing=True) одним вызовом.
+def get_publish_job_id(post_id: int) -> str:
+    """ID задачи публикации поста."""
+    return f'post_publish_{post_id}'
+
+
+def get_delete_job_id(post_id: int, fire_ts: Optional[int] = None) -> str:
+    """
+    ID задачи удаления опубликованного поста.
+
+    У повторяющегося поста каждое срабатывание удаляет свои копии отдельной задачей:
+    в ID добавляется метка времени удаления (fire_ts), иначе новая задача заменила бы
+    еще не выполненную задачу предыдущей копии.
+    """
+    if fire_ts is None:
+        return f'post_delete_{post_id}'
+    return f'post_delete_{post_id}_{fire_ts}'
+
+
+def _is_post_delete_job_id(job_id: str, post_id: int) -> bool:
+    """Относится ли задача к удалению поста: общая post_delete_<id> или задача срабатывания post_delete_<id>_<ts>."""
+    post_delete_job_id = get_delete_job_id(post_id)
+    return job_id == post_delete_job_id or job_id.startswith(f'{post_delete_job_id}_')
+
+
+def get_rss_check_job_id(rss_feed_id: int) -> str:
+    """ID задачи проверки RSS-ленты."""
+    return f'rss_check_{rss_feed_id}'
+
+
+# sent_message_data повторяющегося поста с автоудалением хранит сообщения всех срабатываний,
+# которые еще ждут удаления: публикация дополняет словарь, задача удаления убирает удаленное.
+def _merge_message_data(current: Optional[Dict[str, List[int]]], added: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Объединяет словари {chat_id: [message_id, ...]} без повторов ID."""
+    merged = {chat_id: list(message_ids) for chat_id, message_ids in (current or {}).items()}
+    for chat_id, message_ids in added.items():
+        chat_ids_list = merged.setdefault(chat_id, [])
+        chat_ids_list.extend(m for m in message_ids if m not in chat_ids_list)
+    return merged
+
+
+def _subtract_message_data(current: Optional[Dict[str, List[int]]], removed: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """Убирает из словаря {chat_id: [message_id, ...]} указанные сообщения; пустые чаты отбрасываются."""
+    result = {}
+    for chat_id, message_ids in (current or {}).items():
+        removed_ids = set(removed.get(chat_id, ()))
+        remaining = [m for m in message_ids if m not in removed_ids]
+        if remaining:
+            result[chat_id] = remaining
+    return result
+
 
 # Вспомогательная фабрика сессий для использования внутри задач.
 # Передача фабрики позволяет задачам создавать свои собственные сессии.
@@ -84,15 +169,14 @@ def _parse_cron_params(cron_params: Dict[str, Any]) -> Dict[str, Any]:
     if not time_str:
         raise ValueError("Cron parameters must include 'time' in HH:MM format (e.g., '14:30').")
 
-    try:
-        hour, minute = map(int, time_str.split(':'))
-        # APScheduler CronTrigger expects strings for numerical fields in **kwargs for older versions,
-        # and can accept ints for newer versions, but string is safer for compatibility.
-        trigger_args['hour'] = str(hour)
-        trigger_args['minute'] = str(minute)
-    except ValueError:
+    time_match = _CRON_TIME_RE.match(time_str) if isinstance(time_str, str) else None
+    if not time_match:
          # This should ideally be caught by validate_cron_params in utils, but handle defensively.
         raise ValueError(f"Invalid time format: {time_str}. Must be HH:MM.")
+    # APScheduler CronTrigger expects strings for numerical fields in **kwargs for older versions,
+    # and can accept ints for newer versions, but string is safer for compatibility.
+    trigger_args['hour'] = str(int(time_match.group(1)))
+    trigger_args['minute'] = str(int(time_match.group(2)))
 
     if cron_type == 'daily':
         pass # Only time needed
@@ -111,14 +195,11 @@ def _parse_cron_params(cron_params: Dict[str, Any]) -> Dict[str, Any]:
         month_day_str = cron_params.get('month_day') # 'DD.MM' (string)
         if not isinstance(month_day_str, str):
              raise ValueError("For 'yearly' cron, 'month_day' (string 'DD.MM') is required.")
-        try:
-            day, month = map(int, month_day_str.split('.'))
-            if not (1 <= month <= 12) or not (1 <= day <= 31): # Basic range check, full validation in utils
-                 raise ValueError("Invalid day.month format or range.")
-            trigger_args['month'] = str(month)
-            trigger_args['day'] = str(day)
-        except ValueError:
+        month_day_match = _CRON_MONTH_DAY_RE.match(month_day_str) # Basic range check, full validation in utils
+        if not month_day_match:
             raise ValueError(f"Invalid month_day format: {month_day_str}. Must be DD.MM.")
+        trigger_args['day'] = str(int(month_day_match.group(1)))
+        trigger_args['month'] = str(int(month_day_match.group(2)))
     else:
         # Unknown or missing type
         raise ValueError(f"Unsupported cron type: {cron_type}. Supported types: daily, weekly, monthly, yearly.")
@@ -131,6 +212,134 @@ def _parse_cron_params(cron_params: Dict[str, Any]) -> Dict[str, Any]:
 
 
 # 4. Функции задач (вызываются планировщиком)
+def _get_publish_semaphore() -> asyncio.Semaphore:
+    """
+    Возвращает общий семафор, ограничивающий число одновременных отправок в Telegram.
+    Создается лениво, внутри работающего event loop планировщика.
+    """
+    global _publish_semaphore
+    if _publish_semaphore is None:
+        _publish_semaphore = asyncio.Semaphore(PUBLISH_CONCURRENCY)
+    return _publish_semaphore
+
+
+def _get_chat_send_lock(chat_id_str: str) -> asyncio.Lock:
+    """Возвращает (создавая при необходимости) блокировку отправки для чата."""
+    lock = _chat_send_locks.get(chat_id_str)
+    if lock is None:
+        lock = _chat_send_locks[chat_id_str] = asyncio.Lock()
+    return lock
+
+
+async def _get_prepared_media(post: 'Post', prepare: Callable[[List[str]], List[Any]]) -> List[Any]:
+    """
+    Возвращает список InputMedia для поста. Для повторяющихся постов результат кэшируется
+    по post_id, пока не изменится набор media_paths.
+    Подготовка (stat, проверка MIME каждого файла - синхронные обращения к диску) выполняется
+    в пуле потоков, чтобы медленный диск не останавливал event loop с хэндлерами и другими задачами;
+    кэш читается и обновляется только в потоке event loop.
+
+    Args:
+        post: Публикуемый пост (media_paths не пуст).
+        prepare: Функция подготовки InputMedia из путей (services.content_manager.prepare_input_media_list).
+
+    Returns:
+        Список подготовленных InputMedia (может быть пустым, если ни один файл не прошел валидацию).
+    """
+    paths_key = tuple(post.media_paths)
+    cached = _prepared_media_cache.get(post.id)
+    if cached is not None and cached[0] == paths_key:
+        return cached[1]
+
+    input_media_items = await asyncio.to_thread(prepare, post.media_paths)
+    # Кэшируем только успешную подготовку повторяющихся постов: одноразовый пост больше не сработает.
+    if post.schedule_type == 'recurring' and input_media_items:
+        _prepared_media_cache[post.id] = (paths_key, input_media_items)
+    return input_media_items
+
+
+def _message_file_id(message: Any) -> Optional[str]:
+    """Возвращает file_id медиа отправленного сообщения (фото - самого большого размера) или None."""
+    if message.photo:
+        return message.photo[-1].file_id
+    media = message.video or message.document
+    return media.file_id if media is not None else None
+
+
+def _remember_uploaded_media(post: 'Post', sent_messages: List[Any]) -> None:
+    """
+    Заменяет в кэше подготовленных медиа повторяющегося поста локальные файлы на file_id,
+    полученные от Telegram при первой отправке. Следующие срабатывания отправляют уже загруженные
+    файлы по file_id, а не загружают их заново с диска при каждом запуске.
+
+    Args:
+        post: Отправленный пост.
+        sent_messages: Сообщения, отправленные в один чат (в том числе отдельный текст перед медиагруппой).
+    """
+    cached = _prepared_media_cache.get(post.id)
+    if cached is None:
+        return
+    paths_key, input_media_items = cached
+    if all(isinstance(item.media, str) for item in input_media_items):
+        return # Уже file_id (другой чат или прошлое срабатывание)
+    file_ids = [file_id for file_id in map(_message_file_id, sent_messages) if file_id]
+    if len(file_ids) != len(input_media_items):
+        return
+    _prepared_media_cache[post.id] = (
+        paths_key,
+        [item.model_copy(update={'media': file_id}) for item, file_id in zip(input_media_items, file_ids)],
+    )
+
+
+async def _send_post_to_chat(
+    bot: 'Bot',
+    post: 'Post',
+    chat_id_str: str,
+    input_media_items: List[Any]
+) -> List[int]:
+    """
+    Отправляет пост в один чат под блокировкой этого чата и общим семафором отправки.
+
+    Args:
+        bot: Экземпляр Aiogram Bot.
+        post: Публикуемый пост.
+        chat_id_str: ID чата (строка) для отправки.
+        input_media_items: Подготовленный список InputMedia (может быть пустым).
+
+    Returns:
+        Список ID всех отправленных в чат сообщений (для медиагруппы - N штук).
+        Пустой список, если отправка не удалась.
+    """
+    try:
+        # Сначала очередь чата, затем общий семафор: ожидающие своей очереди в чат не занимают слоты отправки.
+        async with _get_chat_send_lock(chat_id_str), _get_publish_semaphore():
+            # send_post_content returns a list of sent Message objects.
+            # For single message/media, list contains 1 item. For media group, list contains N items.
+            # For deletion we need ALL message IDs for a chat ID (deleting the first message
+            # of a media group does NOT delete the whole group).
+            sent_messages_list = await send_post_content(
+                bot=bot,
+                chat_id=chat_id_str,
+                text=post.text,
+                media_items=input_media_items, # Pass the list of InputMedia objects
+                parse_mode=POST_PARSE_MODE
+            )
+    except Exception as send_error:
+        logger.exception(f"Ошибка при отправке поста {post.id} в чат {chat_id_str}: {send_error}")
+        return []
+
+    if not sent_messages_list:
+        # send_post_content returns empty list on failure
+        logger.error(f"Не удалось отправить пост {post.id} в чат {chat_id_str}. send_post_content вернул пустой список.")
+        return []
+
+    if input_media_items:
+        _remember_uploaded_media(post, sent_messages_list)
+    message_ids = [m.message_id for m in sent_messages_list]
+    logger.info(f"Пост {post.id} отправлен в чат {chat_id_str}. IDs: {message_ids}")
+    return message_ids
+
+
 async def _task_publish_post(
     bot: 'Bot',
     session_factory: Callable[..., AsyncSession],
@@ -153,8 +362,10 @@ async def _task_publish_post(
             post: Optional['Post'] = await get_post_by_id(session, post_id)
             if not post:
                 logger.error(f"Задача публикации поста {post_id} не выполнена: Пост с ID {post_id} не найден в БД.")
-                # Пост удален из БД до выполнения задачи. Задача завершается.
+                # Пост удален из БД до выполнения задачи. Повторяющаяся задача иначе срабатывала бы
+                # снова и снова: снимаем ее по детерминированному ID (для одноразовой это no-op).
                 # No need to update status as post doesn't exist
+                await remove_scheduled_job(scheduler_instance, get_publish_job_id(post_id))
                 return
 
             if post.status not in ['scheduled', 'pending_reschedule']:
@@ -186,7 +397,7 @@ async def _task_publish_post(
             input_media_items = []
             if post.media_paths:
                  try:
-                     input_media_items = prepare_input_media_list(post.media_paths)
+                     input_media_items = await _get_prepared_media(post, prepare_input_media_list)
                      if post.media_paths and not input_media_items:
                           # Failed to prepare media files (e.g., not found, invalid format)
                           logger.error(f"Пост {post.id}: Не удалось подготовить медиафайлы из путей: {post.media_paths}. Отправка отменена.")
@@ -202,62 +413,20 @@ async def _task_publish_post(
                       return # Exit task on media preparation failure
 
 
-            sent_message_data: Dict[str, int] = {} # Dictionary to store chat_id_str: message_id_int
-            successfully_sent_chats = []
-            # Iterate through configured channels and send the post
-            for chat_id_str in post.chat_ids:
-                try:
-                    # Call send_post_content for EACH chat_id if needed, or if send_post_content
-                    # handles multiple chat_ids internally (which it currently doesn't based on signature).
-                    # send_post_content sends to *one* chat_id. Need to loop here.
-
-                    # Pass text and media items to the sender.
-                    # send_post_content returns a list of sent Message objects.
-                    # For single message/media, list contains 1 item. For media group, list contains N items.
-                    # We need the message_id of the *first* or *main* message in the group for potential deletion.
-                    # Telegram's deleteMessage API takes message_id. For media groups, deleting the first message
-                    # does NOT delete the whole group. You must delete *all* messages in the group.
-                    # send_media_group returns a list of all sent messages in the group.
-
-                    sent_messages_list = await send_post_content(
-                        bot=bot,
-                        chat_id=chat_id_str,
-                        text=post.text,
-                        media_items=input_media_items, # Pass the list of InputMedia objects
-                        parse_mode='HTML' # Or get from user settings/post config
-                        # reply_markup=... # Add markup if needed for post content (e.g., inline buttons)
-                    )
-
-                    if sent_messages_list:
-                         # Store chat_id and message_ids of ALL messages sent to this chat
-                         # For deletion, we need ALL message IDs for a chat ID.
-                         # Let's store as {chat_id_str: [message_id1, message_id2, ...]}
-                         sent_message_data[chat_id_str] = [m.message_id for m in sent_messages_list]
-                         logger.info(f"Пост {post.id} отправлен в чат {chat_id_str}. IDs: {sent_message_data[chat_id_str]}")
-                         successfully_sent_chats.append(chat_id_str)
-
-                    else:
-                         # send_post_content returns empty list on failure
-                         logger.error(f"Не удалось отправить пост {post.id} в чат {chat_id_str}. send_post_content вернул пустой список.")
-                         # Continue to next chat
-
-                except Exception as send_error:
-                    logger.exception(f"Ошибка при отправке поста {post.id} в чат {chat_id_str}: {send_error}")
-                    # Continue to next chat
+            # Рассылка по чатам выполняется параллельно (ограничено семафором), а не по одному чату за раз:
+            # время публикации в N чатов ~ ceil(N / PUBLISH_CONCURRENCY) * RTT вместо N * RTT.
+            send_results = await asyncio.gather(
+                *(_send_post_to_chat(bot, post, chat_id_str, input_media_items) for chat_id_str in post.chat_ids)
+            )
+            # Dictionary to store chat_id_str: [message_id_int, ...]
+            sent_message_data: Dict[str, List[int]] = {
+                chat_id_str: message_ids for chat_id_str, message_ids in zip(post.chat_ids, send_results) if message_ids
+            }
+            successfully_sent_chats = list(sent_message_data.keys())
 
 
-            # Close file handles opened by prepare_input_media_list AFTER sending attempt to all chats
-            if input_media_items:
-                 from aiogram.types import FSInputFile # Assuming this is used
-                 for media_item in input_media_items:
-                      # Check if the media is an FSInputFile instance with a file handle to close
-                      if isinstance(media_item, (InputMediaPhoto, InputMediaVideo, InputMediaDocument)) and isinstance(media_item.media, FSInputFile):
-                           if hasattr(media_item.media, 'file') and hasattr(media_item.media.file, 'close'):
-                                try:
-                                     media_item.media.file.close()
-                                     logger.debug(f"Closed file handle for {media_item.media.path}")
-                                except Exception as e:
-                                     logger.warning(f"Error closing file handle {media_item.media.path}: {e}")
+            # FSInputFile открывает и закрывает файл сам при каждой загрузке - закрывать здесь нечего,
+            # поэтому подготовленный список можно переиспользовать между срабатываниями (см. _get_prepared_media).
 
 
             # --- Обновление статуса поста в БД и сохранение данных об отправке ---
@@ -270,18 +439,30 @@ async def _task_publish_post(
 
             # Update status to 'sent' and save the sent message data
             # Update post object directly and commit
-            post.status = 'sent'
-            post.sent_message_data = sent_message_data # Save the dict {chat_id: [msg_ids]}
+            # Повторяющийся пост остается 'scheduled': следующий запуск вычисляет CronTrigger самого задания,
+            # поэтому на каждое срабатывание не нужно ни пересчитывать время, ни перепланировать задачу.
+            is_recurring = post.schedule_type == 'recurring'
+            needs_deletion = post.delete_after_seconds is not None and post.delete_after_seconds > 0
+            if not is_recurring:
+                post.status = 'sent'
+                post.sent_message_data = sent_message_data # Save the dict {chat_id: [msg_ids]}
+            elif needs_deletion:
+                # Копии прошлых срабатываний могут еще ждать своей задачи удаления: дополняем данные,
+                # а не перезаписываем. Строка блокируется до commit - задача удаления меняет то же поле.
+                await session.refresh(post, attribute_names=['sent_message_data'], with_for_update=True)
+                post.sent_message_data = _merge_message_data(post.sent_message_data, sent_message_data)
+            else:
+                post.sent_message_data = sent_message_data
             # post.sent_at = datetime.datetime.now(scheduler_instance.timezone) # Optional: Add sent_at field to Post model
             await session.commit() # Commit status and sent_message_data
 
-            logger.info(f"Статус поста {post.id} обновлен на 'sent'. Данные об отправке сохранены.")
+            logger.info(f"Пост {post.id} отправлен (статус '{post.status}'). Данные об отправке сохранены.")
 
 
             # --- Планирование задачи удаления, если delete_after_seconds задан ---
             # Task needs original chat IDs and message IDs for deletion.
             # These are stored in post.sent_message_data.
-            if post.delete_after_seconds is not None and post.delete_after_seconds > 0:
+            if needs_deletion:
                 # Deletion time is calculated from the time the post was successfully SENT.
                 # Use the current time of the task execution as the "sent time" baseline.
                 # If sent_at field was added to Post model and updated above, use that instead.
@@ -311,6 +492,8 @@ async def _task_publish_post(
                     session_factory=session_factory, # Pass factory
                     post_id=post_id,
                     deletion_time=deletion_time,
+                    # Повторяющийся пост: отдельная задача удаляет только копии этого срабатывания
+                    message_data=sent_message_data if is_recurring else None,
                     # No need to pass json strings if deletion task fetches from DB
                     # original_message_ids_json=json.dumps(original_message_ids_flat), # Might need flat list or dict structure
                     # target_chat_ids_json=json.dumps(target_chat_ids)
@@ -345,7 +528,8 @@ async def _task_publish_post(
 async def _task_delete_post(
     bot: 'Bot',
     session_factory: Callable[..., AsyncSession],
-    post_id: int
+    post_id: int,
+    message_data: Optional[Dict[str, List[int]]] = None
     # No need for json strings here if task fetches data from DB
     # original_message_ids_json: str, # JSON string of message IDs
     # target_chat_ids_json: str # JSON string of chat IDs
@@ -358,6 +542,8 @@ async def _task_delete_post(
         bot: Экземпляр Aiogram Bot.
         session_factory: Фабрика асинхронных сессий SQLAlchemy.
         post_id: ID поста для удаления.
+        message_data: Сообщения одного срабатывания повторяющегося поста {chat_id: [message_id, ...]}.
+                      Если не заданы, удаляются все сообщения из post.sent_message_data.
     """
     logger.info(f"Задача удаления поста {post_id} запущена.")
     async with session_factory() as session:
@@ -372,19 +558,21 @@ async def _task_delete_post(
                  logger.warning(f"Задача удаления поста {post_id} пропущена: Пост уже имеет статус '{post.status}'.")
                  return # Task finishes
 
-            # Fetch the sent message data from the post object
-            sent_message_data: Dict[str, List[int]] = post.sent_message_data or {}
+            # Fetch the sent message data from the post object (or this fire's messages for a recurring post)
+            sent_message_data: Dict[str, List[int]] = message_data if message_data is not None else (post.sent_message_data or {})
 
             if not sent_message_data:
                  logger.warning(f"Пост {post.id} не имеет сохраненных данных об отправленных сообщениях. Удаление в Telegram невозможно.")
-                 # Update status to 'deletion_skipped_no_data' or similar
-                 await update_post_status(session, post_id, 'deletion_skipped') # Assuming 'deletion_skipped' status exists
-                 await session.commit()
+                 if post.schedule_type != 'recurring': # Повторяющийся пост должен остаться 'scheduled'
+                      # Update status to 'deletion_skipped_no_data' or similar
+                      await update_post_status(session, post_id, 'deletion_skipped') # Assuming 'deletion_skipped' status exists
+                      await session.commit()
                  return # Exit task
 
             logger.info(f"Пост {post.id} имеет данные об отправке. Попытка удаления сообщений...")
 
             all_chats_successfully_processed = True # Track if we attempted delete for all chats
+            deleted_message_data: Dict[str, List[int]] = {} # Chats whose messages were deleted (or already gone)
 
             # Iterate through chat_id: message_ids pairs and attempt deletion
             for chat_id_str, message_ids_list in sent_message_data.items():
@@ -400,6 +588,7 @@ async def _task_delete_post(
                           logger.warning(f"Не удалось удалить ВСЕ сообщения для поста {post.id} в чате {chat_id_str}.")
                           all_chats_successfully_processed = False
                      else:
+                          deleted_message_data[chat_id_str] = message_ids_list
                           logger.info(f"Сообщения для поста {post.id} в чате {chat_id_str} обработаны (удалены или не найдены).")
 
                  except ValueError:
@@ -411,7 +600,14 @@ async def _task_delete_post(
 
 
             # --- Обновление статуса поста в БД ---
-            if all_chats_successfully_processed:
+            if post.schedule_type == 'recurring':
+                 # Удаляется только очередная копия повторяющегося поста; статус 'scheduled' не трогаем,
+                 # иначе следующее срабатывание CronTrigger будет пропущено. Из ожидающих удаления убираются
+                 # лишь удаленные здесь сообщения: неудачные останутся и будут подхвачены при восстановлении.
+                 await session.refresh(post, attribute_names=['sent_message_data'], with_for_update=True)
+                 post.sent_message_data = _subtract_message_data(post.sent_message_data, deleted_message_data)
+                 logger.info(f"Сообщения очередной публикации повторяющегося поста {post_id} обработаны (успешно во всех чатах: {all_chats_successfully_processed}).")
+            elif all_chats_successfully_processed:
                  # If deletion in Telegram was successful for all specified chats (or messages not found)
                  await update_post_status(session, post_id, 'deleted')
                  logger.info(f"Статус поста {post_id} обновлен на 'deleted'.")
@@ -431,7 +627,8 @@ async def _task_delete_post(
                 async with session_factory() as error_session:
                      # Check post status again
                      post_check = await get_post_by_id(error_session, post_id)
-                     if post_check and post_check.status not in ['deleted', 'deletion_failed', 'deletion_skipped']: # Don't overwrite these statuses
+                     # Don't overwrite these statuses; a recurring post must stay 'scheduled' for its next fires
+                     if post_check and post_check.schedule_type != 'recurring' and post_check.status not in ['deleted', 'deletion_failed', 'deletion_skipped']:
                           await update_post_status(error_session, post_id, 'deletion_error') # Assuming 'deletion_error' status exists
                           await error_session.commit()
                           logger.info(f"Статус поста {post_id} обновлен на 'deletion_error' из-за ошибки.")
@@ -479,22 +676,63 @@ async def _task_check_rss_feed(
         # In case of error, no update to last_checked_at will occur within the inner function
         # if the error happened before that step.
 
+# Точки входа задач в хранилище. APScheduler сохраняет ссылку на функцию ('services.scheduler:...')
+# и ее аргументы; эти обертки принимают только ID и передают в задачи объекты из _job_runtime.
+async def _job_publish_post(post_id: int) -> None:
+    await _task_publish_post(
+        _job_runtime['bot'], _job_runtime['session_factory'], post_id,
+        scheduler_instance=_job_runtime['scheduler']
+    )
+
+
+async def _job_delete_post(post_id: int, message_data: Optional[Dict[str, List[int]]] = None) -> None:
+    await _task_delete_post(_job_runtime['bot'], _job_runtime['session_factory'], post_id, message_data=message_data)
+
+
+async def _job_check_rss_feed(rss_feed_id: int) -> None:
+    await _task_check_rss_feed(_job_runtime['bot'], _job_runtime['session_factory'], rss_feed_id)
+
+
+def _jobstore_url(engine: AsyncEngine) -> str:
+    """
+    URL для SQLAlchemyJobStore. Хранилище задач синхронное, поэтому вместо asyncpg используется
+    синхронный драйвер (psycopg2) к той же базе. str(engine.url) не подходит: в нем скрыт пароль.
+    """
+    url = engine.url.set(drivername='postgresql+psycopg2')
+    # Параметр asyncpg ssl=require у psycopg2 называется sslmode
+    ssl = url.query.get('ssl')
+    if ssl is not None:
+        url = url.difference_update_query(['ssl']).update_query_dict({'sslmode': ssl})
+    return url.render_as_string(hide_password=False)
+
+
 # 3. Функция init_scheduler
-def init_scheduler(engine: AsyncEngine, bot: 'Bot') -> AsyncIOScheduler:
+def init_scheduler(
+    engine: AsyncEngine,
+    bot: 'Bot',
+    session_factory: Callable[..., AsyncSession] = AsyncSessionLocal
+) -> AsyncIOScheduler:
     """
     Инициализирует и запускает APScheduler с SQLAlchemyJobStore.
 
+    Задачи хранятся в таблице APS_JOBS_TABLE_NAME и переживают перезапуск: при старте планировщик
+    загружает их из хранилища сам, restore_scheduled_jobs лишь досоздает отсутствующие.
+
     Args:
         engine: Асинхронный движок SQLAlchemy.
-        bot: Экземпляр Aiogram Bot (нужен для передачи в задачи).
+        bot: Экземпляр Aiogram Bot (нужен задачам при выполнении).
+        session_factory: Фабрика асинхронных сессий SQLAlchemy для задач.
 
     Returns:
         Инициализированный и запущенный экземпляр AsyncIOScheduler.
     """
+    # Импорт здесь: хранилище задач нужно только при запуске планировщика
+    from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+
     logger.info("Инициализация планировщика задач...")
     # Настройка хранилища задач
     jobstores = {
-        'default': SQLAlchemyJobStore(url=str(engine.url), tablename=APS_JOBS_TABLE_NAME)
+        'default': SQLAlchemyJobStore(url=_jobstore_url(engine), tablename=APS_JOBS_TABLE_NAME)
     }
     # Настройка параметров задач по умолчанию
     job_defaults = {
@@ -507,44 +745,21 @@ def init_scheduler(engine: AsyncEngine, bot: 'Bot') -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler(
         jobstores=jobstores,
         job_defaults=job_defaults,
-        timezone=pytz.timezone(TIME_ZONE_STR) # Установка часового пояса планировщика
+        timezone=get_timezone(TIME_ZONE_STR) # Установка часового пояса планировщика
     )
 
+    # Объекты для задач регистрируются до старта: сохраненные задачи, время которых уже подошло,
+    # могут запуститься сразу после загрузки из хранилища.
+    _job_runtime.update(bot=bot, session_factory=session_factory, scheduler=scheduler)
+
     # Start the scheduler. It will load existing jobs from the store.
     scheduler.start()
     logger.info(" APScheduler запущен.")
 
-    # Add a fixed interval job to process *all* active RSS feeds that are due.
-    # This is an alternative model to scheduling a job per feed.
-    # With this model, you would have ONE scheduler job that wakes up every X minutes
-    # and looks in the DB for all RSS feeds whose `last_checked_at` + `frequency_minutes`
-    # is in the past, and checks them.
-    # This avoids potentially thousands of individual jobs if the user adds many feeds.
-    # Let's adjust to this model, as it scales better.
-    # The task function would be process_all_active_rss_feeds from rss_service.py
-    # This task needs bot and session_factory.
-
-    # --- Using a single periodic job for all RSS feeds ---
-    # job_id = 'master_rss_checker'
-    # # Check every 15 minutes (adjust as needed)
-    # check_interval_minutes = int(os.getenv('RSS_MASTER_CHECK_INTERVAL', '15'))
-    # logger.info(f"Планирование мастер-задачи проверки RSS каждые {check_interval_minutes} минут.")
-    # scheduler.add_job(
-    #     services.rss_service.process_all_active_rss_feeds, # The task function
-    #     'interval',
-    #     minutes=check_interval_minutes,
-    #     args=[bot, AsyncSessionLocal], # Pass dependencies to the task
-    #     id=job_id,
-    #     replace_existing=True,
-    #     # next_run_time=datetime.datetime.now(scheduler.timezone) # Optional: run immediately on start
-    # )
-    # logger.info(f"Мастер-задача проверки RSS запланирована с ID: {job_id}.")
-    # --- End of single periodic job model ---
-
-    # --- Reverting to per-feed jobs as implemented in provided code, but fixing args ---
-    # The provided code schedules _task_check_rss_feed per feed, this requires
-    # scheduler.add_job(..., args=[bot, session_factory, rss_feed_id])
-    # Ensure schedule_rss_check (and restore logic) passes bot correctly.
+    # Опроса БД по таймеру нет: задачи добавляются в планировщик в момент изменения данных
+    # (schedule_post_publication при создании/редактировании поста, schedule_rss_check при сохранении ленты),
+    # а AsyncIOScheduler просыпается ровно к next_run_time ближайшей задачи. Новый пост срабатывает
+    # в назначенное время без задержки на интервал опроса и без холостых запросов к БД.
 
     # Возвращаем экземпляр планировщика
     return scheduler
@@ -577,12 +792,12 @@ async def schedule_post_publication(
         ValueError: Если не указаны ни run_date, ни cron_params, или cron_params некорректны.
         Exception: В случае ошибок при добавлении задачи в планировщик.
     """
-    job_id = f'post_publish_{post_id}'
-    # Аргументы, которые будут переданы в функцию _task_publish_post при ее выполнении.
-    # Pass bot and session_factory to the task.
-    args = [bot, session_factory, post_id]
-    # scheduler_instance is needed *inside* _task_publish_post to schedule deletion task
-    kwargs = {'scheduler_instance': scheduler}
+    job_id = get_publish_job_id(post_id)
+    # Пост (пере)планируется - возможно, после редактирования: подготовленные медиа собираются заново.
+    _prepared_media_cache.pop(post_id, None)
+    # Аргументы задачи сохраняются в хранилище: только ID поста. Bot, session_factory и планировщик
+    # (нужен внутри _task_publish_post для задачи удаления) задача берет из _job_runtime.
+    args = [post_id]
 
     trigger = None
     if run_date:
@@ -591,7 +806,7 @@ async def schedule_post_publication(
         if run_date.tzinfo is None:
             logger.warning(f"run_date для поста {post_id} не содержит таймзону. Локализую с использованием таймзоны планировщика ({scheduler.timezone}).")
             # Make naive datetime aware in the scheduler's timezone
-            run_date = scheduler.timezone.localize(run_date)
+            run_date = run_date.replace(tzinfo=scheduler.timezone)
         else:
              # Convert to scheduler's timezone if it's already aware but different
              try:
@@ -619,11 +834,14 @@ async def schedule_post_publication(
 
     try:
         # Добавляем или заменяем задачу. replace_existing=True удобен для перепланирования.
-        scheduler.add_job(
-            _task_publish_post, # The function to run
+        # SQLAlchemyJobStore синхронный: add_job/remove_job выполняют запросы к БД и блокировали бы
+        # event loop (все остальные апдейты ждут). Поэтому вызовы хранилища уходят в пул потоков;
+        # AsyncIOScheduler сам пробуждает свой цикл через call_soon_threadsafe.
+        await asyncio.to_thread(
+            scheduler.add_job,
+            _job_publish_post, # The function to run
             trigger=trigger,
             args=args, # Positional arguments for the function
-            kwargs=kwargs, # Keyword arguments for the function
             id=job_id, # Unique identifier for the job
             replace_existing=True # Replace job if ID already exists
         )
@@ -639,7 +857,8 @@ async def schedule_post_deletion(
     bot: 'Bot', # Aiogram Bot instance
     session_factory: Callable[..., AsyncSession], # services.db.AsyncSessionLocal
     post_id: int,
-    deletion_time: datetime.datetime
+    deletion_time: datetime.datetime,
+    message_data: Optional[Dict[str, List[int]]] = None
     # No need for json strings here, task fetches from DB
     # original_message_ids_json: str, # JSON string of message IDs
     # target_chat_ids_json: str # JSON string of chat IDs
@@ -654,22 +873,24 @@ async def schedule_post_deletion(
         post_id: ID поста для удаления.
         deletion_time: Дата и время для удаления. Должен быть с учетом таймзоны.
                        Если наивный, будет локализован с использованием таймзоны планировщика.
+        message_data: Сообщения одного срабатывания повторяющегося поста {chat_id: [message_id, ...]}.
+                      Для них создается отдельная задача (ID с меткой времени удаления), которая
+                      не заменяет задачи предыдущих срабатываний. Если не заданы - одна задача на пост.
 
     Raises:
          Exception: В случае ошибок при добавлении задачи в планировщик.
     """
-    job_id = f'post_delete_{post_id}'
-    # Аргументы, которые будут переданы в функцию _task_delete_post при ее выполнении
-    # Pass bot, session_factory, and post_id
-    args = [bot, session_factory, post_id]
-    # kwargs are empty for deletion task as it doesn't schedule further tasks
+    # Аргументы задачи удаления: ID поста (bot и session_factory - из _job_runtime)
+    # и, для срабатывания повторяющегося поста, его сообщения
+    args = [post_id]
+    kwargs = {'message_data': message_data} if message_data is not None else {}
 
     # Одноразовый запуск на указанное время
     # Ensure deletion_time is timezone-aware. If not, localize using scheduler's timezone.
     if deletion_time.tzinfo is None:
         logger.warning(f"deletion_time для поста {post_id} не содержит таймзону. Локализую с использованием таймзоны планировщика ({scheduler.timezone}).")
         # Make naive datetime aware in the scheduler's timezone
-        deletion_time = scheduler.timezone.localize(deletion_time)
+        deletion_time = deletion_time.replace(tzinfo=scheduler.timezone)
     else:
          # Convert to scheduler's timezone if it's already aware but different
          try:
@@ -679,14 +900,17 @@ async def schedule_post_deletion(
               # Keep the original timezone-aware datetime
 
 
+    job_id = get_delete_job_id(post_id, int(deletion_time.timestamp()) if message_data is not None else None)
     trigger = DateTrigger(deletion_time)
     logger.info(f"Планирование задачи удаления поста {post_id} на {deletion_time.isoformat()} с job_id: {job_id}")
 
     try:
-        scheduler.add_job(
-            _task_delete_post, # The function to run
+        await asyncio.to_thread(
+            scheduler.add_job,
+            _job_delete_post, # The function to run
             trigger=trigger,
             args=args, # Positional arguments
+            kwargs=kwargs,
             id=job_id, # Unique ID
             replace_existing=True # Replace existing deletion job for this post
         )
@@ -723,10 +947,9 @@ async def schedule_rss_check(
     if frequency_minutes < MIN_RSS_FREQUENCY_MINUTES:
         raise ValueError(f"Некорректная частота проверки для RSS-ленты {rss_feed_id}: {frequency_minutes} минут. Должно быть не менее {MIN_RSS_FREQUENCY_MINUTES}.")
 
-    job_id = f'rss_check_{rss_feed_id}'
-    # Аргументы, которые будут переданы в функцию _task_check_rss_feed
-    # Pass bot, session_factory, and rss_feed_id
-    args = [bot, session_factory, rss_feed_id]
+    job_id = get_rss_check_job_id(rss_feed_id)
+    # Аргументы задачи проверки: только ID ленты (bot и session_factory - из _job_runtime)
+    args = [rss_feed_id]
 
     # Триггер для повторяющегося запуска через интервал времени
     trigger = IntervalTrigger(minutes=frequency_minutes, timezone=scheduler.timezone) # Set timezone on trigger
@@ -735,8 +958,9 @@ async def schedule_rss_check(
 
     try:
         # Add or replace the job for this specific RSS feed
-        scheduler.add_job(
-            _task_check_rss_feed, # The function to run
+        await asyncio.to_thread(
+            scheduler.add_job,
+            _job_check_rss_feed, # The function to run
             trigger=trigger,
             args=args, # Positional arguments
             id=job_id, # Unique ID per feed
@@ -775,7 +999,7 @@ async def remove_scheduled_job(scheduler: AsyncIOScheduler, job_id: str):
     """
     logger.info(f"Попытка удаления задачи с job_id: {job_id}")
     try:
-        scheduler.remove_job(job_id)
+        await asyncio.to_thread(scheduler.remove_job, job_id)
         logger.info(f"Задача с job_id: {job_id} успешно удалена.")
     except JobLookupError:
         # This is normal if the job already completed (one-time) or was removed earlier
@@ -783,6 +1007,40 @@ async def remove_scheduled_job(scheduler: AsyncIOScheduler, job_id: str):
     except Exception as e:
         logger.exception(f"Ошибка при удалении задачи с job_id: {job_id}: {e}")
 
+async def remove_post_delete_jobs(scheduler: AsyncIOScheduler, post_id: int) -> List[str]:
+    """
+    Удаляет все задачи удаления поста: общую (post_delete_<id>) и задачи отдельных срабатываний
+    повторяющегося поста (post_delete_<id>_<ts>). Их ID заранее не известны, поэтому задачи
+    перебираются одним get_jobs; обращения к хранилищу выполняются в потоке (оно синхронное).
+
+    Args:
+        scheduler: Экземпляр APScheduler.
+        post_id: ID поста.
+
+    Returns:
+        Список ID удаленных задач.
+    """
+    def _remove_jobs() -> List[str]:
+        removed_job_ids = []
+        for job in scheduler.get_jobs():
+            if not _is_post_delete_job_id(job.id, post_id):
+                continue
+            try:
+                scheduler.remove_job(job.id)
+                removed_job_ids.append(job.id)
+            except JobLookupError:
+                # Задача успела выполниться между get_jobs и remove_job
+                pass
+        return removed_job_ids
+
+    try:
+        removed_job_ids = await asyncio.to_thread(_remove_jobs)
+    except Exception as e:
+        logger.exception(f"Ошибка при удалении задач удаления поста {post_id}: {e}")
+        return []
+    logger.info(f"Задачи удаления поста {post_id} удалены: {removed_job_ids or 'не найдены'}.")
+    return removed_job_ids
+
 # Функции перепланирования постов используют replace_existing=True в schedule_post_publication/deletion.
 # Явные функции reschedule_post_publication/deletion сохранены для единообразия и ясности API.
 
@@ -825,6 +1083,53 @@ async def reschedule_post_deletion(
 
 
 # 6. Функция восстановления задач
+async def _fetch_in_new_session(session_factory: Callable[..., AsyncSession], fetch: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Выполняет функцию выборки из services.db в отдельной сессии.
+    Нужна для параллельного выполнения независимых выборок через asyncio.gather.
+    """
+    async with session_factory() as session:
+        return await fetch(session, *args, **kwargs)
+
+
+async def _restore_recurring_post_deletion(
+    scheduler: AsyncIOScheduler,
+    bot: 'Bot',
+    session_factory: Callable[..., AsyncSession],
+    post: 'Post',
+    existing_jobs: Dict[str, Any],
+    now: datetime.datetime,
+) -> None:
+    """
+    Досоздает задачу удаления для копий повторяющегося поста, которые ждут удаления
+    (post.sent_message_data), но не покрыты ни одной задачей из хранилища.
+
+    Args:
+        scheduler: Экземпляр APScheduler.
+        bot: Экземпляр Aiogram Bot.
+        session_factory: Фабрика асинхронных сессий SQLAlchemy.
+        post: Повторяющийся пост с delete_after_seconds > 0 и sent_message_data.
+        existing_jobs: Задачи, загруженные из хранилища: {job_id: job}.
+        now: Текущее время в таймзоне планировщика.
+    """
+    covered: Dict[str, List[int]] = {}
+    for job_id, job in existing_jobs.items():
+        if _is_post_delete_job_id(job_id, post.id):
+            # Задача без message_data (запланированная одной на пост) удаляет все ожидающие сообщения
+            covered = _merge_message_data(covered, job.kwargs.get('message_data') or post.sent_message_data)
+
+    uncovered = _subtract_message_data(post.sent_message_data, covered)
+    if not uncovered:
+        return
+    deletion_time = now + datetime.timedelta(seconds=post.delete_after_seconds)
+    logger.warning(f"Для копий повторяющегося поста {post.id} нет задачи удаления. Восстановление на {deletion_time.isoformat()} (расчет от текущего времени).")
+    await schedule_post_deletion(
+        scheduler, bot, session_factory, post.id,
+        deletion_time=deletion_time,
+        message_data=uncovered,
+    )
+
+
 async def restore_scheduled_jobs(
     scheduler: AsyncIOScheduler,
     bot: 'Bot', # Aiogram Bot instance - нужен для восстановления задач публикации/удаления постов и RSS
@@ -840,164 +1145,163 @@ async def restore_scheduled_jobs(
         session_factory: Фабрика асинхронных сессий SQLAlchemy.
     """
     logger.info("Начало восстановления запланированных задач из БД.")
-    async with session_factory() as session:
-        try:
-            # 1. Восстановление задач публикации для постов со статусом 'scheduled'
+    try:
+        # Три выборки независимы друг от друга, поэтому выполняем их параллельно,
+        # каждую в своей сессии (одна AsyncSession не допускает конкурентных запросов).
+        scheduled_posts, sent_posts_needing_deletion_check, active_rss_feeds = await asyncio.gather(
             # Include 'pending_reschedule' status? Yes, in get_all_posts_for_scheduling default.
-            scheduled_posts: List['Post'] = await get_all_posts_for_scheduling(session, statuses=["scheduled", "pending_reschedule"])
-            logger.info(f"Найдено {len(scheduled_posts)} постов со статусом 'scheduled'/'pending_reschedule' для восстановления публикации.")
-            for post in scheduled_posts:
-                publish_job_id = f'post_publish_{post.id}'
-                existing_job = scheduler.get_job(publish_job_id)
-
-                if not existing_job:
-                    logger.warning(f"Задача публикации для поста {post.id} (ID: {publish_job_id}) отсутствует в планировщике. Попытка восстановления.")
-                    try:
-                        # Check if post has necessary scheduling info
-                        if post.schedule_type == 'one_time' and post.run_date:
-                            await schedule_post_publication(
-                                scheduler, bot, session_factory, post.id, run_date=post.run_date
-                            )
-                        elif post.schedule_type == 'recurring' and post.schedule_params:
-                            # validate_cron_params check can be added here for robustness
-                            await schedule_post_publication(
-                                scheduler, bot, session_factory, post.id, cron_params=post.schedule_params
-                            )
-                        else:
-                            logger.error(f"Не удалось восстановить задачу публикации для поста {post.id}: Отсутствуют необходимые параметры расписания (run_date или schedule_params/type) в БД. Статус: {post.status}.")
-                            # Optionally: update post status to 'scheduling_error'
-                            # post.status = 'scheduling_error'
-                            # await session.commit()
-
-                    except ValueError as e:
-                        logger.error(f"Не удалось восстановить задачу публикации для поста {post.id} из-за некорректных CRON параметров в БД: {post.schedule_params}. Ошибка: {e}")
-                        # Optionally: обновить статус поста на 'scheduling_error'
+            _fetch_in_new_session(session_factory, get_all_posts_for_scheduling, statuses=["scheduled", "pending_reschedule"]),
+            # Include failed deletion states too. Only posts with delete_after_seconds > 0 and sent_message_data are selected (filtered in SQL).
+            _fetch_in_new_session(session_factory, get_sent_posts_pending_deletion, statuses=["sent", "deletion_failed", "deletion_error", "deletion_skipped"], include_recurring=True),
+            _fetch_in_new_session(session_factory, get_all_active_rss_feeds),
+        )
+
+        # Задачи, уже загруженные из хранилища: один запрос к хранилищу (в потоке - оно синхронное)
+        # вместо get_job на каждый пост и ленту; дальше проверка наличия - поиск в словаре по ID.
+        # Сами задачи нужны для копий повторяющихся постов: их сообщения лежат в kwargs задач удаления.
+        existing_jobs = {job.id: job for job in await asyncio.to_thread(scheduler.get_jobs)}
+
+        # 1. Восстановление задач публикации для постов со статусом 'scheduled'
+        logger.info(f"Найдено {len(scheduled_posts)} постов со статусом 'scheduled'/'pending_reschedule' для восстановления публикации.")
+        for post in scheduled_posts:
+            publish_job_id = get_publish_job_id(post.id)
+            if publish_job_id not in existing_jobs:
+                logger.warning(f"Задача публикации для поста {post.id} (ID: {publish_job_id}) отсутствует в планировщике. Попытка восстановления.")
+                try:
+                    # Check if post has necessary scheduling info
+                    if post.schedule_type == 'one_time' and post.run_date:
+                        await schedule_post_publication(
+                            scheduler, bot, session_factory, post.id, run_date=post.run_date
+                        )
+                    elif post.schedule_type == 'recurring' and post.schedule_params:
+                        # validate_cron_params check can be added here for robustness
+                        await schedule_post_publication(
+                            scheduler, bot, session_factory, post.id, cron_params=post.schedule_params
+                        )
+                    else:
+                        logger.error(f"Не удалось восстановить задачу публикации для поста {post.id}: Отсутствуют необходимые параметры расписания (run_date или schedule_params/type) в БД. Статус: {post.status}.")
+                        # Optionally: update post status to 'scheduling_error'
                         # post.status = 'scheduling_error'
                         # await session.commit()
-                    except Exception as e:
-                         logger.exception(f"Ошибка при планировании задачи публикации для поста {post.id} во время восстановления: {e}")
-                         # Optionally: обновить статус поста на 'scheduling_error'
-                         # post.status = 'scheduling_error'
-                         # await session.commit()
-
-
-            # 2. Восстановление задач удаления для постов со статусом 'sent' и заданным delete_after_seconds
-            # These posts must have sent_message_data and delete_after_seconds > 0.
-            sent_posts_needing_deletion_check: List['Post'] = await get_all_posts_for_scheduling(session, statuses=["sent", "deletion_failed", "deletion_error", "deletion_skipped"]) # Include failed deletion states too
-            sent_posts_needing_deletion = [
-                p for p in sent_posts_needing_deletion_check
-                if p.delete_after_seconds is not None and p.delete_after_seconds > 0
-                and p.sent_message_data # Ensure sent_message_data is not None/empty
-            ]
-            logger.info(f"Найдено {len(sent_posts_needing_deletion)} постов со статусом 'sent'/etc. и заданным временем удаления для проверки восстановления задачи удаления.")
-
-            # Need to recalculate the deletion time based on the original sent time.
-            # If sent_at field existed in Post, it would be used.
-            # Since it doesn't, APScheduler can reschedule based on the time the *original* job was supposed to run.
-            # However, if the scheduler crashed *after* the post was sent but *before* the deletion job was added,
-            # we need to calculate deletion_time = <time_of_sending> + delete_after_seconds.
-            # Using post.updated_at as a proxy for sent time (if updated on send) or current time is inaccurate.
-            # The most robust way without a `sent_at` field is tricky.
-            # A simplified approach for recovery is to schedule the deletion relative to NOW, IF the original scheduled time + deletion_seconds is in the future.
-            # Or, just schedule relative to NOW + delete_after_seconds IF the original scheduled time was in the past.
-
-            # Let's assume the original scheduled time (post.run_date for one_time, or next_run_time of the original job if recurring)
-            # is the baseline for deletion_time calculation.
-            # If original job ran, and deletion job wasn't scheduled, we use run_date + delete_after_seconds.
-            # Need to find the NEXT_RUN_TIME of the *original publish job* if it was recurring and just fired.
-            # This is getting complicated without `sent_at`.
-
-            # Simpler approach for recovery: If status is 'sent' and deletion_seconds is set,
-            # and NO deletion job exists for this post, check if deletion time (calculated from NOW + seconds)
-            # is in the future. If so, schedule it. This might slightly shift the deletion time.
-            # This isn't perfect but is a practical recovery strategy.
-
-            now = datetime.datetime.now(scheduler.timezone) # Current time in scheduler's timezone
-
-            for post in sent_posts_needing_deletion:
-                 delete_job_id = f'post_delete_{post.id}'
-                 existing_delete_job = scheduler.get_job(delete_job_id)
-
-                 if not existing_delete_job:
-                      # Attempt to schedule deletion ONLY IF the calculated time (relative to NOW) is in the future.
-                      # This avoids scheduling deletion for posts whose deletion time already passed.
-                      # If we had a sent_at field: deletion_time = post.sent_at + datetime.timedelta(seconds=post.delete_after_seconds)
-                      # Using NOW: deletion_time = now + datetime.timedelta(seconds=post.delete_after_seconds)
-                      # This calculation needs rethinking based on whether the original job already fired.
-
-                      # A more robust recovery might check if the original publish job ran successfully
-                      # and if a delete job was subsequently created. This is complex.
-
-                      # Let's use a simple rule: If post is 'sent' and needs deletion, and no delete job exists,
-                      # assume the original job ran (or was skipped/misfired), and schedule deletion relative to NOW
-                      # IF the original intended deletion time was in the future.
-                      # Original intended run time: post.run_date (for one_time). For recurring, it's the time of the specific run.
-                      # This requires storing the *specific run time* for recurring posts if we want precise deletion.
-                      # Without that, we have to approximate.
-
-                      # Simplest pragmatic recovery: If 'sent', needs deletion, no delete job exists, schedule deletion relative to NOW.
-                      # This means the deletion time will be NOW + delete_after_seconds, potentially later than originally intended.
-                      # Let's refine this: Calculate deletion_time relative to NOW. If it's in the future, schedule it.
-                      calculated_deletion_time_from_now = now + datetime.timedelta(seconds=post.delete_after_seconds)
-
-                      if calculated_deletion_time_from_now > now:
-                            logger.warning(f"Задача удаления для поста {post.id} отсутствует в планировщике. Попытка восстановления на {calculated_deletion_time_from_now.isoformat()} (расчет от текущего времени).")
-                            # Pass post_id to deletion task. It will fetch sent_message_data from DB.
-                            await schedule_post_deletion(
-                                scheduler, bot, session_factory, post.id,
-                                deletion_time=calculated_deletion_time_from_now
-                            )
-                      else:
-                           logger.warning(f"Задача удаления для поста {post.id} отсутствует, но рассчитанное время удаления ({calculated_deletion_time_from_now.isoformat()} от NOW) уже в прошлом. Задача не будет восстановлена.")
-                           # Optionally, update status to 'deletion_restore_failed'
-                           # post.status = 'deletion_restore_failed'
-                           # await session.commit()
-
-                 # else:
-                 #    logger.debug(f"Задача удаления для поста {post.id} (ID: {delete_job_id}) уже существует.")
-
-            # 3. Восстановление задач проверки RSS-лент для активных лент
-            # These are per-feed jobs calling _task_check_rss_feed
-            active_rss_feeds: List['RssFeed'] = await get_all_active_rss_feeds(session)
-            logger.info(f"Найдено {len(active_rss_feeds)} активных RSS-лент для восстановления проверки.")
-            for feed in active_rss_feeds:
-                 rss_check_job_id = f'rss_check_{feed.id}'
-                 existing_rss_job = scheduler.get_job(rss_check_job_id)
-
-                 # Check if job exists AND frequency is valid (non-positive frequency means no scheduling)
-                 if not existing_rss_job:
-                     MIN_RSS_FREQUENCY_MINUTES = int(os.getenv('RSS_MIN_FREQ', '5'))
-                     if feed.frequency_minutes is not None and feed.frequency_minutes >= MIN_RSS_FREQUENCY_MINUTES:
-                         logger.warning(f"Задача проверки RSS-ленты {feed.id} (URL: {feed.feed_url}, ID: {rss_check_job_id}) отсутствует в планировщике. Попытка восстановления.")
-                         try:
-                             # schedule_rss_check needs bot, session_factory, feed_id, frequency_minutes
-                             await schedule_rss_check(
-                                 scheduler, bot, session_factory, feed.id, feed.frequency_minutes
-                             )
-                         except ValueError as e:
-                             logger.error(f"Не удалось восстановить задачу проверки RSS-ленты {feed.id} из-за некорректной частоты в БД ({feed.frequency_minutes} мин.): {e}")
-                             # Optionally: обновить статус ленты на 'scheduling_error' if RssFeed model has status
-                             # if hasattr(feed, 'status'): feed.status = 'scheduling_error'
-                         except Exception as e:
-                             logger.exception(f"Ошибка при планировании задачи проверки RSS-ленты {feed.id} во время восстановления: {e}")
-                             # Optionally: обновить статус ленты на 'scheduling_error'
-                             # if hasattr(feed, 'status'): feed.status = 'scheduling_error'
 
-                     else:
-                         logger.error(f"Не удалось восстановить задачу проверки RSS-ленты {feed.id}: Некорректная или отсутствующая частота проверки ({feed.frequency_minutes} мин.) в БД.")
+                except ValueError as e:
+                    logger.error(f"Не удалось восстановить задачу публикации для поста {post.id} из-за некорректных CRON параметров в БД: {post.schedule_params}. Ошибка: {e}")
+                    # Optionally: обновить статус поста на 'scheduling_error'
+                    # post.status = 'scheduling_error'
+                    # await session.commit()
+                except Exception as e:
+                     logger.exception(f"Ошибка при планировании задачи публикации для поста {post.id} во время восстановления: {e}")
+                     # Optionally: обновить статус поста на 'scheduling_error'
+                     # post.status = 'scheduling_error'
+                     # await session.commit()
+
+
+        # 2. Восстановление задач удаления для постов со статусом 'sent' и заданным delete_after_seconds
+        # delete_after_seconds > 0 and sent_message_data IS NOT NULL are already checked by the query;
+        # an empty JSON object (or JSON null) is still skipped here.
+        sent_posts_needing_deletion = [p for p in sent_posts_needing_deletion_check if p.sent_message_data]
+        logger.info(f"Найдено {len(sent_posts_needing_deletion)} постов со статусом 'sent'/etc. и заданным временем удаления для проверки восстановления задачи удаления.")
+
+        # Need to recalculate the deletion time based on the original sent time.
+        # If sent_at field existed in Post, it would be used.
+        # Since it doesn't, APScheduler can reschedule based on the time the *original* job was supposed to run.
+        # However, if the scheduler crashed *after* the post was sent but *before* the deletion job was added,
+        # we need to calculate deletion_time = <time_of_sending> + delete_after_seconds.
+        # Using post.updated_at as a proxy for sent time (if updated on send) or current time is inaccurate.
+        # The most robust way without a `sent_at` field is tricky.
+        # A simplified approach for recovery is to schedule the deletion relative to NOW, IF the original scheduled time + deletion_seconds is in the future.
+        # Or, just schedule relative to NOW + delete_after_seconds IF the original scheduled time was in the past.
+
+        # Let's assume the original scheduled time (post.run_date for one_time, or next_run_time of the original job if recurring)
+        # is the baseline for deletion_time calculation.
+        # If original job ran, and deletion job wasn't scheduled, we use run_date + delete_after_seconds.
+        # Need to find the NEXT_RUN_TIME of the *original publish job* if it was recurring and just fired.
+        # This is getting complicated without `sent_at`.
+
+        # Simpler approach for recovery: If status is 'sent' and deletion_seconds is set,
+        # and NO deletion job exists for this post, check if deletion time (calculated from NOW + seconds)
+        # is in the future. If so, schedule it. This might slightly shift the deletion time.
+        # This isn't perfect but is a practical recovery strategy.
+
+        now = datetime.datetime.now(scheduler.timezone) # Current time in scheduler's timezone
+
+        for post in sent_posts_needing_deletion:
+             if post.schedule_type == 'recurring':
+                  await _restore_recurring_post_deletion(scheduler, bot, session_factory, post, existing_jobs, now)
+                  continue
+             delete_job_id = get_delete_job_id(post.id)
+             if delete_job_id not in existing_jobs:
+                  # Attempt to schedule deletion ONLY IF the calculated time (relative to NOW) is in the future.
+                  # This avoids scheduling deletion for posts whose deletion time already passed.
+                  # If we had a sent_at field: deletion_time = post.sent_at + datetime.timedelta(seconds=post.delete_after_seconds)
+                  # Using NOW: deletion_time = now + datetime.timedelta(seconds=post.delete_after_seconds)
+                  # This calculation needs rethinking based on whether the original job already fired.
+
+                  # A more robust recovery might check if the original publish job ran successfully
+                  # and if a delete job was subsequently created. This is complex.
+
+                  # Let's use a simple rule: If post is 'sent' and needs deletion, and no delete job exists,
+                  # assume the original job ran (or was skipped/misfired), and schedule deletion relative to NOW
+                  # IF the original intended deletion time was in the future.
+                  # Original intended run time: post.run_date (for one_time). For recurring, it's the time of the specific run.
+                  # This requires storing the *specific run time* for recurring posts if we want precise deletion.
+                  # Without that, we have to approximate.
+
+                  # Simplest pragmatic recovery: If 'sent', needs deletion, no delete job exists, schedule deletion relative to NOW.
+                  # This means the deletion time will be NOW + delete_after_seconds, potentially later than originally intended.
+                  # Let's refine this: Calculate deletion_time relative to NOW. If it's in the future, schedule it.
+                  calculated_deletion_time_from_now = now + datetime.timedelta(seconds=post.delete_after_seconds)
+
+                  if calculated_deletion_time_from_now > now:
+                        logger.warning(f"Задача удаления для поста {post.id} отсутствует в планировщике. Попытка восстановления на {calculated_deletion_time_from_now.isoformat()} (расчет от текущего времени).")
+                        # Pass post_id to deletion task. It will fetch sent_message_data from DB.
+                        await schedule_post_deletion(
+                            scheduler, bot, session_factory, post.id,
+                            deletion_time=calculated_deletion_time_from_now
+                        )
+                  else:
+                       logger.warning(f"Задача удаления для поста {post.id} отсутствует, но рассчитанное время удаления ({calculated_deletion_time_from_now.isoformat()} от NOW) уже в прошлом. Задача не будет восстановлена.")
+                       # Optionally, update status to 'deletion_restore_failed'
+                       # post.status = 'deletion_restore_failed'
+                       # await session.commit()
+
+             # else:
+             #    logger.debug(f"Задача удаления для поста {post.id} (ID: {delete_job_id}) уже существует.")
+
+        # 3. Восстановление задач проверки RSS-лент для активных лент
+        # These are per-feed jobs calling _task_check_rss_feed
+        logger.info(f"Найдено {len(active_rss_feeds)} активных RSS-лент для восстановления проверки.")
+        for feed in active_rss_feeds:
+             rss_check_job_id = get_rss_check_job_id(feed.id)
+             # Check if job exists AND frequency is valid (non-positive frequency means no scheduling)
+             if rss_check_job_id not in existing_jobs:
+                 MIN_RSS_FREQUENCY_MINUTES = int(os.getenv('RSS_MIN_FREQ', '5'))
+                 if feed.frequency_minutes is not None and feed.frequency_minutes >= MIN_RSS_FREQUENCY_MINUTES:
+                     logger.warning(f"Задача проверки RSS-ленты {feed.id} (URL: {feed.feed_url}, ID: {rss_check_job_id}) отсутствует в планировщике. Попытка восстановления.")
+                     try:
+                         # schedule_rss_check needs bot, session_factory, feed_id, frequency_minutes
+                         await schedule_rss_check(
+                             scheduler, bot, session_factory, feed.id, feed.frequency_minutes
+                         )
+                     except ValueError as e:
+                         logger.error(f"Не удалось восстановить задачу проверки RSS-ленты {feed.id} из-за некорректной частоты в БД ({feed.frequency_minutes} мин.): {e}")
+                         # Optionally: обновить статус ленты на 'scheduling_error' if RssFeed model has status
+                         # if hasattr(feed, 'status'): feed.status = 'scheduling_error'
+                     except Exception as e:
+                         logger.exception(f"Ошибка при планировании задачи проверки RSS-ленты {feed.id} во время восстановления: {e}")
                          # Optionally: обновить статус ленты на 'scheduling_error'
                          # if hasattr(feed, 'status'): feed.status = 'scheduling_error'
 
-                 # else:
-                 #     logger.debug(f"Задача проверки RSS-ленты {feed.id} (ID: {rss_check_job_id}) уже существует.")
+                 else:
+                     logger.error(f"Не удалось восстановить задачу проверки RSS-ленты {feed.id}: Некорректная или отсутствующая частота проверки ({feed.frequency_minutes} мин.) в БД.")
+                     # Optionally: обновить статус ленты на 'scheduling_error'
+                     # if hasattr(feed, 'status'): feed.status = 'scheduling_error'
 
-            # Commit any status updates made during recovery (e.g., scheduling_error)
-            await session.commit() # Commit any changes made in this session
+             # else:
+             #     logger.debug(f"Задача проверки RSS-ленты {feed.id} (ID: {rss_check_job_id}) уже существует.")
 
-        except Exception as e:
-            logger.exception(f"Критическая ошибка при восстановлении задач планировщика из БД: {e}")
-            # In case of critical failure, the session might be invalid.
-            # Rely on the `async with session_factory()` context manager for rollback if needed.
+    except Exception as e:
+        logger.exception(f"Критическая ошибка при восстановлении задач планировщика из БД: {e}")
 
 
     logger.info("Восстановление запланированных задач завершено.")
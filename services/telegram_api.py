@@ -1,12 +1,13 @@
 # services/telegram_api.py
 
 import logging
-from typing import List, Optional, Union, Dict, Any, Tuple
+from typing import Awaitable, Callable, List, Optional, Union, Dict, Any, Tuple
 
 from aiogram import Bot
+from cachetools import TTLCache
 from aiogram.types import Message, InputMedia, InputMediaPhoto, InputMediaVideo, InputMediaDocument, Chat, ChatMember
 from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramAPIError, AiogramError, MessageToDeleteNotFound, MessageCantBeDeleted
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, AiogramError, MessageToDeleteNotFound, MessageCantBeDeleted
 from aiogram.utils.markdown import escape_md # Импорт для экранирования MarkdownV2
 
 # Настройка логирования
@@ -19,6 +20,23 @@ logger = logging.getLogger(__name__)
 # https://core.telegram.org/bots/api#inputmediadocument
 MAX_MEDIA_GROUP_CAPTION_LENGTH = 1024
 
+# Таблица отправки одиночного медиа: тип InputMedia -> (метод Bot, имя аргумента с медиа, доп. поля InputMedia).
+# Один поиск в словаре вместо цепочки isinstance; новые типы (audio, animation) добавляются сюда.
+# Методы хранятся как функции класса Bot и вызываются с экземпляром бота первым аргументом:
+# без getattr по имени метода при каждой отправке.
+_SINGLE_MEDIA_SENDERS: Dict[type, Tuple[Callable[..., Awaitable[Message]], str, Tuple[str, ...]]] = {
+    InputMediaPhoto: (Bot.send_photo, "photo", ()),
+    InputMediaVideo: (Bot.send_video, "video", ("duration", "width", "height", "thumbnail")),
+    InputMediaDocument: (Bot.send_document, "document", ("thumbnail",)),
+}
+
+# Кэш списка доступных каналов пользователя: user_id -> [{'id': ..., 'name': ...}].
+# Список запрашивается на каждом шаге выбора каналов и при каждом предпросмотре поста, а его
+# получение требует запросов к Telegram API по каждому чату. Короткий TTL ограничивает устаревание
+# (бота добавили/удалили из канала): новый список виден не позже чем через TTL.
+BOT_CHANNELS_CACHE_TTL_SECONDS = 60
+_bot_channels_cache: TTLCache = TTLCache(maxsize=10_000, ttl=BOT_CHANNELS_CACHE_TTL_SECONDS)
+
 async def send_post_content(
     bot: Bot,
     chat_id: Union[int, str],
@@ -76,53 +94,29 @@ async def send_post_content(
                 # The reply_markup in InputMediaPhoto/Video is specifically for `reply_markup` inside `send_media_group`
                 # For single media, pass it to the send_* method.
 
-                if isinstance(media_items[0], InputMediaPhoto):
-                    message = await bot.send_photo(
-                        chat_id=chat_id_str,
-                        photo=media_items[0].media,
-                        caption=media_items[0].caption,
-                        parse_mode=media_items[0].parse_mode,
-                        reply_markup=reply_markup # Apply markup here
-                    )
-                    sent_messages.append(message)
-
-                elif isinstance(media_items[0], InputMediaVideo):
-                     # aiogram send_video takes media as 'video' argument
-                     message = await bot.send_video(
-                        chat_id=chat_id_str,
-                        video=media_items[0].media,
-                        caption=media_items[0].caption,
-                        parse_mode=media_items[0].parse_mode,
-                        reply_markup=reply_markup, # Apply markup here
-                        duration=getattr(media_items[0], 'duration', None),
-                        width=getattr(media_items[0], 'width', None),
-                        height=getattr(media_items[0], 'height', None),
-                        thumbnail=getattr(media_items[0], 'thumbnail', None)
-                    )
-                     sent_messages.append(message)
-
-                elif isinstance(media_items[0], InputMediaDocument):
-                     # aiogram send_document takes media as 'document' argument
-                     message = await bot.send_document(
-                        chat_id=chat_id_str,
-                        document=media_items[0].media,
-                        caption=media_items[0].caption,
-                        parse_mode=media_items[0].parse_mode,
-                        reply_markup=reply_markup, # Apply markup here
-                        thumbnail=getattr(media_items[0], 'thumbnail', None)
-                    )
-                     sent_messages.append(message)
-                # Add other single media types (audio, voice, etc.) if supported/needed by the bot
-                # elif isinstance(media_items[0], InputMediaAudio): ...
-
-                else:
-                    logger.error(f"{log_prefix} Неподдерживаемый тип InputMedia для одиночной отправки: {type(media_items[0]).__name__}")
+                single_media = media_items[0]
+                sender = _SINGLE_MEDIA_SENDERS.get(type(single_media))
+                if sender is None:
+                    logger.error(f"{log_prefix} Неподдерживаемый тип InputMedia для одиночной отправки: {type(single_media).__name__}")
                     # Close file handle if it was opened for this unsupported type
-                    if hasattr(media_items[0], 'media') and hasattr(media_items[0].media, 'close'):
-                         try: media_items[0].media.close()
+                    if hasattr(single_media, 'media') and hasattr(single_media.media, 'close'):
+                         try: single_media.media.close()
                          except Exception as e: logger.warning(f"Error closing file handle for unsupported media: {e}")
                     return sent_messages # Возвращаем пустой список при ошибке
 
+                send_method, media_arg, extra_fields = sender
+                extra_kwargs = {field: getattr(single_media, field, None) for field in extra_fields}
+                message = await send_method(
+                    bot,
+                    chat_id=chat_id_str,
+                    caption=single_media.caption,
+                    parse_mode=single_media.parse_mode,
+                    reply_markup=reply_markup, # Apply markup here
+                    **{media_arg: single_media.media},
+                    **extra_kwargs
+                )
+                sent_messages.append(message)
+
             else:
                 # Отправка медиагруппы
                 logger.info(f"{log_prefix} Отправка медиагруппы из {len(media_items)} элементов.")
@@ -213,6 +207,38 @@ async def send_post_content(
     return sent_messages
 
 
+async def edit_message_text_if_changed(
+    message: Message,
+    text: str,
+    reply_markup: Optional[Any] = None,
+    **kwargs: Any
+) -> bool:
+    """
+    Редактирует текст сообщения бота. Повторное нажатие той же кнопки (навигация "назад" дважды,
+    двойной клик) дает ответ Telegram "message is not modified" - он считается пропуском, а не ошибкой.
+    Сравнение содержимого выполняет сам Telegram: локальная копия могла бы устареть после правок
+    в других местах кода и не учитывала бы parse_mode и прочие параметры.
+    Прочие ошибки API пробрасываются, как у Message.edit_text.
+
+    Args:
+        message: Сообщение, которое нужно отредактировать (например, callback.message).
+        text: Новый текст сообщения.
+        reply_markup: Новая inline-клавиатура или None (убрать клавиатуру).
+        **kwargs: Дополнительные аргументы Message.edit_text (parse_mode и т.п.).
+
+    Returns:
+        True, если сообщение отредактировано, False, если содержимое не изменилось.
+    """
+    try:
+        await message.edit_text(text, reply_markup=reply_markup, **kwargs)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+        logger.debug(f"Сообщение {message.message_id} в чате {message.chat.id} не изменилось, редактирование пропущено.")
+        return False
+    return True
+
+
 async def delete_telegram_messages(
     bot: Bot,
     chat_id: Union[int, str],
@@ -355,6 +381,25 @@ async def get_chat(
         return None
 
 async def get_bot_channels_for_user(bot: Bot, user_id: int) -> List[Dict[str, Union[int, str]]]:
+    """
+    Возвращает список каналов/групп, доступных пользователю для публикации (см. _fetch_bot_channels_for_user).
+    Результат кэшируется на BOT_CHANNELS_CACHE_TTL_SECONDS секунд по user_id.
+
+    Args:
+        bot: Экземпляр Aiogram Bot.
+        user_id: ID пользователя, для которого запрашивается список.
+
+    Returns:
+        Список словарей [{'id': chat_id, 'name': chat_name}] (копия списка и словарей, ее можно изменять).
+    """
+    channels = _bot_channels_cache.get(user_id)
+    if channels is None:
+        channels = await _fetch_bot_channels_for_user(bot, user_id)
+        _bot_channels_cache[user_id] = channels
+    return [dict(channel) for channel in channels]
+
+
+async def _fetch_bot_channels_for_user(bot: Bot, user_id: int) -> List[Dict[str, Union[int, str]]]:
     """
     (ЗАГЛУШКА) Получает список каналов/групп, где бот является администратором,
     и пользователь может в них публиковать (подразумевается, что пользователь владелец или админ бота).
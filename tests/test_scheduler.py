@@ -0,0 +1,61 @@
+# tests/test_scheduler.py
+
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip('apscheduler')
+pytest.importorskip('aiogram')
+pytest.importorskip('sqlalchemy')
+pytest.importorskip('asyncpg')
+pytest.importorskip('cachetools')
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from services.scheduler import get_delete_job_id, get_publish_job_id, remove_post_delete_jobs
+
+
+def _noop():
+    pass
+
+
+def test_remove_post_delete_jobs_removes_every_fire_of_recurring_post():
+    post_id = 7
+
+    async def scenario():
+        scheduler = AsyncIOScheduler()
+        scheduler.start(paused=True)
+        try:
+            run_date = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+            delete_job_id = get_delete_job_id(post_id)
+            # Повторяющийся пост: две ожидающие задачи срабатываний и общая задача удаления
+            job_ids = [
+                delete_job_id,
+                get_delete_job_id(post_id, 1_800_000_000),
+                get_delete_job_id(post_id, 1_800_086_400),
+                get_publish_job_id(post_id),
+                # Задача другого поста с ID, начинающимся с того же числа, не должна задеваться
+                get_delete_job_id(70, 1_800_000_000),
+            ]
+            for job_id in job_ids:
+                scheduler.add_job(_noop, 'date', run_date=run_date, id=job_id)
+
+            removed_job_ids = await remove_post_delete_jobs(scheduler, post_id)
+
+            remaining_job_ids = {job.id for job in scheduler.get_jobs()}
+            return set(removed_job_ids), remaining_job_ids
+        finally:
+            scheduler.shutdown(wait=False)
+
+    removed_job_ids, remaining_job_ids = asyncio.run(scenario())
+
+    delete_job_id = get_delete_job_id(post_id)
+    assert removed_job_ids == {
+        delete_job_id,
+        get_delete_job_id(post_id, 1_800_000_000),
+        get_delete_job_id(post_id, 1_800_086_400),
+    }
+    assert not any(job_id.startswith(f'{delete_job_id}_') for job_id in remaining_job_ids)
+    assert delete_job_id not in remaining_job_ids
+    assert remaining_job_ids == {get_publish_job_id(post_id), get_delete_job_id(70, 1_800_000_000)}
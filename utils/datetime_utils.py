@@ -1 +1,118 @@
+# utils/datetime_utils.py
 
+import datetime
+import functools
+import logging
+import os
+from typing import Optional
+
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from cachetools import TTLCache
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Формат отображения даты/времени пользователю
+DISPLAY_DATETIME_FORMAT = '%d.%m.%Y %H:%M'
+# Часовой пояс по умолчанию (тот же, что у планировщика)
+DEFAULT_TIME_ZONE = os.getenv('TIME_ZONE', 'Europe/Berlin')
+# Краткие названия дней недели еженедельного расписания (ключи - как в cron_params['days_of_week'])
+WEEKDAY_SHORT_NAMES = {'mon': 'Пн', 'tue': 'Вт', 'wed': 'Ср', 'thu': 'Чт', 'fri': 'Пт', 'sat': 'Сб', 'sun': 'Вс'}
+
+# Часовые пояса пользователей: telegram_user_id -> имя пояса. Пояс нужен при каждом выводе
+# списков и превью и меняется редко, поэтому хранится в памяти процесса, а не читается из БД
+# на каждый апдейт. Заполняется сервисом БД при загрузке пользователя и смене пояса, а при промахе
+# (например, после перезапуска) - middleware, читающим пояс из БД (services.db.load_user_timezone).
+# Размер ограничен (вытесняются давно не обращавшиеся пользователи), а TTL ограничивает время жизни
+# записи, измененной в обход кэша (например, прямо в БД): после истечения она перечитывается middleware.
+USER_TIMEZONE_CACHE_SIZE = 10_000
+USER_TIMEZONE_CACHE_TTL_SECONDS = int(os.getenv('USER_TIMEZONE_CACHE_TTL', '3600'))
+_user_timezone_cache: TTLCache = TTLCache(maxsize=USER_TIMEZONE_CACHE_SIZE, ttl=USER_TIMEZONE_CACHE_TTL_SECONDS)
+
+
+@functools.lru_cache(maxsize=128)
+def get_timezone(tz_name: str) -> datetime.tzinfo:
+    """
+    Returns a zoneinfo timezone object for the given name, cached per name.
+
+    zoneinfo (stdlib, C-accelerated) converts datetimes faster than pytz and works with
+    plain datetime arithmetic (no localize/normalize). ZoneInfo keeps its own cache, but
+    that lookup still goes through the constructor; the set of timezones used by the bot
+    is tiny, so caching here turns repeated lookups (list rendering, previews, scheduling)
+    into a dict hit.
+
+    Args:
+        tz_name: IANA timezone name, e.g. 'Europe/Berlin'.
+
+    Returns:
+        The timezone object.
+
+    Raises:
+        ZoneInfoNotFoundError: If the timezone name is unknown.
+        ValueError: If the name is not a valid timezone key.
+    """
+    return ZoneInfo(tz_name)
+
+
+def format_datetime(dt: Optional[datetime.datetime], tz_name: str) -> Optional[str]:
+    """
+    Formats a datetime for display in the given timezone.
+    Naive datetimes are treated as UTC.
+
+    Args:
+        dt: The datetime to format.
+        tz_name: IANA timezone name to convert to before formatting.
+
+    Returns:
+        The formatted string, or None if dt is None or the timezone is unknown.
+    """
+    if dt is None:
+        return None
+    try:
+        tz = get_timezone(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Неизвестный часовой пояс '{tz_name}' при форматировании даты.")
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(tz).strftime(DISPLAY_DATETIME_FORMAT)
+
+
+def remember_user_timezone(telegram_user_id: int, tz_name: Optional[str]) -> None:
+    """
+    Stores the user's timezone for get_user_timezone.
+
+    Args:
+        telegram_user_id: The Telegram user ID.
+        tz_name: IANA timezone name from the user's profile (None resets to the default).
+    """
+    # Пользователь без пояса тоже запоминается (с поясом по умолчанию): иначе каждый его апдейт
+    # считался бы промахом и снова читал профиль из БД.
+    _user_timezone_cache[telegram_user_id] = tz_name or DEFAULT_TIME_ZONE
+
+
+def is_user_timezone_cached(telegram_user_id: int) -> bool:
+    """
+    Tells whether the user's timezone is already in the in-process cache.
+
+    Args:
+        telegram_user_id: The Telegram user ID.
+
+    Returns:
+        True if get_user_timezone can answer for the user without the default fallback.
+    """
+    return telegram_user_id in _user_timezone_cache
+
+
+def get_user_timezone(telegram_user_id: int) -> str:
+    """
+    Returns the user's timezone name without a database round-trip.
+
+    Args:
+        telegram_user_id: The Telegram user ID.
+
+    Returns:
+        The timezone remembered for the user, or DEFAULT_TIME_ZONE if it is not known.
+    """
+    return _user_timezone_cache.get(telegram_user_id, DEFAULT_TIME_ZONE)
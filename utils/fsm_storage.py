@@ -0,0 +1,96 @@
+# utils/fsm_storage.py
+
+import datetime
+import json
+import logging
+import os
+from typing import Any
+
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+
+try:
+    # orjson (C-расширение) сериализует данные FSM в несколько раз быстрее стандартного json
+    import orjson
+except ImportError:
+    orjson = None
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Время жизни незавершенного сценария (черновик поста, настройка RSS) в Redis
+FSM_STATE_TTL_SECONDS = int(os.getenv('FSM_STATE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# Метки для типов, которых нет в JSON. Данные FSM содержат множества (selected_channel_ids)
+# и datetime (run_date) - они должны вернуться из Redis тем же типом, что и в MemoryStorage.
+_SET_TAG = '__set__'
+_DATETIME_TAG = '__datetime__'
+
+
+def _encode_fsm_value(value: Any) -> Any:
+    """json.dumps default hook: tags sets and datetimes so they survive the round trip."""
+    if isinstance(value, (set, frozenset)):
+        return {_SET_TAG: list(value)}
+    if isinstance(value, datetime.datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_fsm_object(obj: dict) -> Any:
+    """json.loads object hook: restores values tagged by _encode_fsm_value."""
+    if len(obj) == 1:
+        if _SET_TAG in obj:
+            return set(obj[_SET_TAG])
+        if _DATETIME_TAG in obj:
+            return datetime.datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+# Данные FSM записываются в Redis при каждом update_data/set_state. С orjson дата передается в
+# _encode_fsm_value (OPT_PASSTHROUGH_DATETIME) и получает ту же метку, что и со стандартным json;
+# нестроковые ключи приводятся к строкам, как это делает json.dumps.
+_ORJSON_FSM_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson is not None else 0
+
+
+def _dumps_fsm_data(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=_encode_fsm_value, option=_ORJSON_FSM_OPTIONS).decode()
+    return json.dumps(data, default=_encode_fsm_value)
+
+
+# Чтение остается на json.loads: метки восстанавливаются object_hook прямо при разборе,
+# а orjson.loads потребовал бы отдельного обхода результата на Python (это медленнее).
+
+
+def _loads_fsm_data(raw: str) -> Any:
+    return json.loads(raw, object_hook=_decode_fsm_object)
+
+
+def create_fsm_storage() -> BaseStorage:
+    """
+    Creates the FSM storage for the dispatcher.
+
+    With REDIS_URL set, FSM state lives in Redis: in-progress scenarios survive
+    restarts and redeploys. The bot itself runs as a single process (see the
+    scheduler note in bot.py).
+    Without it, MemoryStorage is used (single process, state lost on restart).
+
+    Returns:
+        RedisStorage if REDIS_URL is configured, otherwise MemoryStorage.
+    """
+    redis_url = os.getenv('REDIS_URL')
+    if not redis_url:
+        logger.info("REDIS_URL не задан - FSM хранится в памяти процесса (MemoryStorage).")
+        return MemoryStorage()
+
+    # Импорт здесь: пакет redis нужен только при использовании RedisStorage
+    from aiogram.fsm.storage.redis import RedisStorage
+
+    logger.info("FSM хранится в Redis (RedisStorage).")
+    return RedisStorage.from_url(
+        redis_url,
+        state_ttl=FSM_STATE_TTL_SECONDS,
+        data_ttl=FSM_STATE_TTL_SECONDS,
+        json_dumps=_dumps_fsm_data,
+        json_loads=_loads_fsm_data,
+    )
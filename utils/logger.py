@@ -1,5 +1,8 @@
 import logging
+import logging.handlers
 import os
+import queue
+from typing import Optional
 
 # Определение пути к директории логов
 LOGS_DIR = 'logs'
@@ -9,6 +12,11 @@ LOG_FILE = os.path.join(LOGS_DIR, 'bot.log')
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S,%mS'
 
+# Слушатель очереди логов. Хэндлеры консоли и файла работают в его отдельном потоке:
+# в потоке event loop запись в лог - это только помещение записи в очередь,
+# поэтому всплеск ошибок (например, в задачах планировщика) не блокирует обработку апдейтов на I/O.
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
 def setup_logging(level=logging.INFO):
     """
     Настраивает стандартный логгер для бота.
@@ -28,28 +36,47 @@ def setup_logging(level=logging.INFO):
     # Создаем форматтер
     formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
 
-    # Проверяем, были ли уже добавлены хэндлеры, чтобы избежать дублирования
+    global _queue_listener
+
+    # Проверяем, была ли уже выполнена настройка, чтобы избежать дублирования
     # Это важно, чтобы при повторном вызове setup_logging (например, в тестах) не плодить хэндлеры
-    if not logger.handlers:
+    if _queue_listener is None:
         # Создаем хэндлер для вывода в консоль (stdout)
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
         stream_handler.setLevel(level) # Устанавливаем уровень для консоли
-        logger.addHandler(stream_handler)
 
         # Создаем хэндлер для вывода в файл
         # Режим 'a' - append (дописывать в конец файла)
         file_handler = logging.FileHandler(LOG_FILE, mode='a', encoding='utf-8')
         file_handler.setFormatter(formatter)
         file_handler.setLevel(level) # Устанавливаем уровень для файла
-        logger.addHandler(file_handler)
+
+        # Корневой логгер пишет только в неограниченную очередь, реальный вывод делает QueueListener
+        log_queue: queue.Queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, file_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
     else:
-        # Если хэндлеры уже есть, просто обновляем их уровень
-        for handler in logger.handlers:
+        # Если настройка уже выполнена, просто обновляем уровень хэндлеров
+        for handler in _queue_listener.handlers:
              handler.setLevel(level)
         logger.setLevel(level) # Обновляем уровень и у самого логгера
 
 
+def stop_logging() -> None:
+    """
+    Останавливает поток записи логов, предварительно записав все записи из очереди.
+    Вызывается один раз при завершении приложения.
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
 # Пример использования (можно удалить, если не нужно в самом модуле)
 # if __name__ == '__main__':
 #     setup_logging(logging.DEBUG) # Настраиваем на уровень DEBUG для примера
@@ -0,0 +1,89 @@
+# utils/shared_cache.py
+
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Время жизни записи о пользователе в общем кэше. Кэши процесса (services.db._user_id_cache,
+# utils.datetime_utils._user_timezone_cache) при промахе сначала смотрят сюда и только потом в БД,
+# поэтому после перезапуска бота они заполняются из Redis, а не запросами к БД.
+# Несколько процессов бота кэш бы тоже разделили, но бот рассчитан на один процесс:
+# планировщик задач в каждом процессе выполнял бы посты и проверки RSS повторно (см. bot.py).
+USER_SHARED_CACHE_TTL_SECONDS = int(os.getenv('USER_SHARED_CACHE_TTL', '3600'))
+_USER_KEY_PREFIX = 'user:'
+
+# Клиент Redis создается при первом обращении (внутри работающего event loop) и только при заданном REDIS_URL
+_redis: Optional[Any] = None
+
+
+def _get_redis() -> Optional[Any]:
+    """Возвращает общий клиент Redis или None, если REDIS_URL не задан."""
+    global _redis
+    if _redis is None:
+        redis_url = os.getenv('REDIS_URL')
+        if not redis_url:
+            return None
+        # Импорт здесь: пакет redis нужен только при заданном REDIS_URL
+        import redis.asyncio as aioredis
+
+        _redis = aioredis.from_url(redis_url, decode_responses=True)
+    return _redis
+
+
+async def get_shared_user(telegram_user_id: int) -> Optional[Tuple[int, Optional[str]]]:
+    """
+    Reads a user's internal ID and timezone from the shared Redis cache.
+
+    Args:
+        telegram_user_id: The Telegram user ID.
+
+    Returns:
+        (user_id, timezone) on a hit, None on a miss, without Redis or on a Redis error.
+    """
+    redis = _get_redis()
+    if redis is None:
+        return None
+    try:
+        fields = await redis.hgetall(f'{_USER_KEY_PREFIX}{telegram_user_id}')
+    except Exception as e:
+        # Общий кэш лишь ускоряет чтение: при недоступном Redis данные берутся из БД
+        logger.warning(f"Не удалось прочитать пользователя {telegram_user_id} из Redis: {e}")
+        return None
+    if not fields or 'id' not in fields:
+        return None
+    return int(fields['id']), fields.get('timezone') or None
+
+
+async def set_shared_user(telegram_user_id: int, user_id: int, timezone: Optional[str]) -> None:
+    """
+    Stores a user's internal ID and timezone in the shared Redis cache.
+    Does nothing without Redis; Redis errors are logged and ignored.
+
+    Args:
+        telegram_user_id: The Telegram user ID.
+        user_id: The internal user ID (users.id).
+        timezone: The user's timezone name, or None if not set.
+    """
+    redis = _get_redis()
+    if redis is None:
+        return
+    key = f'{_USER_KEY_PREFIX}{telegram_user_id}'
+    try:
+        # HSET и EXPIRE в одной транзакции - один round-trip
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={'id': user_id, 'timezone': timezone or ''})
+            pipe.expire(key, USER_SHARED_CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить пользователя {telegram_user_id} в Redis: {e}")
+
+
+async def close_shared_cache() -> None:
+    """Закрывает клиент Redis общего кэша (вызывается при остановке бота)."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None